@@ -0,0 +1,120 @@
+"""
+Controllo di regressione delle prestazioni.
+
+Esegue un insieme fisso di scenari sintetici con seme fissato e confronta i tempi per fase
+e il picco di memoria con quelli salvati in benchmarks/baseline.json, entro le tolleranze
+indicate nel file. Termina con codice 1 se una misura peggiora oltre la tolleranza.
+
+Uso:
+    python benchmarks/regressione.py                     # confronto con la baseline
+    python benchmarks/regressione.py --aggiorna-baseline # registra una nuova baseline
+
+I tempi dipendono dalla macchina: la baseline va registrata sulla macchina su cui si
+esegue il controllo.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tracemalloc
+
+from suite import RADICE, carica_generatore, esegui_scenario
+
+PERCORSO_BASELINE = os.path.join(RADICE, 'benchmarks', 'baseline.json')
+
+SCENARI = {
+    'piccola': {'num_classi': 10, 'num_settimane': 20, 'popolazione_size': 40, 'num_generazioni': 5, 'seme': 1},
+    'media': {'num_classi': 40, 'num_settimane': 30, 'popolazione_size': 40, 'num_generazioni': 5, 'seme': 2},
+}
+
+TOLLERANZE = {
+    # Aumento relativo ammesso per tempi e memoria
+    'tempo': 0.30,
+    'memoria': 0.20,
+    # Differenze di tempo sotto questa soglia (secondi) sono considerate rumore
+    'tempo_minimo': 0.02,
+}
+
+
+def misura_scenario(gen_mod, parametri, ripetizioni=3):
+    # Tempo minimo per fase su più ripetizioni e picco di memoria in un'esecuzione tracciata a parte
+    misure = [esegui_scenario(gen_mod, **parametri) for _ in range(ripetizioni)]
+    tempi = {fase: min(m['tempi'][fase] for m in misure) for fase in misure[0]['tempi']}
+
+    tracemalloc.start()
+    try:
+        esegui_scenario(gen_mod, **parametri)
+        _, picco = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'tempi': tempi, 'memoria_picco_mb': round(picco / 2 ** 20, 2), 'fitness': misure[0]['fitness']}
+
+
+def confronta(baseline, attuali):
+    # Confronta le misure attuali con la baseline. Restituisce (esito, righe) dove ogni riga
+    # descrive una misura con valore di riferimento, valore attuale, variazione ed esito.
+    tolleranze = dict(TOLLERANZE, **baseline.get('tolleranze', {}))
+    righe = []
+    for nome, attuale in attuali.items():
+        riferimento = baseline['scenari'].get(nome)
+        if riferimento is None:
+            righe.append({'scenario': nome, 'misura': '-', 'esito': 'NUOVO'})
+            continue
+        misure = [(f"tempo {fase}", riferimento['tempi'].get(fase), secondi, 'tempo')
+                  for fase, secondi in attuale['tempi'].items()]
+        misure.append(('memoria picco MB', riferimento.get('memoria_picco_mb'), attuale['memoria_picco_mb'], 'memoria'))
+        for misura, valore_base, valore, tipo in misure:
+            if valore_base is None:
+                righe.append({'scenario': nome, 'misura': misura, 'attuale': valore, 'esito': 'NUOVO'})
+                continue
+            variazione = (valore - valore_base) / valore_base if valore_base > 0 else 0.0
+            peggiorato = valore > valore_base * (1 + tolleranze[tipo])
+            if tipo == 'tempo' and valore - valore_base < tolleranze['tempo_minimo']:
+                peggiorato = False
+            righe.append({'scenario': nome, 'misura': misura, 'baseline': valore_base, 'attuale': valore,
+                          'variazione': variazione, 'esito': 'FALLITO' if peggiorato else 'OK'})
+        if riferimento.get('fitness') != attuale['fitness']:
+            # Con seme fisso la fitness cambia solo se cambia l'algoritmo: lo si segnala
+            righe.append({'scenario': nome, 'misura': 'fitness', 'baseline': riferimento.get('fitness'),
+                          'attuale': attuale['fitness'], 'esito': 'CAMBIATA'})
+    esito = all(riga['esito'] != 'FALLITO' for riga in righe)
+    return esito, righe
+
+
+def stampa_confronto(righe):
+    for riga in righe:
+        variazione = f"{riga['variazione']:+.1%}" if 'variazione' in riga else ''
+        print(f"{riga['esito']:<9} {riga['scenario']:<10} {riga['misura']:<28} "
+              f"{riga.get('baseline', '')!s:>12} -> {riga.get('attuale', '')!s:<12} {variazione}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Controllo di regressione delle prestazioni")
+    parser.add_argument('--baseline', default=PERCORSO_BASELINE)
+    parser.add_argument('--aggiorna-baseline', action='store_true')
+    parser.add_argument('--ripetizioni', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    gen_mod = carica_generatore()
+    logging.getLogger().setLevel(logging.WARNING)
+    attuali = {nome: misura_scenario(gen_mod, parametri, args.ripetizioni) for nome, parametri in SCENARI.items()}
+
+    if args.aggiorna_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'tolleranze': TOLLERANZE, 'scenari': attuali}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline salvata in {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    esito, righe = confronta(baseline, attuali)
+    stampa_confronto(righe)
+    print("SUPERATO" if esito else "FALLITO")
+    return 0 if esito else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Generatore di scuole sintetiche per i benchmark.
+
+Produce classes.csv, civics_teachers.csv, availability.csv e closures.csv con la stessa
+struttura dei file reali, per dimensioni parametriche: numero di classi, docenti curricolari,
+docenti di educazione civica, quota di docenti civics che insegnano anche nelle classi,
+settimane dell'anno scolastico e densità della disponibilità.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+GIORNI = ['LUN', 'MAR', 'MER', 'GIO', 'VEN', 'SAB']
+
+
+def genera_scuola_sintetica(cartella, num_classi=20, num_docenti=None, num_docenti_civics=None,
+                            classi_per_docente_civics=5, sovrapposizione_civics=0.3,
+                            num_settimane=30, ore_giornaliere=6, densita_disponibilita=0.6, seme=0):
+    """
+    Scrive i quattro CSV di una scuola sintetica in cartella e restituisce i parametri di
+    CalendarioConfig coerenti (date di inizio/fine e ore di civica per classe).
+
+    - num_docenti: docenti curricolari (default: 2 per classe)
+    - num_docenti_civics: docenti di educazione civica (default: uno ogni 3 classi)
+    - sovrapposizione_civics: quota di docenti civics che insegnano anche nelle classi
+    - densita_disponibilita: probabilità che un docente civics sia disponibile in un'ora
+    """
+    rng = random.Random(seme)
+    num_docenti = num_docenti or max(6, 2 * num_classi)
+    num_docenti_civics = num_docenti_civics or max(3, num_classi // 3)
+    os.makedirs(cartella, exist_ok=True)
+
+    classi = [f"{1 + i // 26}{chr(ord('A') + i % 26)}" for i in range(num_classi)]
+    docenti = [f"Docente{i}" for i in range(num_docenti)]
+    docenti_civics = [f"Civics{i}" for i in range(num_docenti_civics)]
+    # Una parte dei docenti civics insegna anche nelle classi e può sostituire sé stessa
+    num_in_organico = round(sovrapposizione_civics * num_docenti_civics)
+    docenti_orario = docenti + docenti_civics[:num_in_organico]
+
+    # Orario settimanale: ogni classe attinge da un sottoinsieme di docenti
+    righe_classi = []
+    for classe in classi:
+        docenti_classe = rng.sample(docenti_orario, min(len(docenti_orario), max(ore_giornaliere, 8)))
+        giorni = [';'.join(rng.choice(docenti_classe) for _ in range(ore_giornaliere)) for _ in GIORNI]
+        righe_classi.append([classe] + giorni)
+
+    # Assegnazione classi ai docenti civics: ogni classe ha almeno un docente civics
+    classi_docente = {docente: set() for docente in docenti_civics}
+    for i, classe in enumerate(classi):
+        classi_docente[docenti_civics[i % num_docenti_civics]].add(classe)
+    for docente in docenti_civics:
+        mancanti = max(0, min(classi_per_docente_civics, num_classi) - len(classi_docente[docente]))
+        classi_docente[docente].update(rng.sample(classi, mancanti))
+
+    righe_disponibilita = []
+    for docente in docenti_civics:
+        giorni = [';'.join('DISPOS' if rng.random() < densita_disponibilita else 'NO' for _ in range(ore_giornaliere))
+                  for _ in GIORNI]
+        righe_disponibilita.append([docente] + giorni)
+
+    # Anno scolastico di num_settimane settimane con due periodi di chiusura
+    data_inizio = datetime(2024, 9, 16)
+    data_fine = data_inizio + timedelta(weeks=num_settimane) - timedelta(days=2)
+    chiusure = [
+        (data_inizio + timedelta(weeks=num_settimane // 3, days=2), data_inizio + timedelta(weeks=num_settimane // 3 + 1), 'Vacanze invernali'),
+        (data_inizio + timedelta(weeks=2 * num_settimane // 3, days=3), data_inizio + timedelta(weeks=2 * num_settimane // 3, days=5), 'Vacanze primaverili'),
+    ]
+
+    _scrivi_csv(os.path.join(cartella, 'classes.csv'), ['CLASSE'] + [f"DOC {g}" for g in GIORNI], righe_classi)
+    _scrivi_csv(os.path.join(cartella, 'civics_teachers.csv'), ['DOCENTE', 'CLASSI'],
+                [[docente, ';'.join(sorted(classi_docente[docente]))] for docente in docenti_civics])
+    _scrivi_csv(os.path.join(cartella, 'availability.csv'), ['DOCENTE'] + GIORNI, righe_disponibilita)
+    _scrivi_csv(os.path.join(cartella, 'closures.csv'), ['INIZIO', 'FINE', 'DESCRIZIONE'],
+                [[inizio.strftime('%d/%m/%Y'), fine.strftime('%d/%m/%Y'), descrizione] for inizio, fine, descrizione in chiusure])
+
+    return {
+        'cartella_input': cartella,
+        'data_inizio_str': data_inizio.strftime('%d/%m/%Y'),
+        'data_fine_str': data_fine.strftime('%d/%m/%Y'),
+        # Una settimana su cinque resta libera per lasciare spazio all'ottimizzazione
+        'ore_tot_civics': max(1, (num_settimane - 2) * 4 // 5),
+    }
+
+
+def _scrivi_csv(percorso, intestazione, righe):
+    with open(percorso, 'w', encoding='utf-8') as f:
+        f.write(','.join(intestazione) + '\n')
+        for riga in righe:
+            f.write(','.join(riga) + '\n')
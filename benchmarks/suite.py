@@ -0,0 +1,117 @@
+"""
+Suite di benchmark del generatore su scuole sintetiche di dimensione crescente.
+
+Per ogni dimensione misura i sottosistemi (caricamento e preparazione dei dati,
+popolazione iniziale, fitness, generazione dei figli, salvataggio dei risultati) e
+un'esecuzione completa, poi scrive le curve di scalabilità in un file JSON e in un CSV.
+
+Uso:
+    python benchmarks/suite.py --classi 10 20 40 --output benchmarks/risultati.json
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from scuola_sintetica import genera_scuola_sintetica
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def carica_generatore():
+    # Il generatore è uno script con il trattino nel nome: lo si carica come modulo
+    spec = importlib.util.spec_from_file_location(
+        'calendario_generator', os.path.join(RADICE, 'calendario-ed-civ-generator.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules['calendario_generator'] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _cronometra(funzione, *args):
+    inizio = time.perf_counter()
+    risultato = funzione(*args)
+    return time.perf_counter() - inizio, risultato
+
+
+def esegui_scenario(gen_mod, num_classi, num_settimane=30, popolazione_size=50, num_generazioni=5, seme=0):
+    # Misura i sottosistemi e l'esecuzione completa per una scuola sintetica di num_classi classi.
+    # Tutto gira su un solo core e con semi fissi, così i tempi sono confrontabili tra esecuzioni.
+    with tempfile.TemporaryDirectory() as cartella, contextlib.redirect_stdout(io.StringIO()):
+        cartella_corrente = os.getcwd()
+        os.chdir(cartella)
+        try:
+            parametri = genera_scuola_sintetica('input', num_classi=num_classi, num_settimane=num_settimane, seme=seme)
+            config = gen_mod.CalendarioConfig(
+                cartella_output='OUT', num_generazioni=num_generazioni, early_stopping_n=num_generazioni,
+                popolazione_size=popolazione_size, num_cores=1, save_interval=0, seme=seme, **parametri)
+
+            tempi = {}
+            tempi['preparazione'], generatore = _cronometra(gen_mod.CalendarioGenerator, config)
+            tempi['popolazione_iniziale'], _ = _cronometra(generatore.initialize_population)
+            popolazione = generatore.population
+            tempi['fitness'], _ = _cronometra(generatore.evaluate_population)
+            generatore.population.sort(key=lambda x: x['fitness'])
+            elite = generatore.population[:max(1, int(generatore.elitismo_rate * popolazione_size))]
+            tempi['riproduzione'], _ = _cronometra(generatore.select_and_generate_new_population, elite)
+            tempi['salvataggio'], _ = _cronometra(generatore.salva_risultati, popolazione[0]['individuo'], 'OUT')
+
+            generatore = gen_mod.CalendarioGenerator(config)
+            tempi['end_to_end'], fitness = _cronometra(generatore.genera_calendario)
+        finally:
+            os.chdir(cartella_corrente)
+
+    return {
+        'classi': num_classi,
+        'settimane': num_settimane,
+        'slot': len(generatore.slot_disponibili),
+        'popolazione_size': popolazione_size,
+        'num_generazioni': num_generazioni,
+        'individui_validi': len(popolazione),
+        'fitness': fitness,
+        'tempi': {fase: round(secondi, 4) for fase, secondi in tempi.items()},
+    }
+
+
+def scrivi_risultati(risultati, percorso):
+    # Salva i risultati completi in JSON e una tabella classi x fasi in CSV accanto
+    with open(percorso, 'w', encoding='utf-8') as f:
+        json.dump(risultati, f, indent=2)
+    fasi = list(risultati['scenari'][0]['tempi']) if risultati['scenari'] else []
+    with open(os.path.splitext(percorso)[0] + '.csv', 'w', encoding='utf-8') as f:
+        f.write(','.join(['classi', 'slot'] + fasi) + '\n')
+        for scenario in risultati['scenari']:
+            f.write(','.join(str(v) for v in [scenario['classi'], scenario['slot']] + [scenario['tempi'][fase] for fase in fasi]) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark di scalabilità del generatore di calendari")
+    parser.add_argument('--classi', type=int, nargs='+', default=[10, 20, 40, 80, 120])
+    parser.add_argument('--settimane', type=int, default=30)
+    parser.add_argument('--popolazione', type=int, default=50)
+    parser.add_argument('--generazioni', type=int, default=5)
+    parser.add_argument('--seme', type=int, default=0)
+    parser.add_argument('--output', default=os.path.join(RADICE, 'benchmarks', 'risultati.json'))
+    args = parser.parse_args(argv)
+
+    gen_mod = carica_generatore()
+    logging.getLogger().setLevel(logging.WARNING)
+    risultati = {'python': sys.version.split()[0], 'scenari': []}
+    for num_classi in args.classi:
+        scenario = esegui_scenario(gen_mod, num_classi, args.settimane, args.popolazione, args.generazioni, args.seme)
+        risultati['scenari'].append(scenario)
+        print(f"{num_classi:>4} classi, {scenario['slot']:>6} slot: "
+              + ', '.join(f"{fase} {secondi:.3f}s" for fase, secondi in scenario['tempi'].items()))
+
+    scrivi_risultati(risultati, args.output)
+    print(f"Risultati salvati in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
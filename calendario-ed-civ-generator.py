@@ -39,14 +39,35 @@ import numpy as np
 from datetime import datetime, timedelta
 from collections import defaultdict
 import os
+import json
 import random
+import copy
 import multiprocessing
 import logging
+import math
+import statistics
 import re
-from dataclasses import dataclass
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from dataclasses import dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.pool import ThreadPool
+from typing import Optional
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from openpyxl.utils import get_column_letter
 
+try:
+    # OR-Tools è opzionale: serve solo per il motore esatto (motore='esatto' o esatto_warm_start)
+    from ortools.sat.python import cp_model
+except ImportError:
+    cp_model = None
+
 # Configura il logger per informazioni sull'esecuzione
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -302,6 +323,184 @@ def genera_file_excel(calendario, classi_df, docenti_civics_df, cartella_output)
     genera_orario_docenti(calendario, docenti_civics_df, cartella_output)
 
 
+@lru_cache(maxsize=None)
+def _pesi_cumulativi_ranking(n):
+    # Pesi cumulativi della selezione per ranking su n individui ordinati per fitness
+    # crescente (il primo ha peso n, l'ultimo 1); calcolati una volta per dimensione
+    pesi = []
+    totale = 0
+    for rank in range(n, 0, -1):
+        totale += rank
+        pesi.append(totale)
+    return tuple(pesi)
+
+
+def fronti_non_dominati(obiettivi):
+    # Ordinamento non dominato veloce di NSGA-II (minimizzazione): restituisce i fronti come
+    # liste di indici in obiettivi, dal fronte di Pareto in poi. Con i vettori in ordine
+    # lessicografico un vettore può dominare solo quelli che lo seguono, così ogni coppia
+    # viene confrontata una volta sola
+    ordine = sorted(range(len(obiettivi)), key=obiettivi.__getitem__)
+    dominati = [[] for _ in obiettivi]
+    dominanti = [0] * len(obiettivi)
+    for posizione, i in enumerate(ordine):
+        a = obiettivi[i]
+        for j in ordine[posizione + 1:]:
+            b = obiettivi[j]
+            if a != b and all(x <= y for x, y in zip(a, b)):
+                dominati[i].append(j)
+                dominanti[j] += 1
+
+    fronti = []
+    fronte = [i for i in ordine if dominanti[i] == 0]
+    while fronte:
+        fronti.append(fronte)
+        successivo = []
+        for i in fronte:
+            for j in dominati[i]:
+                dominanti[j] -= 1
+                if dominanti[j] == 0:
+                    successivo.append(j)
+        fronte = successivo
+    return fronti
+
+
+def distanza_affollamento(obiettivi, fronte):
+    # Crowding distance di NSGA-II per gli indici di un fronte: somma, per ogni obiettivo, della
+    # distanza normalizzata tra i vicini; gli estremi hanno distanza infinita. Gli obiettivi
+    # costanti sul fronte non contribuiscono. Restituisce un dizionario indice -> distanza
+    distanza = dict.fromkeys(fronte, 0.0)
+    if not fronte:
+        return distanza
+    for m in range(len(obiettivi[fronte[0]])):
+        ordinati = sorted(fronte, key=lambda i: obiettivi[i][m])
+        minimo = obiettivi[ordinati[0]][m]
+        massimo = obiettivi[ordinati[-1]][m]
+        if massimo == minimo:
+            continue
+        distanza[ordinati[0]] = distanza[ordinati[-1]] = float('inf')
+        for k in range(1, len(ordinati) - 1):
+            distanza[ordinati[k]] += (obiettivi[ordinati[k + 1]][m] - obiettivi[ordinati[k - 1]][m]) / (massimo - minimo)
+    return distanza
+
+
+class OccupazioneDocenti:
+    """
+    Indice di occupazione dei docenti civics di un individuo, indicizzato per
+    (docente, data, ora). Ogni cella conta le assegnazioni del docente in quella data
+    e ora, per cui il controllo di disponibilità e l'aggiornamento costano O(1);
+    il contatore dei conflitti permette di sapere in O(1) se l'individuo contiene
+    doppie prenotazioni.
+    """
+    __slots__ = ('celle', 'conflitti')
+
+    def __init__(self, num_celle=0):
+        self.celle = bytearray(num_celle)
+        self.conflitti = 0
+
+    def libero(self, cella):
+        return self.celle[cella] == 0
+
+    def aggiungi(self, cella):
+        if self.celle[cella]:
+            self.conflitti += 1
+        self.celle[cella] += 1
+
+    def rimuovi(self, cella):
+        self.celle[cella] -= 1
+        if self.celle[cella]:
+            self.conflitti -= 1
+
+    def copia(self):
+        nuova = OccupazioneDocenti()
+        nuova.celle = self.celle[:]
+        nuova.conflitti = self.conflitti
+        return nuova
+
+
+class Telemetria:
+    """
+    Telemetria dell'algoritmo genetico: accumula i tempi per fase e i contatori di una
+    generazione e li scrive come riga JSON in un file JSON Lines. Quando è disattivata
+    il generatore non crea l'oggetto e il costo si riduce a un controllo su None.
+    """
+    def __init__(self, percorso):
+        self.percorso = percorso
+        self.tempi = defaultdict(float)
+        self.contatori = defaultdict(int)
+        self.valori = {}
+        os.makedirs(os.path.dirname(percorso) or '.', exist_ok=True)
+        open(percorso, 'w', encoding='utf-8').close()
+
+    def tempo(self, fase, secondi):
+        self.tempi[fase] += secondi
+
+    def conta(self, nome, quantita=1):
+        self.contatori[nome] += quantita
+
+    def imposta(self, nome, valore):
+        self.valori[nome] = valore
+
+    def scrivi(self, **campi):
+        # Scrive la riga della generazione corrente e azzera gli accumulatori
+        riga = dict(campi)
+        riga.update(self.valori)
+        riga['contatori'] = dict(self.contatori)
+        riga['tempi'] = {fase: round(secondi, 6) for fase, secondi in self.tempi.items()}
+        with open(self.percorso, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(riga) + '\n')
+        self.tempi.clear()
+        self.contatori.clear()
+        self.valori.clear()
+
+
+class SelettoreOperatori:
+    """
+    Scelta adattiva di un operatore genetico con un bandit a probability matching.
+
+    Ogni operatore accumula i figli migliorativi prodotti e il tempo speso ad applicarlo,
+    con un decadimento a ogni generazione perché contino soprattutto i risultati recenti.
+    La probabilità di scelta è proporzionale ai miglioramenti per secondo, con una quota
+    minima comune così che nessun operatore venga escluso del tutto.
+    """
+    def __init__(self, operatori, decadimento=0.7, quota_minima=0.15):
+        self.operatori = list(operatori)
+        self.decadimento = decadimento
+        self.quota_minima = quota_minima
+        self.usi = dict.fromkeys(self.operatori, 0)
+        self.successi = dict.fromkeys(self.operatori, 0.0)
+        self.tempo = dict.fromkeys(self.operatori, 0.0)
+        self.probabilita = [1 / len(self.operatori)] * len(self.operatori)
+
+    def scegli(self, rng):
+        return rng.choices(self.operatori, weights=self.probabilita)[0]
+
+    def registra(self, operatore, secondi, migliorato):
+        self.usi[operatore] += 1
+        self.tempo[operatore] += secondi
+        if migliorato:
+            self.successi[operatore] += 1
+
+    def aggiorna(self):
+        # Ricalcola le probabilità dalla resa (miglioramenti per secondo) e applica il
+        # decadimento; senza alcun miglioramento la scelta torna uniforme
+        resa = [self.successi[op] / self.tempo[op] if self.tempo[op] > 0 else 0.0 for op in self.operatori]
+        totale = sum(resa)
+        quota = self.quota_minima / len(self.operatori)
+        if totale > 0:
+            self.probabilita = [quota + (1 - self.quota_minima) * r / totale for r in resa]
+        else:
+            self.probabilita = [1 / len(self.operatori)] * len(self.operatori)
+        for op in self.operatori:
+            self.successi[op] *= self.decadimento
+            self.tempo[op] *= self.decadimento
+
+    def statistiche(self):
+        return {op: {'usi': self.usi[op], 'successi': round(self.successi[op], 3),
+                     'secondi': round(self.tempo[op], 6), 'probabilita': round(p, 4)}
+                for op, p in zip(self.operatori, self.probabilita)}
+
+
 @dataclass
 class CalendarioConfig:
     num_varianti: int = 1
@@ -318,10 +517,63 @@ class CalendarioConfig:
     num_cores: int = 4
     allow_teacher_replace_self: bool = True
     save_interval: int = 50
+    probabilita_mutazione_slot: float = 0.1
+    ricerca_locale_intervallo: int = 0
+    ricerca_locale_top_k: int = 5
+    ricerca_locale_tempo_max: float = 1.0
+    motore: str = 'ga'
+    sa_iterazioni: int = 20000
+    sa_temperatura_iniziale: float = 10.0
+    sa_temperatura_finale: float = 0.01
+    sa_raffreddamento: str = 'geometrico'
+    sa_riavvii: int = 0
+    pt_repliche: int = 8
+    pt_passi_scambio: int = 1000
+    tabu_iterazioni: int = 2000
+    tabu_durata: int = 15
+    tabu_candidati: int = 20
+    tabu_dopo_ga: bool = False
+    nsga2_max_soluzioni: int = 20
+    esatto_tempo_max: float = 60.0
+    esatto_max_soluzioni: int = 10
+    esatto_warm_start: bool = False
+    seed_calendar: str = ''
+    seed_num_varianti: int = 20
+    data_congelamento_str: str = ''
+    time_budget_seconds: float = 0
+    cartella_input: str = ''
+    telemetria: bool = False
+    seme: Optional[int] = None
+    crossover_maschera: str = 'blocchi'
+    selezione_operatore: str = 'ranking'
+    dimensione_torneo: int = 3
+    eliminazione_cloni: bool = False
+    probabilita_mutazione_cloni: float = 0.5
+    operatori_adattivi: bool = False
+    multi_start: int = 1
+    multi_start_margine: float = 0.1
 
 
 class CalendarioGenerator:
     # Classe principale che gestisce l'esecuzione dell'algoritmo genetico
+    # Telemetria della generazione corrente (None se disattivata)
+    _telemetria = None
+    # Quote di individui iniziali generati con approccio greedy e per fasce (il resto è casuale)
+    quote_iniziali = (0.3, 0.3)
+    # Migliore fitness condivisa tra le esecuzioni multi-start (None fuori dal multi-start)
+    _incumbente = None
+    # Pesi delle componenti della fitness (deviazione, varianza, percentuale massima, penalità)
+    PESI_FITNESS = (10, 5, 1, 1)
+    # Fattore di scala dell'obiettivo intero del modello CP-SAT rispetto alla fitness
+    SCALA_ESATTO = 10 ** 7
+    # Combinazioni di strategie assegnate a rotazione alle esecuzioni multi-start
+    STRATEGIE_MULTI_START = [
+        {'quote_iniziali': (0.3, 0.3), 'crossover_maschera': 'blocchi', 'selezione_operatore': 'ranking'},
+        {'quote_iniziali': (0.6, 0.2), 'crossover_maschera': 'uniforme', 'selezione_operatore': 'torneo'},
+        {'quote_iniziali': (0.1, 0.3), 'crossover_maschera': 'blocchi', 'selezione_operatore': 'sus'},
+        {'quote_iniziali': (0.2, 0.6), 'crossover_maschera': 'uniforme', 'selezione_operatore': 'ranking'},
+    ]
+
     def __init__(self, config: CalendarioConfig):
         # Inizializzazione dei parametri
         self.config = config
@@ -340,6 +592,41 @@ class CalendarioGenerator:
         self.num_cores = config.num_cores
         self.allow_teacher_replace_self = config.allow_teacher_replace_self
         self.save_interval = config.save_interval
+        self.probabilita_mutazione_slot = config.probabilita_mutazione_slot
+        self.ricerca_locale_intervallo = config.ricerca_locale_intervallo
+        self.ricerca_locale_top_k = config.ricerca_locale_top_k
+        self.ricerca_locale_tempo_max = config.ricerca_locale_tempo_max
+        self.motore = config.motore
+        self.sa_iterazioni = config.sa_iterazioni
+        self.sa_temperatura_iniziale = config.sa_temperatura_iniziale
+        self.sa_temperatura_finale = config.sa_temperatura_finale
+        self.sa_raffreddamento = config.sa_raffreddamento
+        self.sa_riavvii = config.sa_riavvii
+        self.pt_repliche = config.pt_repliche
+        self.pt_passi_scambio = config.pt_passi_scambio
+        self.tabu_iterazioni = config.tabu_iterazioni
+        self.tabu_durata = config.tabu_durata
+        self.tabu_candidati = config.tabu_candidati
+        self.tabu_dopo_ga = config.tabu_dopo_ga
+        self.nsga2_max_soluzioni = config.nsga2_max_soluzioni
+        self.esatto_tempo_max = config.esatto_tempo_max
+        self.esatto_max_soluzioni = config.esatto_max_soluzioni
+        self.esatto_warm_start = config.esatto_warm_start
+        self.seed_calendar = config.seed_calendar
+        self.seed_num_varianti = config.seed_num_varianti
+        self.data_congelamento_str = config.data_congelamento_str
+        self.time_budget_seconds = config.time_budget_seconds
+        self.cartella_input = config.cartella_input
+        self.telemetria = config.telemetria
+        self.seme = config.seme
+        self.crossover_maschera = config.crossover_maschera
+        self.selezione_operatore = config.selezione_operatore
+        self.dimensione_torneo = config.dimensione_torneo
+        self.eliminazione_cloni = config.eliminazione_cloni
+        self.probabilita_mutazione_cloni = config.probabilita_mutazione_cloni
+        self.operatori_adattivi = config.operatori_adattivi
+        self.multi_start = config.multi_start
+        self.multi_start_margine = config.multi_start_margine
 
         # Backup degli hyperparams di base
         self.base_probabilita_mutazione = config.probabilita_mutazione
@@ -368,6 +655,55 @@ class CalendarioGenerator:
         print(f"num_cores = {self.num_cores}")
         print(f"allow_teacher_replace_self = {self.allow_teacher_replace_self}")
         print(f"save_interval = {self.save_interval}")
+        print(f"probabilita_mutazione_slot = {self.probabilita_mutazione_slot}")
+        print(f"ricerca_locale_intervallo = {self.ricerca_locale_intervallo}")
+        print(f"ricerca_locale_top_k = {self.ricerca_locale_top_k}")
+        print(f"ricerca_locale_tempo_max = {self.ricerca_locale_tempo_max}")
+        print(f"motore = {self.motore}")
+        print(f"sa_iterazioni = {self.sa_iterazioni}")
+        print(f"sa_temperatura_iniziale = {self.sa_temperatura_iniziale}")
+        print(f"sa_temperatura_finale = {self.sa_temperatura_finale}")
+        print(f"sa_raffreddamento = {self.sa_raffreddamento}")
+        print(f"sa_riavvii = {self.sa_riavvii}")
+        print(f"pt_repliche = {self.pt_repliche}")
+        print(f"pt_passi_scambio = {self.pt_passi_scambio}")
+        print(f"tabu_iterazioni = {self.tabu_iterazioni}")
+        print(f"tabu_durata = {self.tabu_durata}")
+        print(f"tabu_candidati = {self.tabu_candidati}")
+        print(f"tabu_dopo_ga = {self.tabu_dopo_ga}")
+        print(f"nsga2_max_soluzioni = {self.nsga2_max_soluzioni}")
+        print(f"esatto_tempo_max = {self.esatto_tempo_max}")
+        print(f"esatto_max_soluzioni = {self.esatto_max_soluzioni}")
+        print(f"esatto_warm_start = {self.esatto_warm_start}")
+        print(f"seed_calendar = {self.seed_calendar}")
+        print(f"seed_num_varianti = {self.seed_num_varianti}")
+        print(f"data_congelamento_str = {self.data_congelamento_str}")
+        print(f"time_budget_seconds = {self.time_budget_seconds}")
+        print(f"cartella_input = {self.cartella_input}")
+        print(f"telemetria = {self.telemetria}")
+        print(f"seme = {self.seme}")
+        print(f"crossover_maschera = {self.crossover_maschera}")
+        print(f"selezione_operatore = {self.selezione_operatore}")
+        print(f"dimensione_torneo = {self.dimensione_torneo}")
+        print(f"eliminazione_cloni = {self.eliminazione_cloni}")
+        print(f"probabilita_mutazione_cloni = {self.probabilita_mutazione_cloni}")
+        print(f"operatori_adattivi = {self.operatori_adattivi}")
+        print(f"multi_start = {self.multi_start}")
+        print(f"multi_start_margine = {self.multi_start_margine}")
+
+        # Generatore casuale dell'istanza: con un seme l'esecuzione è riproducibile. I task
+        # stocastici eseguiti nei worker ricevono semi estratti da questo generatore e usano
+        # un flusso proprio, per cui il risultato non dipende da num_cores
+        self.rng = random.Random(self.seme)
+        # Richiesta di interruzione da SIGINT/SIGTERM (vedi _gestione_interruzioni)
+        self._interruzione_richiesta = False
+        # Generatore separato per le coppie campionate da diversita_popolazione
+        self._campionatore_diversita = random.Random(0)
+        # Quota di figli che superano verifica_vincoli, aggiornata a ogni lotto: serve a
+        # generare in blocco abbastanza candidati per completare la popolazione
+        self.tasso_figli_validi = 1.0
+        # Selettori adattivi degli operatori, attivi solo durante _evolvi_popolazione
+        self.selettori_operatori = None
 
         # Caricamento dati e inizializzazione variabili
         self.load_data()
@@ -378,6 +714,24 @@ class CalendarioGenerator:
         base_prob = self.base_probabilita_mutazione
         return min(0.5, base_prob * (1 + generazioni_senza_miglioramento / 10))
 
+    def _azzera_stato_evoluzione(self):
+        # Riporta ai valori iniziali lo stato che l'algoritmo genetico adatta durante
+        # l'esecuzione, così ogni avvio del multi-start parte dalla configurazione e non
+        # da quanto lasciato da un avvio precedente sulla stessa istanza
+        self.probabilita_mutazione = self.base_probabilita_mutazione
+        self.probabilita_crossover = self.base_probabilita_crossover
+        self.elitismo_rate = self.base_elitismo_rate
+        self.hyperparams = {
+            'probabilita_mutazione': self.probabilita_mutazione,
+            'probabilita_crossover': self.probabilita_crossover,
+            'elitismo_rate': self.elitismo_rate
+        }
+        self.tasso_figli_validi = 1.0
+        self.selettori_operatori = None
+        self.population = []
+        self.andamento_fitness = []
+        self.fermato_dal_racing = False
+
     def calcola_elitismo_rate(self, generazioni_senza_miglioramento):
         # Aumenta gradualmente il tasso di elitismo se non c'è miglioramento
         base_rate = self.base_elitismo_rate
@@ -387,10 +741,10 @@ class CalendarioGenerator:
         # Caricamento dati da file CSV
         logging.info("Caricamento dei file CSV...")
         try:
-            self.classi_df = pd.read_csv('classes.csv')
-            self.docenti_civics_df = pd.read_csv('civics_teachers.csv')
-            self.disponibilita_df = pd.read_csv('availability.csv')
-            self.chiusure_df = pd.read_csv('closures.csv')
+            self.classi_df = pd.read_csv(os.path.join(self.cartella_input, 'classes.csv'))
+            self.docenti_civics_df = pd.read_csv(os.path.join(self.cartella_input, 'civics_teachers.csv'))
+            self.disponibilita_df = pd.read_csv(os.path.join(self.cartella_input, 'availability.csv'))
+            self.chiusure_df = pd.read_csv(os.path.join(self.cartella_input, 'closures.csv'))
             # Inizializza la lista delle classi dal DataFrame
             self.classi_list = list(self.classi_df['CLASSE'])
         except FileNotFoundError as e:
@@ -424,6 +778,8 @@ class CalendarioGenerator:
         self._identifica_docenti_civics_organico()
         self._genera_slot_disponibili()
         self._precalcola_lookups()
+        self._applica_congelamento()
+        self._precalcola_indici_slot()
 
         # Debug info
         print(f"Numero totale di slot disponibili: {len(self.slot_disponibili)}")
@@ -552,20 +908,315 @@ class CalendarioGenerator:
             total_teaching_hours = sum(ore_totali_docente.values())
             self.P_per_classe[classe] = (self.ore_tot_civics / total_teaching_hours) * 100 if total_teaching_hours > 0 else 0
 
+        # Parte congelata del calendario (vedi _applica_congelamento): senza data di congelamento
+        # non ci sono ore già svolte e ogni classe deve ricevere tutte le ore_tot_civics
+        self.data_congelamento = None
+        self.calendario_congelato = []
+        self.ore_perse_base = defaultdict(lambda: defaultdict(int))
+        self.ore_target_per_classe = {classe: self.ore_tot_civics for classe in self.classi_list}
+
+    def _applica_congelamento(self):
+        # Ripianificazione incrementale: le assegnazioni di seed_calendar precedenti alla data di
+        # congelamento sono già avvenute e restano fisse. Vengono aggregate in ore perse di base
+        # per (classe, docente sostituito) e in ore residue per classe; lo spazio di ricerca si
+        # riduce agli slot futuri delle settimane in cui la classe non ha già svolto civica.
+        if not self.data_congelamento_str:
+            return
+        try:
+            self.data_congelamento = datetime.strptime(self.data_congelamento_str, '%d/%m/%Y')
+        except ValueError as e:
+            logging.error(f"Errore: Formato data non valido per data_congelamento - {_sanitize_for_logging(e)}")
+            raise SystemExit(1)
+        if not self.seed_calendar:
+            logging.error("Errore: data_congelamento richiede seed_calendar con il calendario già svolto")
+            raise SystemExit(1)
+
+        settimane_svolte = set()
+        for riga in self._leggi_calendario(self.seed_calendar):
+            nome_classe = riga['CLASSE']
+            if riga['DATA'] >= self.data_congelamento or nome_classe not in self.ore_target_per_classe:
+                continue
+            self.ore_perse_base[nome_classe][riga['DOCENTE_SOSTITUITO']] += 1
+            self.ore_target_per_classe[nome_classe] -= 1
+            settimane_svolte.add((nome_classe, riga['DATA'].isocalendar()[1]))
+            self.calendario_congelato.append({
+                'CLASSE': nome_classe,
+                'DATA': riga['DATA'].strftime('%d/%m/%Y'),
+                'GIORNO': self.mappa_giorni[riga['DATA'].weekday()],
+                'ORA': riga['ORA'],
+                'DOCENTE_CIVICS': riga['DOCENTE_CIVICS'],
+                'DOCENTE_SOSTITUITO': riga['DOCENTE_SOSTITUITO']
+            })
+
+        for nome_classe, ore in self.ore_target_per_classe.items():
+            if ore < 0:
+                logging.warning(f"La classe {_sanitize_for_logging(nome_classe)} ha già svolto più di {self.ore_tot_civics} ore")
+                self.ore_target_per_classe[nome_classe] = 0
+
+        self.slot_disponibili = [
+            slot for slot in self.slot_disponibili
+            if slot['DATA'] >= self.data_congelamento and (slot['CLASSE'], slot['SETTIMANA']) not in settimane_svolte
+        ]
+        logging.info(f"Congelate {len(self.calendario_congelato)} assegnazioni precedenti al {self.data_congelamento_str}")
+
+    def _docenti_possibili(self, slot):
+        # Docenti civics che possono coprire lo slot. È l'unica regola di ammissibilità: la usano
+        # la costruzione degli individui, gli operatori, il calendario di partenza e il modello
+        # esatto, così un calendario generato dallo strumento resta sempre ammissibile.
+        # Il docente sostituito copre la propria ora solo con allow_teacher_replace_self; gli
+        # altri docenti civics della classe (anche quelli in organico) se disponibili
+        nome_classe = slot['CLASSE']
+        nome_giorno = slot['GIORNO']
+        ora = slot['ORA']
+        docenti_possibili = []
+        for docente_civics in self.docenti_per_classe[nome_classe]:
+            if docente_civics == slot['DOCENTE_SOSTITUITO']:
+                if self.allow_teacher_replace_self:
+                    docenti_possibili.append(docente_civics)
+            elif len(self.disponibilita_civics[docente_civics][nome_giorno]) >= ora and \
+                    self.disponibilita_civics[docente_civics][nome_giorno][ora - 1]:
+                docenti_possibili.append(docente_civics)
+        return docenti_possibili
+
+    def _precalcola_indici_slot(self):
+        # Indici per le mosse sugli slot: per ogni (classe, settimana ISO) l'elenco degli slot
+        # che hanno almeno un docente civics ammissibile, e per ogni slot i docenti ammissibili.
+        # In questo modo spostare un'assegnazione all'interno della settimana costa O(1).
+        self.docenti_possibili_per_slot = {}
+        self.slot_per_classe_settimana = defaultdict(list)
+        for slot in self.slot_disponibili:
+            docenti_possibili = self._docenti_possibili(slot)
+            self.docenti_possibili_per_slot[slot['KEY']] = docenti_possibili
+            if docenti_possibili:
+                self.slot_per_classe_settimana[(slot['CLASSE'], slot['SETTIMANA'])].append(slot['KEY'])
+        self.settimane_per_classe = defaultdict(list)
+        for nome_classe, settimana in self.slot_per_classe_settimana:
+            self.settimane_per_classe[nome_classe].append(settimana)
+
+        # Indice (docente, data, ora) -> cella dell'indice di occupazione dei docenti civics:
+        # ogni slot ha un "tempo" (ordinale della data scolastica e ora) precalcolato
+        self.indice_docente = {docente: i for i, docente in enumerate(self.docenti_civics_classi)}
+        indice_data = {data: i for i, data in enumerate(sorted({slot['DATA'] for slot in self.slot_disponibili}))}
+        ore_max = max((slot['ORA'] for slot in self.slot_disponibili), default=0)
+        self.num_tempi = len(indice_data) * ore_max
+        self.tempo_per_slot = {
+            slot['KEY']: indice_data[slot['DATA']] * ore_max + slot['ORA'] - 1
+            for slot in self.slot_disponibili
+        }
+
+        # Indici interi per la verifica dei vincoli in blocco: per ogni slot la coppia
+        # (classe, settimana) codificata come indice_classe * num_settimane + indice_settimana,
+        # da cui la classe si ricava con una divisione intera
+        self.indice_classe = {}
+        for slot in self.slots_by_key.values():
+            self.indice_classe.setdefault(slot['CLASSE'], len(self.indice_classe))
+        indice_settimana = {s: i for i, s in enumerate(sorted({slot['SETTIMANA'] for slot in self.slots_by_key.values()}))}
+        self.num_settimane = max(1, len(indice_settimana))
+        self.classe_settimana_per_slot = {
+            key: self.indice_classe[slot['CLASSE']] * self.num_settimane + indice_settimana[slot['SETTIMANA']]
+            for key, slot in self.slots_by_key.items()
+        }
+
+    def _cella(self, slot_key, docente):
+        # Cella dell'indice di occupazione per il docente civics assegnato allo slot
+        return self.indice_docente[docente] * self.num_tempi + self.tempo_per_slot[slot_key]
+
+    def costruisci_occupazione(self, individuo):
+        # Costruisce da zero l'indice di occupazione dei docenti civics di un individuo
+        occupazione = OccupazioneDocenti(len(self.indice_docente) * self.num_tempi)
+        for slot_key, docente in individuo.items():
+            occupazione.aggiungi(self._cella(slot_key, docente))
+        return occupazione
+
+    def conta_conflitti_popolazione(self, individui):
+        # Validatore delle doppie prenotazioni per un'intera popolazione: per ogni individuo
+        # restituisce il numero di assegnazioni che sovrappongono un docente civics
+        # a se stesso nella stessa data e ora
+        indice_docente = self.indice_docente
+        tempo_per_slot = self.tempo_per_slot
+        num_tempi = self.num_tempi
+        conflitti = []
+        for individuo in individui:
+            celle = [indice_docente[d] * num_tempi + tempo_per_slot[k] for k, d in individuo.items()]
+            conflitti.append(len(celle) - len(set(celle)))
+        return conflitti
+
     def genera_calendario(self):
         # Funzione principale che esegue l'algoritmo genetico, genera popolazione,
-        # esegue crossover, mutazione, selezione e infine salva i risultati
-
-        logging.info("Inizializzazione della popolazione...")
-        self.initialize_population()
+        # esegue crossover, mutazione, selezione e infine salva i risultati.
+        # Con motore='sa' delega al simulated annealing, con 'pt' al parallel tempering, con
+        # 'tabu' alla ricerca tabu, con 'nsga2' all'algoritmo genetico multi-obiettivo,
+        # con motore='esatto' al solver CP-SAT.
+        # Restituisce la fitness del calendario salvato, o None se non è stato trovato.
+        if self.motore not in ('ga', 'sa', 'pt', 'tabu', 'nsga2', 'esatto'):
+            logging.error(f"Errore: motore di ottimizzazione non valido - {_sanitize_for_logging(self.motore)}")
+            raise SystemExit(1)
+        if self.motore == 'ga' and self.crossover_maschera not in ('blocchi', 'uniforme'):
+            logging.error(f"Errore: crossover_maschera non valida - {_sanitize_for_logging(self.crossover_maschera)}")
+            raise SystemExit(1)
+        if self.motore == 'ga' and self.selezione_operatore not in ('ranking', 'torneo', 'sus'):
+            logging.error(f"Errore: selezione_operatore non valido - {_sanitize_for_logging(self.selezione_operatore)}")
+            raise SystemExit(1)
+        # Le temperature compaiono a denominatore nell'accettazione e nella scala del parallel tempering
+        if self.motore in ('sa', 'pt') and not (self.sa_temperatura_iniziale > 0 and self.sa_temperatura_finale > 0):
+            logging.error(f"Errore: sa_temperatura_iniziale e sa_temperatura_finale devono essere positive - "
+                          f"{_sanitize_for_logging(self.sa_temperatura_iniziale)}, {_sanitize_for_logging(self.sa_temperatura_finale)}")
+            raise SystemExit(1)
+        if self.num_varianti > 1:
+            return self.genera_varianti()
+        if self.motore == 'ga' and self.multi_start > 1:
+            return self.genera_calendario_multi_start()
+        if self.motore == 'sa':
+            return self.genera_calendario_sa()
+        if self.motore == 'pt':
+            return self.genera_calendario_pt()
+        if self.motore == 'tabu':
+            return self.genera_calendario_tabu()
+        if self.motore == 'nsga2':
+            return self.genera_calendario_nsga2()
+        if self.motore == 'esatto':
+            return self.genera_calendario_esatto()
+
+        inizio = time.perf_counter()
+        # Le interruzioni sono gestite già durante l'inizializzazione, che può essere la fase
+        # più lunga: la popolazione generata fino a quel momento viene comunque valutata e salvata
+        with self._gestione_interruzioni():
+            logging.info("Inizializzazione della popolazione...")
+            self.initialize_population()
+
+            if len(self.population) == 0:
+                logging.error("Impossibile generare una popolazione iniziale valida.")
+                return None
+
+            migliore_individuo, migliore_fitness = self._evolvi_popolazione(inizio)
+            # Intensificazione: ricerca tabu sul migliore individuo a convergenza avvenuta
+            if self.tabu_dopo_ga and not self._interruzione_richiesta:
+                migliore_individuo, migliore_fitness = self._intensifica_tabu(migliore_individuo, migliore_fitness, inizio)
+
+        self._salva_andamento_fitness()
+        return self._salva_finale(migliore_individuo, migliore_fitness)
+
+    def genera_varianti(self):
+        # Genera num_varianti calendari alternativi con semi diversi, distribuiti sui core.
+        # Dati e lookup sono preparati una sola volta e condivisi con i worker; ogni variante
+        # è salvata in cartella_output/variante_<n> e riepilogo_varianti.csv le ordina per fitness.
+        semi = self._semi(self.num_varianti)
+        logging.info(f"Generazione di {self.num_varianti} varianti...")
+        # Il processo principale ignora le interruzioni: le gestiscono le singole varianti,
+        # che si fermano e salvano il proprio calendario migliore
+        with self._gestione_interruzioni(), self._esecutore(min(self.num_cores, self.num_varianti)) as mappa:
+            risultati = mappa(genera_variante_helper, list(enumerate(semi, start=1)))
+
+        riepilogo = []
+        for indice, fitness in risultati:
+            if fitness is None:
+                logging.warning(f"Variante {indice}: nessun calendario valido generato")
+            else:
+                riepilogo.append({'VARIANTE': indice, 'FITNESS': fitness, 'CARTELLA': f"variante_{indice}"})
+        riepilogo.sort(key=lambda r: r['FITNESS'])
+        for posizione, riga in enumerate(riepilogo, start=1):
+            riga['POSIZIONE'] = posizione
+
+        os.makedirs(self.cartella_output, exist_ok=True)
+        riepilogo_df = pd.DataFrame(riepilogo, columns=['POSIZIONE', 'VARIANTE', 'FITNESS', 'CARTELLA'])
+        riepilogo_df.to_csv(os.path.join(self.cartella_output, 'riepilogo_varianti.csv'), index=False)
+        if not riepilogo:
+            logging.error("Nessuna variante ha prodotto un calendario valido.")
+            return None
+        logging.info(f"Migliore variante: {riepilogo[0]['VARIANTE']} con fitness {riepilogo[0]['FITNESS']}")
+        return riepilogo[0]['FITNESS']
+
+    def genera_calendario_multi_start(self):
+        # Multi-start: multi_start esecuzioni indipendenti e brevi dell'algoritmo genetico con
+        # semi e strategie diverse (STRATEGIE_MULTI_START), distribuite sui core con i dati
+        # preparati una sola volta. Le esecuzioni condividono la migliore fitness trovata e
+        # quelle nettamente peggiori si fermano in anticipo (racing); si salva il migliore.
+        semi = self._semi(self.multi_start)
+        logging.info(f"Esecuzione di {self.multi_start} avvii indipendenti dell'algoritmo genetico...")
+        self._incumbente = multiprocessing.Value('d', float('inf'))
+        try:
+            with self._gestione_interruzioni(), self._esecutore(min(self.num_cores, self.multi_start)) as mappa:
+                risultati = mappa(esegui_avvio_helper, list(enumerate(semi, start=1)))
+        finally:
+            self._incumbente = None
+
+        riepilogo = []
+        for indice, fitness, _, andamento, fermato in risultati:
+            strategia = self.STRATEGIE_MULTI_START[(indice - 1) % len(self.STRATEGIE_MULTI_START)]
+            riepilogo.append({
+                'AVVIO': indice,
+                'STRATEGIA': ' '.join(f"{nome}={valore}" for nome, valore in strategia.items()),
+                'FITNESS': fitness,
+                'GENERAZIONI': len(andamento),
+                'FERMATO_IN_ANTICIPO': fermato,
+            })
+        os.makedirs(self.cartella_output, exist_ok=True)
+        riepilogo_df = pd.DataFrame(riepilogo, columns=['AVVIO', 'STRATEGIA', 'FITNESS', 'GENERAZIONI', 'FERMATO_IN_ANTICIPO'])
+        riepilogo_df.to_csv(os.path.join(self.cartella_output, 'riepilogo_multi_start.csv'), index=False)
 
-        if len(self.population) == 0:
+        validi = [r for r in risultati if r[1] is not None]
+        if not validi:
             logging.error("Impossibile generare una popolazione iniziale valida.")
-            return
+            return None
+        indice, migliore_fitness, migliore_individuo, andamento, _ = min(validi, key=lambda r: r[1])
+        logging.info(f"Migliore avvio: {indice} con fitness {migliore_fitness}")
+        self.andamento_fitness = andamento
+        self._salva_andamento_fitness()
+        return self._salva_finale(migliore_individuo, migliore_fitness)
+
+    def esegui_avvio(self):
+        # Una esecuzione del multi-start: popolazione iniziale ed evoluzione senza salvataggio.
+        # Restituisce (fitness, individuo, andamento della fitness, fermato dal racing)
+        self._azzera_stato_evoluzione()
+        with self._gestione_interruzioni():
+            self.initialize_population()
+            if len(self.population) == 0:
+                return None, None, [], False
+            migliore_individuo, migliore_fitness = self._evolvi_popolazione(time.perf_counter())
+        return migliore_fitness, migliore_individuo, self.andamento_fitness, self.fermato_dal_racing
+
+    @contextmanager
+    def _esecutore(self, processi=None):
+        # Fornisce una funzione map(helper, argomenti): su un pool di processi se processi > 1,
+        # altrimenti in serie nel processo corrente. La versione seriale serve anche dentro i
+        # worker (ad esempio per le varianti), che non possono aprire pool propri: l'istanza
+        # del worker va ripristinata all'uscita, altrimenti i task successivi copierebbero
+        # quella dell'ultima variante (con la sua cartella e il suo stato) invece dell'originale.
+        global _worker_instance
+        processi = self.num_cores if processi is None else processi
+        if processi <= 1:
+            precedente = _worker_instance
+            _worker_instance = self
+            try:
+                yield lambda helper, argomenti: [helper(a) for a in argomenti]
+            finally:
+                _worker_instance = precedente
+        else:
+            with multiprocessing.Pool(processes=processi, initializer=init_worker, initargs=(self,)) as pool:
+                yield pool.map
 
+    def _evolvi_popolazione(self, inizio):
+        # Ciclo dell'algoritmo genetico. Si ferma dopo num_generazioni, per early stopping,
+        # allo scadere di time_budget_seconds (misurato da inizio) o su SIGINT/SIGTERM;
+        # almeno una generazione viene sempre valutata. Restituisce (individuo, fitness) migliori.
         migliore_fitness = float('inf')
         migliore_individuo = None
         generazioni_senza_miglioramento = 0
+        self.andamento_fitness = []
+        self.fermato_dal_racing = False
+        # Con telemetria attiva ogni generazione aggiunge una riga a telemetria.jsonl
+        telemetria = None
+        if self.telemetria:
+            telemetria = Telemetria(os.path.join(self.cartella_output, 'telemetria.jsonl'))
+        self._telemetria = telemetria
+        # Con operatori_adattivi la scelta di crossover e mutazione per ogni figlio è
+        # affidata a due bandit, premiati dai figli migliori dei genitori
+        self.selettori_operatori = None
+        if self.operatori_adattivi:
+            self.selettori_operatori = {
+                'crossover': SelettoreOperatori(['blocchi', 'uniforme', 'nessuno']),
+                'mutazione': SelettoreOperatori(['docente', 'slot', 'entrambe']),
+            }
 
         logging.info("Esecuzione dell'algoritmo genetico...")
         for generazione in range(self.num_generazioni):
@@ -575,12 +1226,46 @@ class CalendarioGenerator:
             self.probabilita_mutazione = self.calcola_probabilita_mutazione(generazioni_senza_miglioramento)
             self.hyperparams['probabilita_mutazione'] = self.probabilita_mutazione
 
+            # I duplicati vengono sostituiti prima della valutazione, per non spendere
+            # valutazioni su individui identici
+            if self.eliminazione_cloni:
+                t0 = time.perf_counter()
+                cloni_sostituiti = self.elimina_cloni()
+                if telemetria is not None:
+                    telemetria.tempo('eliminazione_cloni', time.perf_counter() - t0)
+                    telemetria.conta('cloni_sostituiti', cloni_sostituiti)
+
+            t0 = time.perf_counter()
             self.evaluate_population()
+            t1 = time.perf_counter()
+            if self.selettori_operatori is not None:
+                self._accredita_operatori()
             self.population.sort(key=lambda x: x['fitness'])
+            t2 = time.perf_counter()
+
+            # Fase memetica: ricerca locale sui migliori individui ogni N generazioni
+            if self.ricerca_locale_intervallo > 0 and (generazione + 1) % self.ricerca_locale_intervallo == 0:
+                self.raffina_elite()
+                if telemetria is not None:
+                    telemetria.tempo('ricerca_locale', time.perf_counter() - t2)
 
-            num_elite = max(1, int(self.calcola_elitismo_rate(generazioni_senza_miglioramento) * self.popolazione_size))
+            elitismo_rate = self.calcola_elitismo_rate(generazioni_senza_miglioramento)
+            num_elite = max(1, int(elitismo_rate * self.popolazione_size))
             elite = self.population[:num_elite]
 
+            if telemetria is not None:
+                telemetria.tempo('valutazione', t1 - t0)
+                telemetria.tempo('ordinamento', t2 - t1)
+                fitness_popolazione = [ind['fitness'] for ind in self.population]
+                telemetria.imposta('fitness_migliore', fitness_popolazione[0])
+                telemetria.imposta('fitness_media', statistics.fmean(fitness_popolazione))
+                telemetria.imposta('fitness_dev_std', statistics.pstdev(fitness_popolazione))
+                telemetria.imposta('probabilita_mutazione', self.probabilita_mutazione)
+                telemetria.imposta('elitismo_rate', elitismo_rate)
+                genomi_unici, distanza_media = self.diversita_popolazione()
+                telemetria.imposta('genomi_unici', genomi_unici)
+                telemetria.imposta('distanza_hamming_media', round(distanza_media, 2))
+
             # Controllo miglioramento
             if self.population[0]['fitness'] < migliore_fitness:
                 migliore_fitness = self.population[0]['fitness']
@@ -589,9 +1274,39 @@ class CalendarioGenerator:
             else:
                 generazioni_senza_miglioramento += 1
 
+            secondi = time.perf_counter() - inizio
+            self.andamento_fitness.append({
+                'SECONDI': round(secondi, 3),
+                'GENERAZIONE': generazione + 1,
+                'MIGLIORE_FITNESS': migliore_fitness
+            })
+
+            # Multi-start: si pubblica la propria migliore fitness e ci si ferma se, senza
+            # miglioramenti nell'ultima generazione, si resta oltre il margine dalla migliore
+            if self._incumbente is not None and self._in_svantaggio(migliore_fitness, generazioni_senza_miglioramento):
+                logging.info("Avvio fermato: fitness lontana dalla migliore degli altri avvii.")
+                self.fermato_dal_racing = True
+                if telemetria is not None:
+                    telemetria.scrivi(generazione=generazione + 1, secondi=round(secondi, 3))
+                break
+
             # Early stopping se nessun miglioramento
             if generazioni_senza_miglioramento >= self.early_stopping_n:
                 logging.info("Early stopping attivato.")
+                if telemetria is not None:
+                    telemetria.scrivi(generazione=generazione + 1, secondi=round(secondi, 3))
+                break
+
+            # Interruzione per tempo massimo o segnale: si salva il migliore trovato finora
+            if self.time_budget_seconds > 0 and secondi >= self.time_budget_seconds:
+                logging.info(f"Tempo massimo di {self.time_budget_seconds} secondi raggiunto.")
+                if telemetria is not None:
+                    telemetria.scrivi(generazione=generazione + 1, secondi=round(secondi, 3))
+                break
+            if self._interruzione_richiesta:
+                logging.info("Interruzione richiesta: salvataggio del miglior calendario trovato.")
+                if telemetria is not None:
+                    telemetria.scrivi(generazione=generazione + 1, secondi=round(secondi, 3))
                 break
 
             # Ricombinazione e mutazione per generare la nuova popolazione
@@ -601,50 +1316,594 @@ class CalendarioGenerator:
             # Salvataggio dei risultati della generazione corrente
             # -------------------------------------------
             if self.save_interval > 0 and (generazione + 1) % self.save_interval == 0:
+                t0 = time.perf_counter()
                 generation_dir = os.path.join(self.cartella_output, f"generation_{generazione+1}")
-                os.makedirs(generation_dir, exist_ok=True)
-
-                best_individual = self.population[0]['individuo']
-                best_calendario = self.create_calendario(best_individual)
-
-                # Salva calendar.csv
-                calendario_df = pd.DataFrame(best_calendario)
-                calendario_df = _sanitize_for_excel(calendario_df)
-                calendario_df.to_csv(os.path.join(generation_dir, 'calendar.csv'), index=False)
-
-                # Calcola e salva teachersLost.csv per questa generazione
-                statistiche_classi = self.calcola_statistiche(best_calendario)
-                statistiche_df = pd.DataFrame(statistiche_classi)
-                statistiche_df = _sanitize_for_excel(statistiche_df)
-                statistiche_df.to_csv(os.path.join(generation_dir, 'teachersLost.csv'), index=False)
-
-                # Genera i file Excel anche per la generazione intermedia
-                genera_file_excel(best_calendario, self.classi_df, self.docenti_civics_df, generation_dir)
-
+                self.salva_risultati(self.population[0]['individuo'], generation_dir)
+                if telemetria is not None:
+                    telemetria.tempo('checkpoint', time.perf_counter() - t0)
+
+            if telemetria is not None:
+                telemetria.scrivi(generazione=generazione + 1, secondi=round(time.perf_counter() - inizio, 3))
+
+        self._telemetria = None
+        self.selettori_operatori = None
+        return migliore_individuo, migliore_fitness
+
+    def _in_svantaggio(self, migliore_fitness, generazioni_senza_miglioramento):
+        # Aggiorna la migliore fitness condivisa tra gli avvii e dice se questo avvio, fermo
+        # da almeno una generazione, la supera di più di multi_start_margine (in proporzione)
+        incumbente = self._incumbente
+        with incumbente.get_lock():
+            if migliore_fitness < incumbente.value:
+                incumbente.value = migliore_fitness
+            riferimento = incumbente.value
+        soglia = riferimento + abs(riferimento) * self.multi_start_margine
+        return generazioni_senza_miglioramento > 0 and migliore_fitness > soglia
+
+    def _accredita_operatori(self):
+        # Dopo la valutazione premia gli operatori che hanno prodotto ciascun figlio se la sua
+        # fitness è migliore di quella dei genitori, poi aggiorna le probabilità di scelta
+        for membro in self.population:
+            credito = membro.pop('operatori', None)
+            if credito is not None:
+                self._registra_credito(credito, membro['fitness'] < credito[4])
+        for selettore in self.selettori_operatori.values():
+            selettore.aggiorna()
+        if self._telemetria is not None:
+            self._telemetria.imposta('operatori', {nome: selettore.statistiche()
+                                                   for nome, selettore in self.selettori_operatori.items()})
+
+    def _registra_credito(self, credito, migliorato):
+        crossover, mutazione, secondi_crossover, secondi_mutazione, _ = credito
+        self.selettori_operatori['crossover'].registra(crossover, secondi_crossover, migliorato)
+        self.selettori_operatori['mutazione'].registra(mutazione, secondi_mutazione, migliorato)
+
+    @contextmanager
+    def _gestione_interruzioni(self, azzera=True):
+        # Durante l'evoluzione SIGINT e SIGTERM non terminano il processo ma chiedono di fermarsi
+        # alla fine della generazione corrente, così il miglior calendario viene comunque salvato.
+        # I worker del pool ripristinano i propri gestori in init_worker; quelli del servizio e
+        # del lotto di scuole non ne installano (init_worker_senza_gestori). Con azzera=False una richiesta già ricevuta
+        # resta valida (task eseguiti in serie dentro un'altra gestione delle interruzioni).
+        if azzera:
+            self._interruzione_richiesta = False
+
+        def gestore(signum, frame):
+            logging.warning(f"Ricevuto segnale {signum}: interruzione al termine della generazione corrente")
+            self._interruzione_richiesta = True
+
+        precedenti = {}
+        for segnale in (signal.SIGINT, signal.SIGTERM) if _gestori_segnale else ():
+            try:
+                precedenti[segnale] = signal.signal(segnale, gestore)
+            except ValueError:
+                # I gestori di segnale si possono installare solo dal thread principale
+                pass
+        try:
+            yield
+        finally:
+            for segnale, gestore_precedente in precedenti.items():
+                signal.signal(segnale, gestore_precedente)
+
+    def _salva_andamento_fitness(self):
+        # Salva l'andamento della migliore fitness rispetto al tempo trascorso, utile per
+        # scegliere time_budget_seconds
+        os.makedirs(self.cartella_output, exist_ok=True)
+        andamento_df = pd.DataFrame(self.andamento_fitness)
+        andamento_df.to_csv(os.path.join(self.cartella_output, 'andamento_fitness.csv'), index=False)
+
+    def _salva_finale(self, migliore_individuo, migliore_fitness):
+        # Salvataggio finale comune a tutti i motori di ottimizzazione
         logging.info("Migliore individuo trovato con fitness: {}".format(migliore_fitness))
 
-        # -------------------------
-        # Salvataggio finale
-        # -------------------------
-        calendario = self.create_calendario(migliore_individuo)
+        # Controllo finale delle sovrapposizioni dei docenti civics tra classi diverse
+        conflitti = self.conta_conflitti_popolazione([migliore_individuo])[0]
+        if conflitti > 0:
+            logging.warning(f"Il calendario finale contiene {conflitti} sovrapposizioni di docenti civics")
+
+        logging.info("Salvataggio del calendario finale e delle statistiche in calendar.csv e teachersLost.csv...")
+        self.salva_risultati(migliore_individuo, self.cartella_output)
+        logging.info("File Excel finali generati con successo!")
+        return migliore_fitness
 
-        if not os.path.exists(self.cartella_output):
-            os.makedirs(self.cartella_output)
+    def salva_risultati(self, individuo, cartella, excel=True):
+        # Salva calendar.csv, teachersLost.csv e (con excel) i file Excel dell'individuo nella
+        # cartella indicata
+        os.makedirs(cartella, exist_ok=True)
+        calendario = self.calendario_congelato + self.create_calendario(individuo)
 
-        logging.info("Salvataggio del calendario finale in calendar.csv...")
         calendario_df = pd.DataFrame(calendario)
         calendario_df = _sanitize_for_excel(calendario_df)
-        calendario_df.to_csv(os.path.join(self.cartella_output, 'calendar.csv'), index=False)
+        calendario_df.to_csv(os.path.join(cartella, 'calendar.csv'), index=False)
 
-        logging.info("Salvataggio delle statistiche finali in teachersLost.csv...")
         statistiche_classi = self.calcola_statistiche(calendario)
         statistiche_df = pd.DataFrame(statistiche_classi)
         statistiche_df = _sanitize_for_excel(statistiche_df)
-        statistiche_df.to_csv(os.path.join(self.cartella_output, 'teachersLost.csv'), index=False)
+        statistiche_df.to_csv(os.path.join(cartella, 'teachersLost.csv'), index=False)
 
-        logging.info("Generazione dei file Excel finali...")
-        genera_file_excel(calendario, self.classi_df, self.docenti_civics_df, self.cartella_output)
-        logging.info("File Excel finali generati con successo!")
+        if excel:
+            genera_file_excel(calendario, self.classi_df, self.docenti_civics_df, cartella)
+
+    def genera_calendario_sa(self):
+        # Motore alternativo all'algoritmo genetico: riavvii indipendenti di simulated
+        # annealing eseguiti in parallelo sui num_cores processi; si salva il migliore
+        num_riavvii = self.sa_riavvii if self.sa_riavvii > 0 else self.num_cores
+        semi = self._semi(num_riavvii)
+
+        logging.info(f"Esecuzione di {num_riavvii} riavvii di simulated annealing...")
+        with self._esecutore(min(self.num_cores, num_riavvii)) as mappa:
+            risultati = mappa(simulated_annealing_helper, semi)
+
+        risultati = [r for r in risultati if r is not None]
+        if not risultati:
+            logging.error("Impossibile generare una soluzione iniziale valida.")
+            return None
+
+        migliore_individuo, migliore_fitness = min(risultati, key=lambda r: r[1])
+        return self._salva_finale(migliore_individuo, migliore_fitness)
+
+    def genera_calendario_pt(self):
+        # Parallel tempering: pt_repliche catene di annealing a temperatura fissa, su una scala
+        # geometrica tra sa_temperatura_finale e sa_temperatura_iniziale, eseguite in parallelo
+        # per pt_passi_scambio mosse alla volta. Tra un turno e l'altro le catene a temperature
+        # vicine si scambiano gli stati con la regola di Metropolis, così le soluzioni migliori
+        # scendono verso le temperature basse mentre quelle alte continuano a esplorare.
+        # Il totale di mosse per catena è sa_iterazioni; si salva il migliore stato visitato.
+        num_repliche = max(2, self.pt_repliche)
+        temperature = [self.sa_temperatura_finale * (self.sa_temperatura_iniziale / self.sa_temperatura_finale)
+                       ** (k / (num_repliche - 1)) for k in range(num_repliche)]
+        passi = max(1, self.pt_passi_scambio)
+        num_turni = max(1, self.sa_iterazioni // passi)
+        inizio = time.perf_counter()
+        self.andamento_fitness = []
+
+        logging.info(f"Parallel tempering con {num_repliche} repliche e {num_turni} turni di scambio...")
+        with self._gestione_interruzioni(), self._esecutore(min(self.num_cores, num_repliche)) as mappa:
+            stati = []
+            tentativi = 0
+            while len(stati) < num_repliche and tentativi < num_repliche * 10:
+                mancanti = num_repliche - len(stati)
+                stati += [ind for ind in mappa(genera_individuo_random_helper, self._semi(mancanti)) if ind is not None]
+                tentativi += mancanti
+            if len(stati) < num_repliche:
+                logging.error("Impossibile generare una soluzione iniziale valida.")
+                return None
+
+            costi = [None] * num_repliche
+            migliore_individuo, migliore_costo = None, float('inf')
+            scambi_proposti = scambi_accettati = 0
+            for turno in range(num_turni):
+                argomenti = list(zip(stati, temperature, [passi] * num_repliche, self._semi(num_repliche)))
+                risultati = mappa(catena_pt_helper, argomenti)
+                for k, (individuo, costo, migliore, costo_migliore_catena) in enumerate(risultati):
+                    stati[k], costi[k] = individuo, costo
+                    if costo_migliore_catena < migliore_costo:
+                        migliore_individuo, migliore_costo = migliore, costo_migliore_catena
+
+                # Scambi tra livelli vicini, alternando le coppie pari e dispari a ogni turno
+                for k in range(turno % 2, num_repliche - 1, 2):
+                    scambi_proposti += 1
+                    esponente = (1 / temperature[k] - 1 / temperature[k + 1]) * (costi[k] - costi[k + 1])
+                    if esponente >= 0 or self.rng.random() < math.exp(esponente):
+                        stati[k], stati[k + 1] = stati[k + 1], stati[k]
+                        costi[k], costi[k + 1] = costi[k + 1], costi[k]
+                        scambi_accettati += 1
+
+                secondi = time.perf_counter() - inizio
+                self.andamento_fitness.append({
+                    'SECONDI': round(secondi, 3),
+                    'GENERAZIONE': turno + 1,
+                    'MIGLIORE_FITNESS': migliore_costo
+                })
+                if self.time_budget_seconds > 0 and secondi >= self.time_budget_seconds:
+                    logging.info(f"Tempo massimo di {self.time_budget_seconds} secondi raggiunto.")
+                    break
+                if self._interruzione_richiesta:
+                    logging.info("Interruzione richiesta: salvataggio del miglior calendario trovato.")
+                    break
+
+        if scambi_proposti:
+            logging.info(f"Scambi tra repliche accettati: {scambi_accettati}/{scambi_proposti}")
+        self._salva_andamento_fitness()
+        return self._salva_finale(migliore_individuo, self.calcola_fitness(migliore_individuo))
+
+    def genera_calendario_tabu(self):
+        # Motore a ricerca tabu: un avvio indipendente per core da un individuo casuale
+        # valido, ciascuno con tabu_iterazioni iterazioni; si salva il migliore
+        num_avvii = max(1, self.num_cores)
+        semi = self._semi(num_avvii)
+
+        logging.info(f"Esecuzione di {num_avvii} ricerche tabu...")
+        with self._gestione_interruzioni(), self._esecutore(num_avvii) as mappa:
+            risultati = mappa(ricerca_tabu_helper, semi)
+
+        risultati = [r for r in risultati if r is not None]
+        if not risultati:
+            logging.error("Impossibile generare una soluzione iniziale valida.")
+            return None
+
+        migliore_individuo, migliore_fitness = min(risultati, key=lambda r: r[1])
+        return self._salva_finale(migliore_individuo, migliore_fitness)
+
+    def _intensifica_tabu(self, migliore_individuo, migliore_fitness, inizio):
+        # Ricerca tabu a partire dal migliore individuo dell'algoritmo genetico, entro il tempo
+        # rimasto di time_budget_seconds; restituisce il migliore tra i due
+        scadenza = inizio + self.time_budget_seconds if self.time_budget_seconds > 0 else None
+        logging.info("Intensificazione con ricerca tabu sul migliore individuo...")
+        individuo, fitness = self.ricerca_tabu(migliore_individuo, scadenza=scadenza)
+        if fitness < migliore_fitness:
+            logging.info(f"Ricerca tabu: fitness migliorata da {migliore_fitness} a {fitness}")
+            return individuo, fitness
+        return migliore_individuo, migliore_fitness
+
+    def genera_calendario_nsga2(self):
+        # Algoritmo genetico multi-obiettivo NSGA-II: le componenti della fitness restano separate
+        # (componenti_fitness) e si evolve il fronte di Pareto. Genitori per torneo binario su
+        # rango e distanza di affollamento, sopravvivenza dei migliori fronti tra genitori e
+        # figli. Si ferma dopo num_generazioni, allo scadere di time_budget_seconds o su
+        # SIGINT/SIGTERM. Il fronte finale è salvato con _salva_fronte_pareto; i file principali
+        # contengono la soluzione del fronte con la fitness pesata migliore.
+        inizio = time.perf_counter()
+        self.selettori_operatori = None
+        self.andamento_fitness = []
+        with self._gestione_interruzioni():
+            logging.info("Inizializzazione della popolazione...")
+            self.initialize_population()
+            if len(self.population) == 0:
+                logging.error("Impossibile generare una popolazione iniziale valida.")
+                return None
+
+            logging.info("Esecuzione dell'algoritmo genetico multi-obiettivo (NSGA-II)...")
+            self._valuta_obiettivi(self.population)
+            self.population = self._sopravvivenza_nsga2(self.population)
+            for generazione in range(self.num_generazioni):
+                logging.info(f"Generazione {generazione + 1}/{self.num_generazioni}")
+                figli = self._riproduci(self._torneo_nsga2(), [])
+                self._valuta_obiettivi(figli)
+                self.population = self._sopravvivenza_nsga2(self.population + figli)
+
+                secondi = time.perf_counter() - inizio
+                self.andamento_fitness.append({
+                    'SECONDI': round(secondi, 3),
+                    'GENERAZIONE': generazione + 1,
+                    'MIGLIORE_FITNESS': min(membro['fitness'] for membro in self.population),
+                    'DIMENSIONE_FRONTE': sum(1 for membro in self.population if membro['rango'] == 0),
+                })
+                if self.time_budget_seconds > 0 and secondi >= self.time_budget_seconds:
+                    logging.info("Tempo massimo raggiunto.")
+                    break
+                if self._interruzione_richiesta:
+                    logging.info("Interruzione richiesta: salvataggio del fronte trovato.")
+                    break
+
+        fronte = [membro for membro in self.population if membro['rango'] == 0]
+        self._salva_andamento_fitness()
+        self._salva_fronte_pareto(fronte)
+        migliore = min(fronte, key=lambda membro: membro['fitness'])
+        return self._salva_finale(migliore['individuo'], migliore['fitness'])
+
+    def _valuta_obiettivi(self, membri):
+        # Calcola in parallelo le componenti della fitness dei membri, che conservano anche
+        # la fitness pesata per il confronto con gli altri motori
+        with self._esecutore() as mappa:
+            risultati = mappa(componenti_fitness_helper, [membro['individuo'] for membro in membri])
+        for membro, componenti in zip(membri, risultati):
+            membro['obiettivi'] = componenti
+            membro['fitness'] = self._fitness_pesata(componenti)
+
+    def _sopravvivenza_nsga2(self, membri):
+        # Tiene popolazione_size membri per fronti successivi; l'ultimo fronte che non entra
+        # per intero è troncato tenendo i membri meno affollati. Assegna a ogni membro
+        # 'rango' (indice del fronte) e 'affollamento', usati dal torneo
+        obiettivi = [membro['obiettivi'] for membro in membri]
+        sopravvissuti = []
+        for rango, fronte in enumerate(fronti_non_dominati(obiettivi)):
+            distanza = distanza_affollamento(obiettivi, fronte)
+            for i in fronte:
+                membri[i]['rango'] = rango
+                membri[i]['affollamento'] = distanza[i]
+            posti = self.popolazione_size - len(sopravvissuti)
+            if len(fronte) > posti:
+                fronte = sorted(fronte, key=lambda i: -distanza[i])[:posti]
+            sopravvissuti.extend(membri[i] for i in fronte)
+            if len(sopravvissuti) >= self.popolazione_size:
+                break
+        return sopravvissuti
+
+    def _torneo_nsga2(self):
+        # Torneo binario: vince il membro di rango minore e, a parità, quello meno affollato.
+        # Restituisce len(population) indici nella popolazione, come selezione_indici
+        n = len(self.population)
+        genitori = []
+        for _ in range(n):
+            a = self.rng.randrange(n)
+            b = self.rng.randrange(n)
+            membro_a = self.population[a]
+            membro_b = self.population[b]
+            if (membro_b['rango'], -membro_b['affollamento']) < (membro_a['rango'], -membro_a['affollamento']):
+                a = b
+            genitori.append(a)
+        return genitori
+
+    def _salva_fronte_pareto(self, fronte):
+        # Salva i calendari distinti del fronte di Pareto in cartella_output/fronte_pareto/
+        # soluzione_<n> (al più nsga2_max_soluzioni, privilegiando i meno affollati, cioè
+        # gli estremi e le zone rade del fronte) e fronte_pareto.csv con le componenti della
+        # fitness di ciascuno, per scegliere il compromesso senza rieseguire l'ottimizzazione.
+        # Per ogni soluzione si scrivono solo i CSV: i file Excel, lenti da generare, restano
+        # quelli della soluzione principale
+        distinti = {}
+        for membro in sorted(fronte, key=lambda m: -m['affollamento']):
+            distinti.setdefault(frozenset(membro['individuo'].items()), membro)
+        scelti = list(distinti.values())
+        if self.nsga2_max_soluzioni > 0:
+            scelti = scelti[:self.nsga2_max_soluzioni]
+        scelti.sort(key=lambda membro: membro['fitness'])
+
+        cartella_fronte = os.path.join(self.cartella_output, 'fronte_pareto')
+        riepilogo = []
+        for indice, membro in enumerate(scelti, start=1):
+            cartella = f"soluzione_{indice}"
+            self.salva_risultati(membro['individuo'], os.path.join(cartella_fronte, cartella), excel=False)
+            deviazione, varianza, percentuale_massima, penalita = membro['obiettivi']
+            riepilogo.append({
+                'SOLUZIONE': indice,
+                'DEVIAZIONE': deviazione,
+                'VARIANZA': varianza,
+                'PERCENTUALE_MASSIMA': percentuale_massima,
+                'PENALITA': penalita,
+                'FITNESS': membro['fitness'],
+                'CARTELLA': cartella,
+            })
+        os.makedirs(cartella_fronte, exist_ok=True)
+        riepilogo_df = pd.DataFrame(riepilogo, columns=['SOLUZIONE', 'DEVIAZIONE', 'VARIANZA', 'PERCENTUALE_MASSIMA',
+                                                        'PENALITA', 'FITNESS', 'CARTELLA'])
+        riepilogo_df.to_csv(os.path.join(cartella_fronte, 'fronte_pareto.csv'), index=False)
+        logging.info(f"Fronte di Pareto: {len(fronte)} membri, {len(scelti)} calendari salvati in {cartella_fronte}")
+
+    def genera_calendario_esatto(self):
+        # Motore esatto: risolve il modello CP-SAT entro esatto_tempo_max secondi e salva
+        # la migliore soluzione ammissibile secondo calcola_fitness
+        soluzioni = [s for s in self.risolvi_esatto() if self.verifica_vincoli(s)]
+        if not soluzioni:
+            logging.error("Nessuna soluzione ammissibile trovata dal solver entro il tempo limite.")
+            return None
+
+        fitness = [self.calcola_fitness(s) for s in soluzioni]
+        migliore = min(range(len(soluzioni)), key=lambda i: fitness[i])
+        return self._salva_finale(soluzioni[migliore], fitness[migliore])
+
+    def costruisci_modello_esatto(self):
+        # Costruisce il modello CP-SAT a partire dalle strutture di lookup: una variabile booleana
+        # per ogni coppia (slot, docente civics ammissibile), con i vincoli di ore esatte per classe,
+        # massimo un'ora a settimana per classe e nessun docente in due classi nella stessa data e ora.
+        # L'obiettivo è la fitness (deviazione nulla per costruzione) moltiplicata per SCALA_ESATTO e
+        # arrotondata: i termini per docente (fasce di penalità, penalità per percentuali alte e
+        # quadrati delle percentuali) sono tabulati in funzione delle ore perse, il quadrato della
+        # media usa un prodotto e una divisione intera, senza arrotondarne il coefficiente.
+        # Restituisce (modello, variabili) con variabili indicizzate per (slot_key, docente).
+        scala = self.SCALA_ESATTO
+        # Le percentuali sono intere, in unità di un decimillesimo di punto percentuale
+        unita = 10 ** 4
+        modello = cp_model.CpModel()
+        variabili = {}
+        per_classe = defaultdict(list)
+        per_cella = defaultdict(list)
+        per_classe_docente = defaultdict(list)
+
+        for (nome_classe, settimana), chiavi in self.slot_per_classe_settimana.items():
+            per_settimana = []
+            for key in chiavi:
+                sostituito = self.slots_by_key[key]['DOCENTE_SOSTITUITO']
+                for docente in self.docenti_possibili_per_slot[key]:
+                    var = modello.NewBoolVar(f"x{len(variabili)}")
+                    variabili[(key, docente)] = var
+                    per_settimana.append(var)
+                    per_classe[nome_classe].append(var)
+                    per_cella[self._cella(key, docente)].append(var)
+                    per_classe_docente[(nome_classe, sostituito)].append(var)
+            modello.AddAtMostOne(per_settimana)
+
+        for vars_cella in per_cella.values():
+            if len(vars_cella) > 1:
+                modello.AddAtMostOne(vars_cella)
+
+        obiettivo = []
+        for nome_classe in self.classi_list:
+            modello.Add(sum(per_classe[nome_classe]) == self.ore_target_per_classe[nome_classe])
+
+            ore_totali_docente = self.ore_totali_docente_per_classe[nome_classe]
+            n = len(ore_totali_docente)
+            if n == 0:
+                continue
+            _, max_p_base, p_tot_base = self._calcola_penalita_classe(nome_classe, {})
+            # Costo della classe senza ore perse, costante rispetto alle variabili
+            obiettivo.append(round(scala * (max_p_base + p_tot_base)))
+            ore_perse_base = self.ore_perse_base[nome_classe]
+            somma_percentuali = []
+            for docente, ore_totali in ore_totali_docente.items():
+                base = ore_perse_base.get(docente, 0)
+                ore_max = max(0, min(ore_totali - base, self.ore_target_per_classe[nome_classe]))
+                ore_perse = modello.NewIntVar(0, ore_max, f"L{len(obiettivo)}")
+                modello.Add(ore_perse == sum(per_classe_docente[(nome_classe, docente)]))
+
+                # Percentuali e costo per docente in funzione delle ore perse (comprese quelle
+                # già svolte prima della data di congelamento)
+                tab_percentuale = [round((base + ore) * 100 * unita / ore_totali) for ore in range(ore_max + 1)]
+                tab_costo = []
+                for ore in range(ore_max + 1):
+                    _, max_p, p_tot = self._calcola_penalita_classe(nome_classe, {docente: base + ore})
+                    varianza_parziale = 5 * ((base + ore) * 100 / ore_totali) ** 2 / n
+                    tab_costo.append(round(scala * (max_p - max_p_base + p_tot - p_tot_base + varianza_parziale)))
+
+                percentuale = modello.NewIntVar(0, 100 * unita, f"q{len(obiettivo)}")
+                costo = modello.NewIntVar(min(tab_costo), max(tab_costo), f"c{len(obiettivo)}")
+                modello.AddElement(ore_perse, tab_percentuale, percentuale)
+                modello.AddElement(ore_perse, tab_costo, costo)
+                somma_percentuali.append(percentuale)
+                obiettivo.append(costo)
+
+            # Termine -5 * media^2 = -5 * somma^2 / (n^2 * unita^2) in scala: il numeratore
+            # scala * 5 * somma^2 è diviso per n^2 * unita^2 con una divisione intera, con un errore
+            # inferiore a un'unità di scala invece di arrotondare il coefficiente
+            somma = modello.NewIntVar(0, 100 * unita * n, f"s_{len(obiettivo)}")
+            modello.Add(somma == sum(somma_percentuali))
+            quadrato = modello.NewIntVar(0, (100 * unita * n) ** 2, f"s2_{len(obiettivo)}")
+            modello.AddMultiplicationEquality(quadrato, [somma, somma])
+            divisore = n * n * unita * unita
+            fattore = math.gcd(scala * 5, divisore)
+            media_quadra = modello.NewIntVar(0, (100 * unita * n) ** 2 * (scala * 5 // fattore) // (divisore // fattore),
+                                             f"m2_{len(obiettivo)}")
+            modello.AddDivisionEquality(media_quadra, quadrato * (scala * 5 // fattore), divisore // fattore)
+            obiettivo.append(-media_quadra)
+
+        modello.Minimize(sum(obiettivo))
+        return modello, variabili
+
+    def risolvi_esatto(self, tempo_max=None):
+        # Risolve il modello CP-SAT entro il tempo limite e restituisce le soluzioni incumbent
+        # trovate (al massimo esatto_max_soluzioni), dalla migliore alla peggiore
+        if cp_model is None:
+            logging.error("Errore: il motore esatto richiede OR-Tools (pip install ortools)")
+            raise SystemExit(1)
+        if tempo_max is None:
+            tempo_max = self.esatto_tempo_max
+
+        logging.info("Costruzione del modello CP-SAT...")
+        modello, variabili = self.costruisci_modello_esatto()
+        soluzioni = []
+
+        class RaccoltaSoluzioni(cp_model.CpSolverSolutionCallback):
+            def on_solution_callback(self):
+                soluzioni.append({key: docente for (key, docente), var in variabili.items() if self.Value(var)})
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = tempo_max
+        solver.parameters.num_workers = self.num_cores
+        logging.info(f"Risoluzione con CP-SAT ({len(variabili)} variabili, limite {tempo_max}s)...")
+        stato = solver.Solve(modello, RaccoltaSoluzioni())
+        logging.info(f"CP-SAT: stato {solver.StatusName(stato)}, {len(soluzioni)} soluzioni trovate")
+
+        return soluzioni[::-1][:self.esatto_max_soluzioni]
+
+    def _temperatura_sa(self, iterazione, num_iterazioni):
+        # Temperatura all'iterazione corrente secondo lo schema di raffreddamento configurato
+        frazione = iterazione / max(1, num_iterazioni - 1)
+        t_iniziale = self.sa_temperatura_iniziale
+        t_finale = self.sa_temperatura_finale
+        if self.sa_raffreddamento == 'lineare':
+            return t_iniziale + (t_finale - t_iniziale) * frazione
+        return t_iniziale * (t_finale / t_iniziale) ** frazione
+
+    def simulated_annealing(self, iterazioni=None):
+        # Simulated annealing su una singola soluzione: parte da un individuo casuale valido e
+        # sposta le assegnazioni su altri slot ammissibili della stessa settimana o su una
+        # settimana libera della classe, mantenendo per costruzione i vincoli di verifica_vincoli.
+        # Il costo è valutato in modo incrementale sulla sola classe coinvolta.
+        # Restituisce (individuo, fitness) del migliore stato visitato, oppure None.
+        if iterazioni is None:
+            iterazioni = self.sa_iterazioni
+
+        individuo = None
+        for _ in range(10):
+            individuo = self.genera_individuo_base(strategy='random')
+            if individuo is not None:
+                break
+        if individuo is None:
+            return None
+
+        stato = self._stato_sa(individuo)
+        migliore, _ = self._mosse_sa(stato, iterazioni, lambda iterazione: self._temperatura_sa(iterazione, iterazioni))
+        return migliore, self.calcola_fitness(migliore)
+
+    def _stato_sa(self, individuo):
+        # Stato di una catena di annealing: l'individuo (modificato sul posto) con l'indice di
+        # occupazione, le settimane occupate e le ore perse per classe e il costo per classe
+        stato = {
+            'individuo': individuo,
+            'occupazione': self.costruisci_occupazione(individuo),
+            'chiavi': list(individuo),
+            'settimane_occupate': defaultdict(set),
+            'ore_perse': defaultdict(lambda: defaultdict(int)),
+        }
+        for classe, ore_perse_base in self.ore_perse_base.items():
+            stato['ore_perse'][classe].update(ore_perse_base)
+        for key in stato['chiavi']:
+            slot_info = self.slots_by_key[key]
+            stato['settimane_occupate'][slot_info['CLASSE']].add(slot_info['SETTIMANA'])
+            stato['ore_perse'][slot_info['CLASSE']][slot_info['DOCENTE_SOSTITUITO']] += 1
+        stato['costo_classe'] = {classe: self._calcola_costo_classe(classe, stato['ore_perse'][classe])
+                                 for classe in self.classi_list}
+        stato['costo'] = sum(stato['costo_classe'].values())
+        return stato
+
+    def _mosse_sa(self, stato, iterazioni, temperatura):
+        # Applica iterazioni mosse di annealing allo stato con temperatura(iterazione).
+        # Restituisce (individuo, costo) del migliore stato visitato
+        individuo = stato['individuo']
+        occupazione = stato['occupazione']
+        chiavi = stato['chiavi']
+        settimane_occupate = stato['settimane_occupate']
+        ore_perse_per_classe_docente = stato['ore_perse']
+        costo_classe = stato['costo_classe']
+        costo_totale = stato['costo']
+        migliore = dict(individuo)
+        costo_migliore = costo_totale
+
+        for iterazione in range(iterazioni):
+            if not chiavi:
+                break
+            t = temperatura(iterazione)
+            i = self.rng.randrange(len(chiavi))
+            key = chiavi[i]
+            slot_info = self.slots_by_key[key]
+            classe = slot_info['CLASSE']
+            settimana = slot_info['SETTIMANA']
+
+            # Spostamento nella stessa settimana o in una settimana libera della classe
+            nuova_settimana = settimana
+            if self.rng.random() < 0.2:
+                nuova_settimana = self.rng.choice(self.settimane_per_classe[classe])
+                if nuova_settimana in settimane_occupate[classe]:
+                    nuova_settimana = settimana
+            candidati = self.slot_per_classe_settimana.get((classe, nuova_settimana))
+            if not candidati:
+                continue
+            nuova_key = self.rng.choice(candidati)
+            if nuova_key == key:
+                continue
+            docente = self._docente_libero(individuo, key, nuova_key, occupazione)
+            if docente is None:
+                continue
+
+            ore_perse = ore_perse_per_classe_docente[classe]
+            sostituito = slot_info['DOCENTE_SOSTITUITO']
+            nuovo_sostituito = self.slots_by_key[nuova_key]['DOCENTE_SOSTITUITO']
+            ore_perse[sostituito] -= 1
+            ore_perse[nuovo_sostituito] += 1
+            nuovo_costo = self._calcola_costo_classe(classe, ore_perse)
+            delta = nuovo_costo - costo_classe[classe]
+
+            if delta <= 0 or (t > 0 and self.rng.random() < math.exp(-delta / t)):
+                occupazione.rimuovi(self._cella(key, individuo[key]))
+                occupazione.aggiungi(self._cella(nuova_key, docente))
+                del individuo[key]
+                individuo[nuova_key] = docente
+                chiavi[i] = nuova_key
+                if nuova_settimana != settimana:
+                    settimane_occupate[classe].discard(settimana)
+                    settimane_occupate[classe].add(nuova_settimana)
+                costo_classe[classe] = nuovo_costo
+                costo_totale += delta
+                if costo_totale < costo_migliore:
+                    costo_migliore = costo_totale
+                    migliore = dict(individuo)
+            else:
+                ore_perse[sostituito] += 1
+                ore_perse[nuovo_sostituito] -= 1
+
+        stato['costo'] = costo_totale
+        return migliore, costo_migliore
 
     def calcola_statistiche(self, calendario):
         # Calcola le statistiche per classe e docente (ore perse, totali e percentuale)
@@ -680,71 +1939,383 @@ class CalendarioGenerator:
         return statistiche_classi
 
     def initialize_population(self):
-        # Generazione della popolazione iniziale con approcci diversi (greedy, batch, random)
+        # Generazione della popolazione iniziale con approcci diversi (greedy, batch, random).
+        # Su richiesta di interruzione smette di generare e tiene gli individui già pronti
         self.population = []
         tentativi = 0
         max_tentativi = self.popolazione_size * 100
 
-        num_greedy = int(0.3 * self.popolazione_size)
-        num_batch = int(0.3 * self.popolazione_size)
+        quota_greedy, quota_batch = self.quote_iniziali
+        num_greedy = int(quota_greedy * self.popolazione_size)
+        num_batch = int(quota_batch * self.popolazione_size)
         num_random = self.popolazione_size - num_greedy - num_batch
 
-        with multiprocessing.Pool(processes=self.num_cores, initializer=init_worker, initargs=(self,)) as pool:
+        # Warm start dal solver esatto: gli incumbent di CP-SAT entrano nella popolazione iniziale
+        if self.esatto_warm_start:
+            for individuo in self.risolvi_esatto()[:self.popolazione_size]:
+                if self.verifica_vincoli(individuo):
+                    self.population.append(self._membro(individuo))
+            logging.info(f"Inseriti {len(self.population)} individui dal solver esatto")
+
+        # Warm start da un calendario precedente: il calendario riparato e alcune sue varianti mutate
+        if self.seed_calendar:
+            individui_seed = self.individui_da_seed(self.seed_calendar)
+            for individuo, occupazione in individui_seed[:self.popolazione_size - len(self.population)]:
+                self.population.append(self._membro(individuo, occupazione))
+            logging.info(f"Inseriti {len(individui_seed)} individui dal calendario {_sanitize_for_logging(self.seed_calendar)}")
+
+        with self._esecutore() as mappa:
             # Generazione con approccio greedy
             logging.info("Generazione popolazione iniziale con approccio greedy...")
-            while len(self.population) < num_greedy and tentativi < max_tentativi:
+            while len(self.population) < num_greedy and tentativi < max_tentativi and not self._interruzione_richiesta:
                 batch_size = min(num_greedy - len(self.population), self.num_cores)
-                results = pool.map(genera_individuo_greedy_helper, [None] * batch_size)
+                results = mappa(genera_individuo_greedy_helper, self._semi(batch_size))
                 for individuo in results:
                     if individuo is not None:
-                        self.population.append({'individuo': individuo})
+                        self.population.append(self._membro(individuo))
                 tentativi += batch_size
 
             # Generazione con approccio per fasce (batch)
             logging.info("Generazione popolazione iniziale con approccio per fasce...")
-            while len(self.population) < num_greedy + num_batch and tentativi < max_tentativi:
+            while len(self.population) < num_greedy + num_batch and tentativi < max_tentativi \
+                    and not self._interruzione_richiesta:
                 batch_size = min(num_batch - (len(self.population) - num_greedy), self.num_cores)
-                results = pool.map(genera_individuo_batch_helper, [None] * batch_size)
+                results = mappa(genera_individuo_batch_helper, self._semi(batch_size))
                 for individuo in results:
                     if individuo is not None:
-                        self.population.append({'individuo': individuo})
+                        self.population.append(self._membro(individuo))
                 tentativi += batch_size
 
             # Generazione con approccio random
             logging.info("Generazione popolazione iniziale con approccio casuale...")
-            while len(self.population) < self.popolazione_size and tentativi < max_tentativi:
+            while len(self.population) < self.popolazione_size and tentativi < max_tentativi \
+                    and not self._interruzione_richiesta:
                 batch_size = min(self.popolazione_size - len(self.population), self.num_cores)
-                results = pool.map(genera_individuo_random_helper, [None] * batch_size)
+                results = mappa(genera_individuo_random_helper, self._semi(batch_size))
                 for individuo in results:
                     if individuo is not None:
-                        self.population.append({'individuo': individuo})
+                        self.population.append(self._membro(individuo))
                 tentativi += batch_size
 
-    def evaluate_population(self):
-        # Calcolo della fitness per ogni individuo della popolazione in parallelo
-        with multiprocessing.Pool(processes=self.num_cores, initializer=init_worker, initargs=(self,)) as pool:
-            fitness_results = pool.map(calcola_fitness_helper, [ind['individuo'] for ind in self.population])
-        for i, fit in enumerate(fitness_results):
-            self.population[i]['fitness'] = fit
+    def _leggi_calendario(self, percorso):
+        # Legge un calendar.csv generato in precedenza e restituisce le righe con data e ora convertite
+        try:
+            calendario_df = pd.read_csv(percorso, dtype=str, keep_default_na=False)
+        except FileNotFoundError as e:
+            logging.error(f"Errore: File non trovato - {_sanitize_for_logging(e.filename)}")
+            raise SystemExit(1)
+        except Exception as e:
+            logging.error(f"Errore durante la lettura del calendario {_sanitize_for_logging(percorso)}: {_sanitize_for_logging(e)}")
+            raise SystemExit(1)
 
-    def select_and_generate_new_population(self, elite):
-        # Selezione e generazione nuova popolazione
-        selected = self.selezione([ind['individuo'] for ind in self.population], [ind['fitness'] for ind in self.population])
-        new_population = elite.copy()
-        while len(new_population) < self.popolazione_size:
-            genitore1 = random.choice(selected)
-            genitore2 = random.choice(selected)
-            if random.random() < self.probabilita_crossover:
-                figlio = self.crossover(genitore1, genitore2)
+        righe = []
+        for _, row in calendario_df.iterrows():
+            try:
+                righe.append({
+                    'CLASSE': row['CLASSE'],
+                    'DATA': datetime.strptime(row['DATA'], '%d/%m/%Y'),
+                    'ORA': int(row['ORA']),
+                    'DOCENTE_CIVICS': row['DOCENTE_CIVICS'],
+                    'DOCENTE_SOSTITUITO': row['DOCENTE_SOSTITUITO']
+                })
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Ignorata riga del calendario non valida: {_sanitize_for_logging(e)}")
+        return righe
+
+    def individuo_da_calendario(self, righe):
+        # Riporta le righe di un calendario alle chiavi degli slot, scartando gli slot che non
+        # esistono più (chiusure, orari cambiati) e i docenti non più ammissibili.
+        # Le righe precedenti alla data di congelamento fanno parte del calendario congelato.
+        individuo = {}
+        scartate = 0
+        for riga in righe:
+            if self.data_congelamento is not None and riga['DATA'] < self.data_congelamento:
+                continue
+            key = f"{riga['CLASSE']}_{riga['DATA'].strftime('%Y%m%d')}_{riga['ORA']}"
+            if riga['DOCENTE_CIVICS'] in self.docenti_possibili_per_slot.get(key, ()):
+                individuo[key] = riga['DOCENTE_CIVICS']
             else:
-                figlio = genitore1.copy()
+                scartate += 1
+        if scartate:
+            logging.info(f"Scartate {scartate} assegnazioni del calendario non più valide")
+        return individuo
 
-            figlio = self.mutazione(figlio)
+    def ripara_individuo(self, individuo):
+        # Ripara un individuo fino all'ammissibilità: elimina le assegnazioni non ammissibili,
+        # quelle nella stessa settimana della classe e le sovrapposizioni dei docenti civics,
+        # poi toglie le ore in eccesso e aggiunge quelle mancanti nelle settimane libere.
+        # Restituisce (individuo, occupazione), oppure None se la classe non si può completare.
+        riparato = {}
+        occupazione = OccupazioneDocenti(len(self.indice_docente) * self.num_tempi)
+        settimane_occupate = defaultdict(set)
+        chiavi_per_classe = defaultdict(list)
+        for key, docente in individuo.items():
+            if docente not in self.docenti_possibili_per_slot.get(key, ()):
+                continue
+            slot_info = self.slots_by_key[key]
+            cella = self._cella(key, docente)
+            if slot_info['SETTIMANA'] in settimane_occupate[slot_info['CLASSE']] or not occupazione.libero(cella):
+                continue
+            riparato[key] = docente
+            occupazione.aggiungi(cella)
+            settimane_occupate[slot_info['CLASSE']].add(slot_info['SETTIMANA'])
+            chiavi_per_classe[slot_info['CLASSE']].append(key)
+
+        for classe in self.classi_list:
+            chiavi = chiavi_per_classe[classe]
+            self.rng.shuffle(chiavi)
+            ore_target = self.ore_target_per_classe[classe]
+            while len(chiavi) > ore_target:
+                key = chiavi.pop()
+                occupazione.rimuovi(self._cella(key, riparato.pop(key)))
+
+            settimane_libere = [s for s in self.settimane_per_classe[classe] if s not in settimane_occupate[classe]]
+            self.rng.shuffle(settimane_libere)
+            for settimana in settimane_libere:
+                if len(chiavi) >= ore_target:
+                    break
+                candidati = list(self.slot_per_classe_settimana[(classe, settimana)])
+                self.rng.shuffle(candidati)
+                for key in candidati:
+                    liberi = [d for d in self.docenti_possibili_per_slot[key] if occupazione.libero(self._cella(key, d))]
+                    if liberi:
+                        riparato[key] = self.rng.choice(liberi)
+                        occupazione.aggiungi(self._cella(key, riparato[key]))
+                        chiavi.append(key)
+                        break
+            if len(chiavi) < ore_target:
+                return None
+        return riparato, occupazione
+
+    def individui_da_seed(self, percorso):
+        # Individui iniziali da un calendario precedente: il calendario riparato e
+        # seed_num_varianti sue varianti mutate. Restituisce una lista di (individuo, occupazione).
+        riparazione = self.ripara_individuo(self.individuo_da_calendario(self._leggi_calendario(percorso)))
+        if riparazione is None:
+            logging.warning("Impossibile riparare il calendario di partenza: verrà ignorato")
+            return []
+
+        individuo, occupazione = riparazione
+        individui = [(individuo, occupazione)]
+        for _ in range(self.seed_num_varianti):
+            variante = dict(individuo)
+            occupazione_variante = occupazione.copia()
+            variante = self.mutazione(variante, occupazione_variante)
+            variante = self.mutazione_slot(variante, occupazione_variante)
+            if self.verifica_vincoli(variante, occupazione_variante):
+                individui.append((variante, occupazione_variante))
+        return individui
 
-            if self.verifica_vincoli(figlio):
-                new_population.append({'individuo': figlio})
+    def evaluate_population(self):
+        # Calcolo della fitness in parallelo per gli individui che non l'hanno già: gli elite
+        # sopravvissuti conservano quella calcolata nelle generazioni precedenti
+        da_valutare = [ind for ind in self.population if 'fitness' not in ind]
+        telemetria = self._telemetria
+        if telemetria is not None:
+            telemetria.conta('cache_hit', len(self.population) - len(da_valutare))
+        if not da_valutare:
+            return
+
+        if telemetria is None:
+            with self._esecutore() as mappa:
+                fitness_results = mappa(calcola_fitness_helper, [ind['individuo'] for ind in da_valutare])
+        else:
+            # Ogni worker restituisce anche il tempo di calcolo, per stimarne l'utilizzo
+            inizio = time.perf_counter()
+            with self._esecutore() as mappa:
+                risultati = mappa(calcola_fitness_cronometrata_helper, [ind['individuo'] for ind in da_valutare])
+            durata = time.perf_counter() - inizio
+            fitness_results = [fitness for fitness, _ in risultati]
+            processi = max(1, self.num_cores)
+            if durata > 0:
+                telemetria.imposta('utilizzo_worker', round(sum(t for _, t in risultati) / (durata * processi), 4))
+
+        for membro, fit in zip(da_valutare, fitness_results):
+            membro['fitness'] = fit
+
+    def diversita_popolazione(self, coppie=50):
+        # Diversità della popolazione: numero di genomi distinti e distanza di Hamming media
+        # (slot con assegnazione diversa) stimata su coppie casuali. Il campionamento usa un
+        # generatore proprio dell'istanza per non alterare il flusso casuale dell'ottimizzazione
+        individui = [membro['individuo'] for membro in self.population]
+        genomi_unici = len({frozenset(individuo.items()) for individuo in individui})
+        if len(individui) < 2:
+            return genomi_unici, 0.0
+        distanze = []
+        for _ in range(coppie):
+            a, b = self._campionatore_diversita.sample(individui, 2)
+            distanze.append(len(a.items() - b.items()) + len(b.keys() - a.keys()))
+        return genomi_unici, statistics.fmean(distanze)
+
+    def elimina_cloni(self):
+        # Sostituisce ogni copia successiva alla prima di un genoma già presente con una sua
+        # variante mutata con probabilita_mutazione_cloni o, se la variante non è valida o è a sua
+        # volta un duplicato, con un nuovo individuo casuale. La prima copia (per gli elite quella
+        # con la fitness già calcolata) resta invariata. Restituisce il numero di sostituzioni
+        visti = set()
+        sostituiti = 0
+        probabilita_mutazione = self.probabilita_mutazione
+        self.probabilita_mutazione = self.probabilita_mutazione_cloni
+        try:
+            for i, membro in enumerate(self.population):
+                genoma = frozenset(membro['individuo'].items())
+                if genoma not in visti:
+                    visti.add(genoma)
+                    continue
+                occupazione = membro['occupazione'].copia()
+                variante = self.mutazione(dict(membro['individuo']), occupazione)
+                variante = self.mutazione_slot(variante, occupazione)
+                genoma = frozenset(variante.items())
+                if genoma not in visti and self.verifica_vincoli(variante, occupazione):
+                    visti.add(genoma)
+                    self.population[i] = self._membro(variante, occupazione)
+                    sostituiti += 1
+                    continue
+                nuovo = self.genera_individuo_base(strategy='random')
+                if nuovo is not None and frozenset(nuovo.items()) not in visti:
+                    visti.add(frozenset(nuovo.items()))
+                    self.population[i] = self._membro(nuovo)
+                    sostituiti += 1
+        finally:
+            self.probabilita_mutazione = probabilita_mutazione
+        return sostituiti
+
+    def _semi(self, quantita):
+        # Semi per i task stocastici eseguiti nei worker: ogni task riparte da un seme proprio,
+        # così il risultato non dipende da quale worker lo esegue
+        return [self.rng.randrange(2 ** 32) for _ in range(quantita)]
+
+    def _membro(self, individuo, occupazione=None):
+        # Voce della popolazione: l'individuo e il suo indice di occupazione dei docenti
+        if occupazione is None:
+            occupazione = self.costruisci_occupazione(individuo)
+        return {'individuo': individuo, 'occupazione': occupazione}
+
+    def raffina_elite(self):
+        # Applica la ricerca locale ai migliori ricerca_locale_top_k individui in parallelo,
+        # sostituendoli solo se la fitness migliora. La popolazione deve essere già ordinata.
+        top_k = min(self.ricerca_locale_top_k, len(self.population))
+        if top_k <= 0:
+            return
+        with self._esecutore(min(self.num_cores, top_k)) as mappa:
+            risultati = mappa(ricerca_locale_helper, list(zip([ind['individuo'] for ind in self.population[:top_k]], self._semi(top_k))))
+
+        migliorati = 0
+        for i, (individuo, fitness) in enumerate(risultati):
+            if fitness < self.population[i]['fitness']:
+                self.population[i] = self._membro(individuo)
+                self.population[i]['fitness'] = fitness
+                migliorati += 1
+        if migliorati:
+            self.population.sort(key=lambda x: x['fitness'])
+        logging.info(f"Ricerca locale: migliorati {migliorati}/{top_k} individui")
 
-        self.population = new_population
+    def select_and_generate_new_population(self, elite):
+        # Selezione e generazione nuova popolazione. I figli sono generati a lotti con un
+        # margine stimato dalla quota di figli validi e verificati insieme con
+        # verifica_vincoli_popolazione; si tengono i validi fino a completare la popolazione.
+        # Con la telemetria si registrano i tempi di ogni fase e i figli scartati
+        telemetria = self._telemetria
+        orologio = time.perf_counter
+        t0 = orologio()
+        genitori = self.selezione_indici([ind['fitness'] for ind in self.population])
+        if telemetria is not None:
+            telemetria.tempo('selezione', orologio() - t0)
+            telemetria.conta('figli_scartati', 0)
+
+        self.population = self._riproduci(genitori, elite.copy())
+
+    def _riproduci(self, genitori, new_population):
+        # Aggiunge a new_population figli validi dei genitori (indici nella popolazione) fino
+        # a popolazione_size membri e la restituisce
+        telemetria = self._telemetria
+        selettori = self.selettori_operatori
+        orologio = time.perf_counter
+        while len(new_population) < self.popolazione_size:
+            mancanti = self.popolazione_size - len(new_population)
+            if telemetria is None and selettori is None:
+                candidati = [self._genera_figlio(genitori) for _ in range(self._dimensione_lotto(mancanti))]
+            else:
+                candidati = [self._genera_figlio_cronometrato(genitori, telemetria, selettori)
+                             for _ in range(self._dimensione_lotto(mancanti))]
+
+            t0 = orologio()
+            validi, _ = self.verifica_vincoli_popolazione([c[0] for c in candidati], [c[1] for c in candidati])
+            nuovi = []
+            for (figlio, occupazione, credito), valido in zip(candidati, validi):
+                if valido:
+                    membro = self._membro(figlio, occupazione)
+                    if credito is not None:
+                        membro['operatori'] = credito
+                    nuovi.append(membro)
+                elif credito is not None:
+                    # Un figlio scartato è tempo speso senza miglioramento
+                    self._registra_credito(credito, False)
+            if telemetria is not None:
+                telemetria.tempo('verifica', orologio() - t0)
+                telemetria.conta('figli_scartati', len(candidati) - len(nuovi))
+            self.tasso_figli_validi = len(nuovi) / len(candidati)
+            new_population.extend(nuovi[:mancanti])
+        return new_population
+
+    def _dimensione_lotto(self, mancanti):
+        # Numero di candidati da generare per ottenere in media mancanti figli validi
+        return math.ceil(mancanti / max(self.tasso_figli_validi, 0.1))
+
+    def _genera_figlio(self, genitori):
+        # Genera un figlio da due genitori estratti da genitori (indici nella popolazione).
+        # L'indice di occupazione del figlio parte da una copia di quello di genitore1 e viene
+        # aggiornato in modo incrementale da crossover e mutazioni.
+        # Restituisce (figlio, occupazione, credito); il credito serve solo agli operatori adattivi
+        genitore1 = self.population[self.rng.choice(genitori)]
+        genitore2 = self.population[self.rng.choice(genitori)]
+        occupazione = genitore1['occupazione'].copia()
+        if self.rng.random() < self.probabilita_crossover:
+            figlio = self.crossover(genitore1['individuo'], genitore2['individuo'], occupazione)
+        else:
+            figlio = genitore1['individuo'].copy()
+
+        figlio = self.mutazione(figlio, occupazione)
+        figlio = self.mutazione_slot(figlio, occupazione)
+        return figlio, occupazione, None
+
+    def _genera_figlio_cronometrato(self, genitori, telemetria, selettori):
+        # Come _genera_figlio, misurando il tempo di ogni fase. Con i selettori adattivi
+        # crossover ('blocchi', 'uniforme' o 'nessuno') e mutazione ('docente', 'slot' o
+        # 'entrambe') sono scelti dai bandit e il credito restituito è
+        # (crossover, mutazione, secondi crossover, secondi mutazione, fitness dei genitori)
+        orologio = time.perf_counter
+        t0 = orologio()
+        genitore1 = self.population[self.rng.choice(genitori)]
+        genitore2 = self.population[self.rng.choice(genitori)]
+        occupazione = genitore1['occupazione'].copia()
+        if selettori is None:
+            crossover = self.crossover_maschera if self.rng.random() < self.probabilita_crossover else 'nessuno'
+            mutazione = 'entrambe'
+        else:
+            crossover = selettori['crossover'].scegli(self.rng)
+            mutazione = selettori['mutazione'].scegli(self.rng)
+        t1 = orologio()
+        if crossover == 'nessuno':
+            figlio = genitore1['individuo'].copy()
+            fitness_genitori = genitore1['fitness']
+        else:
+            figlio = self.crossover(genitore1['individuo'], genitore2['individuo'], occupazione, crossover)
+            fitness_genitori = min(genitore1['fitness'], genitore2['fitness'])
+        t2 = orologio()
+
+        if mutazione != 'slot':
+            figlio = self.mutazione(figlio, occupazione)
+        if mutazione != 'docente':
+            figlio = self.mutazione_slot(figlio, occupazione)
+        t3 = orologio()
+        if telemetria is not None:
+            telemetria.tempo('selezione', t1 - t0)
+            telemetria.tempo('crossover', t2 - t1)
+            telemetria.tempo('mutazione', t3 - t2)
+        if selettori is None:
+            return figlio, occupazione, None
+        return figlio, occupazione, (crossover, mutazione, t2 - t1, t3 - t2, fitness_genitori)
 
     def create_calendario(self, individuo):
         # Crea la lista di dizionari rappresentante il calendario dall'individuo
@@ -774,7 +2345,7 @@ class CalendarioGenerator:
         # Genera un individuo con la strategia indicata (greedy, batch, random)
         individuo = {}
         ore_per_classe = defaultdict(int)
-        ore_per_docente_data = defaultdict(lambda: defaultdict(int))
+        occupazione = OccupazioneDocenti(len(self.indice_docente) * self.num_tempi)
         ore_settimanali_classe = defaultdict(lambda: defaultdict(int))
 
         if strategy == 'greedy':
@@ -783,51 +2354,35 @@ class CalendarioGenerator:
             slot_copia = sorted(self.slot_disponibili, key=lambda x: (x['CLASSE'], x['DATA']))
         else:
             slot_copia = self.slot_disponibili.copy()
-            random.shuffle(slot_copia)
+            self.rng.shuffle(slot_copia)
 
         # Assegna docenti civics in base alla strategia
         for slot in slot_copia:
             nome_classe = slot['CLASSE']
-            data = slot['DATA']
             settimana = slot['SETTIMANA']
 
             # Controlla limite di ore totali e settimanali
-            if ore_per_classe[nome_classe] >= self.ore_tot_civics:
+            if ore_per_classe[nome_classe] >= self.ore_target_per_classe[nome_classe]:
                 continue
             if ore_settimanali_classe[nome_classe][settimana] >= 1:
                 continue
 
-            nome_giorno = slot['GIORNO']
-            ora = slot['ORA']
             slot_key = slot['KEY']
-            docente_sostituito = slot['DOCENTE_SOSTITUITO']
-
-            # Trova docenti civics possibili
-            docenti_possibili = []
-            for docente_civics in self.docenti_per_classe[nome_classe]:
-                disponibile = False
-                if (docente_civics in self.docenti_civics_organico[nome_classe]) and (docente_civics == docente_sostituito):
-                    # Se il docente civics insegna anche la materia e coincide con il docente sostituito
-                    disponibile = True
-                else:
-                    # Controlla disponibilità sul giorno e ora
-                    if len(self.disponibilita_civics[docente_civics][nome_giorno]) >= ora and \
-                        self.disponibilita_civics[docente_civics][nome_giorno][ora - 1]:
-                        disponibile = True
 
-                    # Controllo se il docente non insegna due ore nello stesso giorno alla stessa ora
-                    if disponibile and ore_per_docente_data[docente_civics].get(data, 0) != ora:
-                        docenti_possibili.append(docente_civics)
+            # Docenti civics ammissibili (_docenti_possibili) non già impegnati in un'altra
+            # classe nella stessa data e ora
+            docenti_possibili = [docente for docente in self.docenti_possibili_per_slot[slot_key]
+                                 if occupazione.libero(self._cella(slot_key, docente))]
 
             if docenti_possibili:
                 if strategy == 'greedy':
                     docente_assegnato = docenti_possibili[0]
                 else:
-                    docente_assegnato = random.choice(docenti_possibili)
+                    docente_assegnato = self.rng.choice(docenti_possibili)
                 individuo[slot_key] = docente_assegnato
                 ore_per_classe[nome_classe] += 1
                 ore_settimanali_classe[nome_classe][settimana] += 1
-                ore_per_docente_data[docente_assegnato][data] = ora
+                occupazione.aggiungi(self._cella(slot_key, docente_assegnato))
 
         print(f"Individuo generato per strategia '{strategy}': {len(individuo)} assegnazioni")
 
@@ -836,28 +2391,49 @@ class CalendarioGenerator:
         else:
             return None
 
-    def verifica_vincoli(self, individuo):
-        # Verifica se l'individuo rispetta i vincoli (ore tot per classe e max 1 ora a settimana per classe)
-        ore_per_classe = defaultdict(int)
-        ore_settimanali_classe = defaultdict(lambda: defaultdict(int))
-
-        for slot_key in individuo:
-            slot_info = self.slots_by_key[slot_key]
-            nome_classe = slot_info['CLASSE']
-            data = slot_info['DATA']
-            settimana = slot_info['SETTIMANA']
-            ore_per_classe[nome_classe] += 1
-            ore_settimanali_classe[nome_classe][settimana] += 1
-
-            if ore_settimanali_classe[nome_classe][settimana] > 1:
-                return False
-
-        # Tutte le classi devono avere esattamente ore_tot_civics ore
-        if not all(ore_per_classe[nome_classe] == self.ore_tot_civics
-                   for nome_classe in self.classi_list):
-            return False
-
-        return True
+    def verifica_vincoli(self, individuo, occupazione=None):
+        # Verifica se l'individuo rispetta i vincoli (ore tot per classe, max 1 ora a settimana
+        # per classe e nessun docente civics in due classi nella stessa data e ora).
+        # Se l'indice di occupazione è disponibile il controllo delle sovrapposizioni è O(1)
+        occupazioni = None if occupazione is None else [occupazione]
+        validi, _ = self.verifica_vincoli_popolazione([individuo], occupazioni)
+        return validi[0]
+
+    def verifica_vincoli_popolazione(self, individui, occupazioni=None):
+        # Verifica dei vincoli per un lotto di individui. Per ciascuno conta le sovrapposizioni
+        # dei docenti civics (dagli indici di occupazione, se forniti), le ore in eccesso nelle
+        # coppie (classe, settimana) e le ore per classe sugli indici interi precalcolati.
+        # Restituisce (validi, dettagli): una lista di booleani e, per ogni individuo, il
+        # dettaglio delle violazioni
+        if occupazioni is None:
+            conflitti = self.conta_conflitti_popolazione(individui)
+        else:
+            conflitti = [occupazione.conflitti for occupazione in occupazioni]
+        classe_settimana_per_slot = self.classe_settimana_per_slot
+        num_settimane = self.num_settimane
+        # Tutte le classi devono avere esattamente le ore ancora da pianificare
+        # (ore_tot_civics meno quelle già svolte prima della data di congelamento)
+        ore_target = [self.ore_target_per_classe.get(classe, 0) for classe in self.indice_classe]
+        classi_senza_slot = [classe for classe in self.classi_list
+                             if classe not in self.indice_classe and self.ore_target_per_classe[classe] != 0]
+
+        validi = []
+        dettagli = []
+        for individuo, conflitti_docenti in zip(individui, conflitti):
+            celle = [classe_settimana_per_slot[k] for k in individuo]
+            ore_eccedenti = len(celle) - len(set(celle))
+            ore_per_classe = [0] * len(ore_target)
+            for cella in celle:
+                ore_per_classe[cella // num_settimane] += 1
+            classi_ore_errate = [classe for classe, ore, target in zip(self.indice_classe, ore_per_classe, ore_target)
+                                 if ore != target] + classi_senza_slot
+            validi.append(conflitti_docenti == 0 and ore_eccedenti == 0 and not classi_ore_errate)
+            dettagli.append({
+                'conflitti_docenti': conflitti_docenti,
+                'ore_settimanali_eccedenti': ore_eccedenti,
+                'classi_ore_errate': classi_ore_errate,
+            })
+        return validi, dettagli
 
     def _calcola_deviazione_totale(self, ore_settimanali_classe):
         total_deviation = 0
@@ -924,14 +2500,203 @@ class CalendarioGenerator:
 
         return variance_total, max_percentage_penalty, penalties_total
 
+    def _calcola_costo_classe(self, classe, ore_perse_docente):
+        # Contributo di una classe alla fitness, esclusa la deviazione settimanale
+        # (usato per la valutazione incrementale delle mosse nella ricerca locale)
+        v_tot, max_p, p_tot = self._calcola_penalita_classe(classe, ore_perse_docente)
+        return v_tot * 5 + max_p + p_tot
+
+    def ricerca_locale(self, individuo, tempo_max=None):
+        # Hill climbing con accettazione del primo miglioramento: sposta le assegnazioni su
+        # altri slot ammissibili della stessa classe e settimana (riassegnando il docente
+        # civics quando quello attuale non è ammissibile o è già impegnato) e accetta solo
+        # le mosse che abbassano la fitness. Poiché la fitness dipende solo dagli slot scelti,
+        # la riassegnazione del docente da sola non può migliorarla e viene usata solo per
+        # rendere ammissibile lo spostamento. Ogni mossa è valutata in modo incrementale
+        # sulla sola classe coinvolta. Restituisce (individuo, fitness).
+        if tempo_max is None:
+            tempo_max = self.ricerca_locale_tempo_max
+        scadenza = time.perf_counter() + tempo_max
+
+        individuo = dict(individuo)
+        occupazione = self.costruisci_occupazione(individuo)
+        chiavi_per_classe = defaultdict(list)
+        ore_perse_per_classe_docente = defaultdict(lambda: defaultdict(int))
+        for classe, ore_perse_base in self.ore_perse_base.items():
+            ore_perse_per_classe_docente[classe].update(ore_perse_base)
+        for key in individuo:
+            slot_info = self.slots_by_key[key]
+            chiavi_per_classe[slot_info['CLASSE']].append(key)
+            ore_perse_per_classe_docente[slot_info['CLASSE']][slot_info['DOCENTE_SOSTITUITO']] += 1
+        costo_classe = {classe: self._calcola_costo_classe(classe, ore_perse_per_classe_docente[classe])
+                        for classe in self.classi_list}
+
+        migliorato = True
+        while migliorato and time.perf_counter() < scadenza:
+            migliorato = False
+            classi = list(self.classi_list)
+            self.rng.shuffle(classi)
+            for classe in classi:
+                if time.perf_counter() >= scadenza:
+                    break
+                ore_perse = ore_perse_per_classe_docente[classe]
+                chiavi = chiavi_per_classe[classe]
+                for i in self.rng.sample(range(len(chiavi)), len(chiavi)):
+                    key = chiavi[i]
+                    slot_info = self.slots_by_key[key]
+                    sostituito = slot_info['DOCENTE_SOSTITUITO']
+                    candidati = list(self.slot_per_classe_settimana.get((classe, slot_info['SETTIMANA']), []))
+                    self.rng.shuffle(candidati)
+                    for nuova_key in candidati:
+                        nuovo_sostituito = self.slots_by_key[nuova_key]['DOCENTE_SOSTITUITO']
+                        if nuova_key == key or nuovo_sostituito == sostituito:
+                            continue
+                        ore_perse[sostituito] -= 1
+                        ore_perse[nuovo_sostituito] += 1
+                        nuovo_costo = self._calcola_costo_classe(classe, ore_perse)
+                        docente = None
+                        if nuovo_costo < costo_classe[classe]:
+                            docente = self._docente_libero(individuo, key, nuova_key, occupazione)
+                        if docente is None:
+                            ore_perse[sostituito] += 1
+                            ore_perse[nuovo_sostituito] -= 1
+                            continue
+                        occupazione.rimuovi(self._cella(key, individuo[key]))
+                        occupazione.aggiungi(self._cella(nuova_key, docente))
+                        del individuo[key]
+                        individuo[nuova_key] = docente
+                        chiavi[i] = nuova_key
+                        costo_classe[classe] = nuovo_costo
+                        migliorato = True
+                        break
+
+        return individuo, self.calcola_fitness(individuo)
+
+    def ricerca_tabu(self, individuo, iterazioni=None, scadenza=None):
+        # Ricerca tabu. A ogni iterazione si valutano, per tabu_candidati assegnazioni estratte
+        # a caso, gli spostamenti sugli altri slot della stessa settimana (costo incrementale
+        # della sola classe, docente scelto con _docente_libero) e le riassegnazioni del docente
+        # civics, che non cambiano la fitness ma liberano docenti per gli spostamenti. Si applica
+        # la mossa migliore anche se peggiora, escluse (per entrambi i tipi) quelle che riportano una coppia
+        # (slot, docente) lasciata da meno di tabu_durata iterazioni, salvo che migliorino il
+        # migliore globale (aspirazione). Si ferma dopo iterazioni o alla scadenza
+        # (perf_counter). Restituisce (individuo, fitness) del migliore stato visitato.
+        if iterazioni is None:
+            iterazioni = self.tabu_iterazioni
+        stato = self._stato_sa(dict(individuo))
+        individuo = stato['individuo']
+        occupazione = stato['occupazione']
+        chiavi = stato['chiavi']
+        ore_perse_per_classe_docente = stato['ore_perse']
+        costo_classe = stato['costo_classe']
+        costo = stato['costo']
+        migliore = dict(individuo)
+        costo_migliore = costo
+        tabu = {}
+        valutazioni = 0
+        eseguite = 0
+
+        for iterazione in range(iterazioni):
+            if not chiavi or self._interruzione_richiesta:
+                break
+            if scadenza is not None and time.perf_counter() >= scadenza:
+                break
+            eseguite += 1
+            mossa = None
+            delta_mossa = float('inf')
+            for i in self.rng.sample(range(len(chiavi)), min(self.tabu_candidati, len(chiavi))):
+                key = chiavi[i]
+                slot_info = self.slots_by_key[key]
+                classe = slot_info['CLASSE']
+                sostituito = slot_info['DOCENTE_SOSTITUITO']
+                ore_perse = ore_perse_per_classe_docente[classe]
+
+                # Il costo dipende solo dal docente sostituito nel nuovo slot: lo si calcola una
+                # volta per docente. Lo slot stesso dà le riassegnazioni del docente civics, mosse
+                # candidate come le altre con costo invariato
+                costi = {sostituito: costo_classe[classe]}
+                for nuova_key in self.slot_per_classe_settimana.get((classe, slot_info['SETTIMANA']), ()):
+                    nuovo_sostituito = self.slots_by_key[nuova_key]['DOCENTE_SOSTITUITO']
+                    nuovo_costo = costi.get(nuovo_sostituito)
+                    if nuovo_costo is None:
+                        ore_perse[sostituito] -= 1
+                        ore_perse[nuovo_sostituito] += 1
+                        nuovo_costo = costi[nuovo_sostituito] = self._calcola_costo_classe(classe, ore_perse)
+                        ore_perse[sostituito] += 1
+                        ore_perse[nuovo_sostituito] -= 1
+                        valutazioni += 1
+                    delta = nuovo_costo - costo_classe[classe]
+                    if delta >= delta_mossa:
+                        continue
+                    if nuova_key == key:
+                        docenti = [d for d in self.docenti_possibili_per_slot[key]
+                                   if d != individuo[key] and occupazione.libero(self._cella(key, d))]
+                    else:
+                        docenti = [self._docente_libero(individuo, key, nuova_key, occupazione)]
+                    for docente in docenti:
+                        if docente is None:
+                            continue
+                        if tabu.get((nuova_key, docente), -1) > iterazione and costo + delta >= costo_migliore:
+                            continue
+                        mossa = (i, key, nuova_key, docente, nuovo_costo)
+                        delta_mossa = delta
+                        break
+
+            if mossa is None:
+                continue
+            i, key, nuova_key, docente, nuovo_costo = mossa
+            slot_info = self.slots_by_key[key]
+            classe = slot_info['CLASSE']
+            tabu[(key, individuo[key])] = iterazione + self.tabu_durata
+            occupazione.rimuovi(self._cella(key, individuo[key]))
+            occupazione.aggiungi(self._cella(nuova_key, docente))
+            if nuova_key != key:
+                ore_perse = ore_perse_per_classe_docente[classe]
+                ore_perse[slot_info['DOCENTE_SOSTITUITO']] -= 1
+                ore_perse[self.slots_by_key[nuova_key]['DOCENTE_SOSTITUITO']] += 1
+                del individuo[key]
+                chiavi[i] = nuova_key
+            individuo[nuova_key] = docente
+            costo += nuovo_costo - costo_classe[classe]
+            costo_classe[classe] = nuovo_costo
+            if costo < costo_migliore:
+                costo_migliore = costo
+                migliore = dict(individuo)
+
+        logging.info(f"Ricerca tabu: {eseguite} iterazioni, {valutazioni} valutazioni incrementali")
+        return migliore, self.calcola_fitness(migliore)
+
+    def _docente_libero(self, individuo, key, nuova_key, occupazione):
+        # Docente civics per spostare l'assegnazione di key su nuova_key: preferisce il docente
+        # attuale, altrimenti il primo docente ammissibile libero in quella data e ora
+        docente_attuale = individuo[key]
+        docenti_possibili = self.docenti_possibili_per_slot[nuova_key]
+        if docente_attuale in docenti_possibili and occupazione.libero(self._cella(nuova_key, docente_attuale)):
+            return docente_attuale
+        for docente in docenti_possibili:
+            if occupazione.libero(self._cella(nuova_key, docente)):
+                return docente
+        return None
+
     def calcola_fitness(self, individuo):
         # Calcola la fitness di un individuo, utilizzando diverse metriche
         # Minore è la fitness, migliore è l'individuo
+        return self._fitness_pesata(self.componenti_fitness(individuo))
+
+    def _fitness_pesata(self, componenti):
+        # Somma delle componenti della fitness con i pesi PESI_FITNESS
+        return sum(peso * valore for peso, valore in zip(self.PESI_FITNESS, componenti))
+
+    def componenti_fitness(self, individuo):
+        # Componenti della fitness, tutte da minimizzare: (deviazione settimanale, varianza,
+        # penalità per percentuali massime, penalità per fasce di ore perse)
         ore_settimanali_classe = defaultdict(lambda: defaultdict(int))
 
         # Pre-calcola le ore perse per ogni classe e docente in un unico passaggio sull'individuo
         # Questo evita scansioni multiple di individuo nel loop delle classi
         ore_perse_per_classe_docente = defaultdict(lambda: defaultdict(int))
+        for classe, ore_perse_base in self.ore_perse_base.items():
+            ore_perse_per_classe_docente[classe].update(ore_perse_base)
 
         for slot_key in individuo:
             slot_info = self.slots_by_key[slot_key]
@@ -956,8 +2721,7 @@ class CalendarioGenerator:
             max_percentage_penalty += max_p
             penalties_total += p_tot
 
-        total_fitness = total_deviation * 10 + variance_total * 5 + max_percentage_penalty + penalties_total
-        return total_fitness
+        return total_deviation, variance_total, max_percentage_penalty, penalties_total
 
     def selezione(self, popolazione, fitness):
         # Selezione con ranking
@@ -967,24 +2731,87 @@ class CalendarioGenerator:
         total_rank = sum(ranks)
         selection_probs = [rank / total_rank for rank in ranks]
         popolazione_sorted = [ind for ind, fit in popolazione_fitness]
-        selected = random.choices(popolazione_sorted, weights=selection_probs, k=len(popolazione))
+        selected = self.rng.choices(popolazione_sorted, weights=selection_probs, k=len(popolazione))
         return selected
 
-    def crossover(self, genitore1, genitore2):
-        # Crossover: unisce parti di genitore1 e genitore2
-        figlio = {}
-        blocks = self.identify_blocks(genitore1, genitore2)
-        for block in blocks:
-            if random.random() < 0.5:
-                figlio.update(block['genitore1'])
-            else:
-                figlio.update(block['genitore2'])
+    def selezione_indici(self, fitness):
+        # Selezione dei genitori con l'operatore selezione_operatore ('ranking', 'torneo' o
+        # 'sus'). Restituisce len(fitness) indici nella popolazione invece degli individui.
+        # La popolazione arriva già ordinata da _evolvi_popolazione: la verifica a coppie è
+        # lineare, l'ordinamento per fitness si calcola solo se serve e i pesi del ranking
+        # sono precalcolati per dimensione
+        n = len(fitness)
+        if all(a <= b for a, b in zip(fitness, fitness[1:])):
+            ordine = range(n)
+        else:
+            ordine = sorted(range(n), key=fitness.__getitem__)
+        casuale = self.rng.random
+        if self.selezione_operatore == 'torneo':
+            # Torneo: per ogni genitore vince il migliore di dimensione_torneo individui estratti
+            # a caso, cioè quello di posizione minima in classifica
+            dimensione = range(max(1, self.dimensione_torneo))
+            return [ordine[int(n * min([casuale() for _ in dimensione]))] for _ in range(n)]
+
+        pesi_cumulativi = _pesi_cumulativi_ranking(n)
+        if self.selezione_operatore == 'sus':
+            # Stochastic universal sampling: n puntatori equidistanti con un solo scostamento
+            # casuale sui pesi del ranking, per una varianza minima del numero di copie
+            passo = pesi_cumulativi[-1] / n
+            scostamento = casuale()
+            indici = []
+            posizione = 0
+            for i in range(n):
+                puntatore = (scostamento + i) * passo
+                while posizione < n - 1 and pesi_cumulativi[posizione] <= puntatore:
+                    posizione += 1
+                indici.append(ordine[posizione])
+            return indici
+        return self.rng.choices(ordine, cum_weights=pesi_cumulativi, k=n)
+
+    def crossover(self, genitore1, genitore2, occupazione=None, maschera=None):
+        # Crossover a maschera: il figlio ha le chiavi di genitore1 e per ogni gene indicato
+        # dalla maschera prende il docente di genitore2; se genitore2 non ha la chiave resta
+        # quello di genitore1. La maschera è a blocchi casuali (crossover_maschera='blocchi',
+        # stessa distribuzione di identify_blocks) o uniforme, e il figlio si costruisce in
+        # un solo passaggio senza dizionari intermedi. maschera sceglie il tipo per questa
+        # chiamata al posto di crossover_maschera.
+        keys = list(genitore1)
+        figlio = dict(genitore1)
+        for key, da_genitore2 in zip(keys, self._maschera_crossover(len(keys), maschera)):
+            if not da_genitore2:
+                continue
+            docente = genitore2.get(key)
+            docente1 = figlio[key]
+            if docente is None or docente == docente1:
+                continue
+            if occupazione is not None:
+                # occupazione è una copia dell'indice di genitore1: si prende il docente di
+                # genitore2 solo se è libero nella stessa data e ora
+                cella = self._cella(key, docente)
+                if not occupazione.libero(cella):
+                    continue
+                occupazione.rimuovi(self._cella(key, docente1))
+                occupazione.aggiungi(cella)
+            figlio[key] = docente
         return figlio
 
+    def _maschera_crossover(self, n, tipo=None):
+        # Maschera dei geni presi da genitore2. A blocchi: i geni sono divisi a caso in circa
+        # 10 blocchi e ogni blocco viene da genitore2 con probabilità 0.5; uniforme: ogni gene
+        # indipendentemente con probabilità 0.5
+        if (tipo or self.crossover_maschera) == 'uniforme':
+            bit = self.rng.getrandbits(n) if n else 0
+            return [(bit >> i) & 1 for i in range(n)]
+        block_size = max(1, n // 10)
+        scelte = [self.rng.random() < 0.5 for _ in range((n + block_size - 1) // block_size)]
+        posizioni = list(range(n))
+        self.rng.shuffle(posizioni)
+        return [scelte[posizione // block_size] for posizione in posizioni]
+
     def identify_blocks(self, genitore1, genitore2):
         # Identifica blocchi di chiavi da scambiare
         keys = list(genitore1.keys())
-        random.shuffle(keys)
+        self.rng.shuffle(keys)
         blocks = []
         block_size = max(1, len(keys) // 10)
         for i in range(0, len(keys), block_size):
@@ -994,56 +2821,618 @@ class CalendarioGenerator:
             blocks.append({'genitore1': block_gen1, 'genitore2': block_gen2})
         return blocks
 
-    def mutazione(self, individuo):
-        # Mutazione casuale: in alcuni slot cambia il docente assegnato
+    def mutazione(self, individuo, occupazione=None):
+        # Mutazione casuale: in alcuni slot cambia il docente assegnato, scelto tra i docenti
+        # ammissibili precalcolati per lo slot. Ogni gene muta con probabilità probabilita_mutazione;
+        # le posizioni si estraggono a salti geometrici, con un'estrazione per mutazione
+        # invece che una per gene. Se viene passato l'indice di occupazione, si scelgono solo
+        # docenti liberi nella data e ora dello slot e l'indice viene aggiornato
         keys = list(individuo.keys())
-        for key in keys:
-            if random.random() < self.probabilita_mutazione:
-                slot_info = self.slots_by_key[key]
-                nome_classe = slot_info['CLASSE']
-                data = slot_info['DATA']
-                settimana = slot_info['SETTIMANA']
-                nome_giorno = slot_info['GIORNO']
-                ora = slot_info['ORA']
-                docente_sostituito = slot_info['DOCENTE_SOSTITUITO']
-
-                docenti_possibili = []
-                for docente_civics in self.docenti_per_classe[nome_classe]:
-                    disponibile = False
-                    if docente_civics in self.docenti_civics_organico[nome_classe]:
-                        if self.allow_teacher_replace_self and docente_civics == docente_sostituito:
-                            disponibile = True
-                    else:
-                        if len(self.disponibilita_civics[docente_civics][nome_giorno]) >= ora and \
-                           self.disponibilita_civics[docente_civics][nome_giorno][ora - 1]:
-                            disponibile = True
+        for i in self._posizioni_mutate(len(keys), self.probabilita_mutazione):
+            key = keys[i]
+            docente_attuale = individuo[key]
+            docenti_possibili = self.docenti_possibili_per_slot[key]
+            if occupazione is not None:
+                docenti_possibili = [d for d in docenti_possibili
+                                     if d == docente_attuale or occupazione.libero(self._cella(key, d))]
 
-                    if disponibile:
-                        docenti_possibili.append(docente_civics)
+            if docenti_possibili:
+                nuovo_docente = self.rng.choice(docenti_possibili)
+                if occupazione is not None and nuovo_docente != docente_attuale:
+                    occupazione.rimuovi(self._cella(key, docente_attuale))
+                    occupazione.aggiungi(self._cella(key, nuovo_docente))
+                individuo[key] = nuovo_docente
+        return individuo
 
-                if docenti_possibili:
-                    individuo[key] = random.choice(docenti_possibili)
+    def _posizioni_mutate(self, n, probabilita):
+        # Indici di range(n) scelti ognuno indipendentemente con la probabilità data. Il salto
+        # tra due indici scelti segue una distribuzione geometrica, quindi basta un numero
+        # casuale per indice scelto (stessa distribuzione di una moneta per indice)
+        if probabilita <= 0:
+            return
+        if probabilita >= 1:
+            yield from range(n)
+            return
+        log_q = math.log(1.0 - probabilita)
+        i = -1
+        while True:
+            i += int(math.log(1.0 - self.rng.random()) / log_q) + 1
+            if i >= n:
+                return
+            yield i
+
+    def mutazione_slot(self, individuo, occupazione=None):
+        # Mutazione sugli slot: sposta un'assegnazione su un altro slot ammissibile della
+        # stessa classe nella stessa settimana ISO, oppure scambia le settimane tra due
+        # assegnazioni della stessa classe. Il vincolo di massimo un'ora a settimana per
+        # classe e il numero di ore per classe restano invariati per costruzione.
+        chiavi_per_classe = defaultdict(list)
+        for key in individuo:
+            chiavi_per_classe[self.slots_by_key[key]['CLASSE']].append(key)
+
+        for chiavi in chiavi_per_classe.values():
+            for i in self._posizioni_mutate(len(chiavi), self.probabilita_mutazione_slot):
+                if len(chiavi) < 2 or self.rng.random() < 0.5:
+                    chiavi[i] = self._sposta_in_settimana(individuo, chiavi[i], occupazione)
+                else:
+                    j = self.rng.randrange(len(chiavi))
+                    if j != i:
+                        chiavi[i], chiavi[j] = self._scambia_settimane(individuo, chiavi[i], chiavi[j], occupazione)
         return individuo
 
+    def _scegli_slot_settimana(self, nome_classe, settimana, docente, occupazione=None):
+        # Sceglie uno slot ammissibile della classe nella settimana indicata, mantenendo il
+        # docente civics se è ammissibile (e libero) anche nel nuovo slot. Restituisce None
+        # se la settimana non ha slot ammissibili o docenti liberi.
+        candidati = self.slot_per_classe_settimana.get((nome_classe, settimana))
+        if not candidati:
+            return None
+        nuova_key = self.rng.choice(candidati)
+        docenti_possibili = self.docenti_possibili_per_slot[nuova_key]
+        if occupazione is not None:
+            docenti_possibili = [d for d in docenti_possibili if occupazione.libero(self._cella(nuova_key, d))]
+            if not docenti_possibili:
+                return None
+        if docente not in docenti_possibili:
+            docente = self.rng.choice(docenti_possibili)
+        return nuova_key, docente
+
+    def _sposta_in_settimana(self, individuo, key, occupazione=None):
+        # Sposta l'assegnazione su un altro slot della stessa classe e settimana
+        slot_info = self.slots_by_key[key]
+        if occupazione is not None:
+            occupazione.rimuovi(self._cella(key, individuo[key]))
+        scelta = self._scegli_slot_settimana(slot_info['CLASSE'], slot_info['SETTIMANA'], individuo[key], occupazione)
+        if scelta is None:
+            if occupazione is not None:
+                occupazione.aggiungi(self._cella(key, individuo[key]))
+            return key
+        nuova_key, docente = scelta
+        del individuo[key]
+        individuo[nuova_key] = docente
+        if occupazione is not None:
+            occupazione.aggiungi(self._cella(nuova_key, docente))
+        return nuova_key
+
+    def _scambia_settimane(self, individuo, key1, key2, occupazione=None):
+        # Scambia le settimane di due assegnazioni della stessa classe: ognuna viene
+        # spostata su uno slot ammissibile della settimana dell'altra
+        slot1 = self.slots_by_key[key1]
+        slot2 = self.slots_by_key[key2]
+        if occupazione is not None:
+            occupazione.rimuovi(self._cella(key1, individuo[key1]))
+            occupazione.rimuovi(self._cella(key2, individuo[key2]))
+
+        scelta1 = self._scegli_slot_settimana(slot1['CLASSE'], slot2['SETTIMANA'], individuo[key1], occupazione)
+        if scelta1 is not None and occupazione is not None:
+            occupazione.aggiungi(self._cella(*scelta1))
+        scelta2 = None
+        if scelta1 is not None:
+            scelta2 = self._scegli_slot_settimana(slot2['CLASSE'], slot1['SETTIMANA'], individuo[key2], occupazione)
+
+        if scelta2 is None:
+            if occupazione is not None:
+                if scelta1 is not None:
+                    occupazione.rimuovi(self._cella(*scelta1))
+                occupazione.aggiungi(self._cella(key1, individuo[key1]))
+                occupazione.aggiungi(self._cella(key2, individuo[key2]))
+            return key1, key2
+
+        if occupazione is not None:
+            occupazione.aggiungi(self._cella(*scelta2))
+        del individuo[key1]
+        del individuo[key2]
+        individuo[scelta1[0]] = scelta1[1]
+        individuo[scelta2[0]] = scelta2[1]
+        return scelta1[0], scelta2[0]
+
 
 _worker_instance = None
 
-def init_worker(instance):
+def init_worker(instance=None):
     global _worker_instance
     _worker_instance = instance
+    # I worker ignorano SIGINT (lo gestisce il processo principale) e tornano al SIGTERM
+    # predefinito, usato da Pool.terminate() per chiuderli
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+# Se False, _gestione_interruzioni non installa gestori di segnale (worker del servizio
+# e del lotto di scuole)
+_gestori_segnale = True
+
+def init_worker_senza_gestori():
+    # Worker del servizio e del lotto di scuole: i lavori non installano gestori propri, così
+    # SIGTERM da Pool.terminate() chiude subito il worker anche durante un lavoro. Le
+    # interruzioni le gestisce il processo principale
+    global _gestori_segnale
+    init_worker()
+    _gestori_segnale = False
+
+@contextmanager
+def _flusso_task(seme):
+    # Il task usa un generatore casuale proprio inizializzato con il suo seme. In esecuzione
+    # seriale l'istanza è quella principale, il cui generatore viene ripristinato alla fine.
+    precedente = _worker_instance.rng
+    _worker_instance.rng = random.Random(seme)
+    try:
+        yield
+    finally:
+        _worker_instance.rng = precedente
 
-def genera_individuo_greedy_helper(args):
-    return _worker_instance.genera_individuo_greedy(args)
+def genera_individuo_greedy_helper(seme):
+    with _flusso_task(seme):
+        return _worker_instance.genera_individuo_greedy(seme)
 
-def genera_individuo_batch_helper(args):
-    return _worker_instance.genera_individuo_batch(args)
+def genera_individuo_batch_helper(seme):
+    with _flusso_task(seme):
+        return _worker_instance.genera_individuo_batch(seme)
 
-def genera_individuo_random_helper(args):
-    return _worker_instance.genera_individuo_random(args)
+def genera_individuo_random_helper(seme):
+    with _flusso_task(seme):
+        return _worker_instance.genera_individuo_random(seme)
 
 def calcola_fitness_helper(individuo):
     return _worker_instance.calcola_fitness(individuo)
 
+def componenti_fitness_helper(individuo):
+    return _worker_instance.componenti_fitness(individuo)
+
+def calcola_fitness_cronometrata_helper(individuo):
+    inizio = time.perf_counter()
+    fitness = _worker_instance.calcola_fitness(individuo)
+    return fitness, time.perf_counter() - inizio
+
+def ricerca_locale_helper(args):
+    individuo, seme = args
+    with _flusso_task(seme):
+        return _worker_instance.ricerca_locale(individuo)
+
+def simulated_annealing_helper(seme):
+    # Ogni riavvio usa un seme distinto: i processi figli ereditano lo stesso stato di random
+    with _flusso_task(seme):
+        return _worker_instance.simulated_annealing()
+
+def catena_pt_helper(args):
+    # Un turno di una catena del parallel tempering: pochi dati viaggiano tra i processi
+    # (l'individuo), il resto dello stato si ricostruisce nel worker.
+    # Restituisce (individuo, costo, migliore individuo del turno, suo costo)
+    individuo, temperatura, iterazioni, seme = args
+    with _flusso_task(seme):
+        stato = _worker_instance._stato_sa(individuo)
+        migliore, costo_migliore = _worker_instance._mosse_sa(stato, iterazioni, lambda _: temperatura)
+    return stato['individuo'], stato['costo'], migliore, costo_migliore
+
+def ricerca_tabu_helper(seme):
+    # Avvio indipendente della ricerca tabu da un individuo casuale valido; il tempo massimo
+    # (time_budget_seconds) è misurato dall'inizio del task. Nei worker del pool SIGINT e
+    # SIGTERM fermano la ricerca, che restituisce comunque il migliore stato visitato
+    with _flusso_task(seme), _worker_instance._gestione_interruzioni(azzera=False):
+        individuo = None
+        for _ in range(10):
+            individuo = _worker_instance.genera_individuo_base(strategy='random')
+            if individuo is not None:
+                break
+        if individuo is None:
+            return None
+        budget = _worker_instance.time_budget_seconds
+        scadenza = time.perf_counter() + budget if budget > 0 else None
+        return _worker_instance.ricerca_tabu(individuo, scadenza=scadenza)
+
+def genera_variante_helper(args):
+    # Una variante usa i dati già preelaborati del worker con seme e cartella propri;
+    # gira in serie perché un worker non può aprire un pool
+    indice, seme = args
+    variante = copy.copy(_worker_instance)
+    variante.num_varianti = 1
+    variante.num_cores = 1
+    variante.hyperparams = dict(_worker_instance.hyperparams)
+    variante.cartella_output = os.path.join(_worker_instance.cartella_output, f"variante_{indice}")
+    variante.rng = random.Random(seme)
+    return indice, variante.genera_calendario()
+
+def esegui_avvio_helper(args):
+    # Un avvio del multi-start sui dati già preelaborati del worker, con seme e strategia
+    # propri; la migliore fitness condivisa arriva con l'istanza del worker
+    indice, seme = args
+    avvio = copy.copy(_worker_instance)
+    avvio.num_cores = 1
+    for nome, valore in CalendarioGenerator.STRATEGIE_MULTI_START[(indice - 1) % len(CalendarioGenerator.STRATEGIE_MULTI_START)].items():
+        setattr(avvio, nome, valore)
+    avvio.rng = random.Random(seme)
+    return (indice,) + avvio.esegui_avvio()
+
+def genera_scuola_helper(config):
+    # Genera il calendario di una scuola in un worker del pool condiviso. Gli errori fatali
+    # della singola scuola non interrompono il lotto ma vengono riportati nel riepilogo.
+    # Una scuola fermata da SIGINT/SIGTERM (esecuzione in serie) salva il miglior calendario
+    # trovato e risulta INTERROTTO
+    inizio = time.perf_counter()
+    try:
+        generatore = CalendarioGenerator(config)
+        fitness = generatore.genera_calendario()
+        if generatore._interruzione_richiesta:
+            esito = 'INTERROTTO'
+        else:
+            esito = 'OK' if fitness is not None else 'NESSUNA SOLUZIONE'
+    except SystemExit:
+        fitness, esito = None, 'ERRORE'
+    except Exception as e:
+        logging.error(f"Errore imprevisto per {_sanitize_for_logging(config.cartella_input)}: {_sanitize_for_logging(e)}")
+        fitness, esito = None, 'ERRORE'
+    return {
+        'SCUOLA': os.path.basename(os.path.normpath(config.cartella_input)),
+        'CARTELLA_INPUT': config.cartella_input,
+        'CARTELLA_OUTPUT': config.cartella_output,
+        'FITNESS': fitness,
+        'ESITO': esito,
+        'SECONDI': round(time.perf_counter() - inizio, 3)
+    }
+
+def _nomi_scuole(cartelle_input):
+    # Nome di ogni scuola del lotto, usato per la sua cartella di output: il nome della cartella
+    # di input o, se due scuole hanno cartelle con lo stesso nome, il percorso relativo alla
+    # cartella comune, così i risultati non si sovrascrivono
+    nomi = [os.path.basename(os.path.normpath(c)) for c in cartelle_input]
+    if len(set(nomi)) < len(nomi):
+        assoluti = [os.path.abspath(c) for c in cartelle_input]
+        comune = os.path.commonpath(assoluti)
+        nomi = [os.path.relpath(c, comune) for c in assoluti]
+    return nomi
+
+def _config_scuola(config, cartella_input, nome_scuola=None):
+    # Configurazione di una scuola del lotto: la configurazione comune, eventualmente
+    # modificata da config.json nella cartella di input, con cartelle di input/output proprie.
+    # L'output va in config.cartella_output/<nome_scuola> (predefinito: nome della cartella)
+    percorso = os.path.join(cartella_input, 'config.json')
+    modifiche = {}
+    if os.path.exists(percorso):
+        try:
+            with open(percorso, encoding='utf-8') as f:
+                modifiche = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Errore durante la lettura di {_sanitize_for_logging(percorso)}: {_sanitize_for_logging(e)}")
+            raise SystemExit(1)
+        if not isinstance(modifiche, dict):
+            logging.error(f"Errore: {_sanitize_for_logging(percorso)} deve contenere un oggetto JSON")
+            raise SystemExit(1)
+        campi = {campo.name for campo in fields(CalendarioConfig)}
+        sconosciuti = sorted(set(modifiche) - campi)
+        if sconosciuti:
+            logging.error(f"Errore: parametri non validi in {_sanitize_for_logging(percorso)} - {_sanitize_for_logging(sconosciuti)}")
+            raise SystemExit(1)
+    if nome_scuola is None:
+        nome_scuola = os.path.basename(os.path.normpath(cartella_input))
+    modifiche.update(
+        cartella_input=cartella_input,
+        cartella_output=os.path.join(config.cartella_output, nome_scuola),
+        num_cores=1
+    )
+    return replace(config, **modifiche)
+
+def _dimensione_scuola(cartella_input):
+    # Stima della dimensione del problema: numero di righe di classes.csv e civics_teachers.csv
+    dimensione = 0
+    for nome in ('classes.csv', 'civics_teachers.csv'):
+        try:
+            with open(os.path.join(cartella_input, nome), encoding='utf-8') as f:
+                dimensione += sum(1 for _ in f)
+        except OSError:
+            pass
+    return dimensione
+
+@contextmanager
+def _gestione_interruzioni_lotto():
+    # SIGINT e SIGTERM durante un lotto di scuole non terminano il processo: l'evento restituito
+    # segnala di non avviare altre scuole. Le scuole non completate finiscono nel riepilogo
+    # come INTERROTTO
+    interruzione = threading.Event()
+
+    def gestore(signum, frame):
+        logging.warning(f"Ricevuto segnale {signum}: interruzione del lotto di scuole")
+        interruzione.set()
+
+    precedenti = {}
+    for segnale in (signal.SIGINT, signal.SIGTERM):
+        try:
+            precedenti[segnale] = signal.signal(segnale, gestore)
+        except ValueError:
+            # I gestori di segnale si possono installare solo dal thread principale
+            pass
+    try:
+        yield interruzione
+    finally:
+        for segnale, gestore_precedente in precedenti.items():
+            signal.signal(segnale, gestore_precedente)
+
+def genera_calendari_scuole(cartelle_input, config):
+    # Genera i calendari di più scuole su un unico pool di config.num_cores processi.
+    # Le scuole più grandi partono per prime, così le ultime a terminare sono le più piccole;
+    # ogni scuola gira su un solo core e salva in config.cartella_output/<nome cartella>.
+    # Una scuola con config.json non valido finisce nel riepilogo come ERRORE senza fermare
+    # le altre. Restituisce il riepilogo, salvato anche in riepilogo_scuole.csv.
+    # Con SIGINT/SIGTERM il lotto si ferma: in serie la scuola in corso salva il miglior
+    # calendario trovato, in parallelo il pool viene terminato; il riepilogo viene comunque salvato.
+    # Una cartella indicata più volte viene elaborata una volta sola
+    uniche = {}
+    for cartella in cartelle_input:
+        uniche.setdefault(os.path.abspath(cartella), cartella)
+    cartelle_input = list(uniche.values())
+    nomi = dict(zip(cartelle_input, _nomi_scuole(cartelle_input)))
+    configurazioni = []
+    errori = []
+    for cartella, nome in nomi.items():
+        try:
+            configurazioni.append(_config_scuola(config, cartella, nome))
+        except SystemExit:
+            errori.append({
+                'SCUOLA': nome,
+                'CARTELLA_INPUT': cartella,
+                'CARTELLA_OUTPUT': os.path.join(config.cartella_output, nome),
+                'FITNESS': None,
+                'ESITO': 'ERRORE',
+                'SECONDI': 0.0
+            })
+    configurazioni.sort(key=lambda c: _dimensione_scuola(c.cartella_input), reverse=True)
+
+    logging.info(f"Generazione dei calendari di {len(configurazioni)} scuole...")
+    processi = max(1, min(config.num_cores, len(configurazioni)))
+    riepilogo = []
+    with _gestione_interruzioni_lotto() as interruzione:
+        if processi <= 1:
+            for configurazione in configurazioni:
+                if interruzione.is_set():
+                    break
+                riga = genera_scuola_helper(configurazione)
+                riepilogo.append(riga)
+                if riga['ESITO'] == 'INTERROTTO':
+                    interruzione.set()
+        else:
+            # I worker non gestiscono segnali: alla prima interruzione il processo principale
+            # smette di raccogliere risultati e l'uscita dal blocco termina il pool
+            with multiprocessing.Pool(processes=processi, initializer=init_worker_senza_gestori) as pool:
+                risultati = pool.imap_unordered(genera_scuola_helper, configurazioni, chunksize=1)
+                while len(riepilogo) < len(configurazioni) and not interruzione.is_set():
+                    try:
+                        riepilogo.append(risultati.next(timeout=0.5))
+                    except multiprocessing.TimeoutError:
+                        pass
+    completate = {riga['CARTELLA_INPUT'] for riga in riepilogo}
+    for configurazione in configurazioni:
+        if configurazione.cartella_input not in completate:
+            riepilogo.append({
+                'SCUOLA': None,
+                'CARTELLA_INPUT': configurazione.cartella_input,
+                'CARTELLA_OUTPUT': configurazione.cartella_output,
+                'FITNESS': None,
+                'ESITO': 'INTERROTTO',
+                'SECONDI': 0.0
+            })
+    for riga in riepilogo:
+        riga['SCUOLA'] = nomi[riga['CARTELLA_INPUT']]
+
+    riepilogo = sorted(riepilogo + errori, key=lambda r: r['SCUOLA'])
+    cartella_output = _sanitize_output_path(config.cartella_output)
+    os.makedirs(cartella_output, exist_ok=True)
+    riepilogo_df = pd.DataFrame(riepilogo)
+    riepilogo_df.to_csv(os.path.join(cartella_output, 'riepilogo_scuole.csv'), index=False)
+    for riga in riepilogo:
+        logging.info(f"{_sanitize_for_logging(riga['SCUOLA'])}: {riga['ESITO']} (fitness {riga['FITNESS']})")
+    return riepilogo
+
+def esegui_lavoro_helper(args):
+    # Esegue un lavoro del servizio: scrive i CSV ricevuti in una cartella temporanea,
+    # genera il calendario e restituisce esito, fitness e il contenuto dei CSV prodotti.
+    # La cartella di output del lavoro serve solo durante l'esecuzione e viene eliminata
+    # dopo averne letto i risultati
+    config, sorgenti_csv = args
+    try:
+        with tempfile.TemporaryDirectory() as cartella_input:
+            for nome, contenuto in sorgenti_csv.items():
+                with open(os.path.join(cartella_input, nome), 'w', encoding='utf-8') as f:
+                    f.write(contenuto)
+            riepilogo = genera_scuola_helper(replace(config, cartella_input=cartella_input))
+
+        risultato = {'esito': riepilogo['ESITO'], 'fitness': riepilogo['FITNESS'], 'secondi': riepilogo['SECONDI']}
+        for nome, chiave in (('calendar.csv', 'calendar_csv'), ('teachersLost.csv', 'teachers_lost_csv')):
+            percorso = os.path.join(config.cartella_output, nome)
+            risultato[chiave] = None
+            if riepilogo['ESITO'] == 'OK' and os.path.exists(percorso):
+                with open(percorso, encoding='utf-8') as f:
+                    risultato[chiave] = f.read()
+        return risultato
+    finally:
+        shutil.rmtree(config.cartella_output, ignore_errors=True)
+
+
+class ServizioCalendari:
+    # Servizio di generazione a lungo termine: le librerie sono già importate e il pool di
+    # processi resta attivo tra un lavoro e l'altro, così le richieste piccole non pagano
+    # l'avvio dell'interprete e del pool. Ogni lavoro gira su un solo core.
+    FILE_CSV = ('classes.csv', 'civics_teachers.csv', 'availability.csv', 'closures.csv')
+    # Parametri non modificabili dalle richieste: cartelle e core li decide il servizio;
+    # num_varianti cambierebbe la struttura dell'output (nessun calendar.csv principale) e
+    # data_congelamento_str richiede seed_calendar
+    PARAMETRI_RISERVATI = ('cartella_input', 'cartella_output', 'num_cores', 'seed_calendar',
+                           'num_varianti', 'data_congelamento_str')
+    # Attesa massima (secondi) di una richiesta con "attendi": poi si risponde con lo stato
+    # del lavoro ancora in corso, da consultare con il polling
+    ATTESA_MASSIMA = 600
+    # Lavori terminati conservati per il polling: oltre questo numero si eliminano i più vecchi
+    LAVORI_CONSERVATI = 1000
+
+    def __init__(self, num_cores=4, cartella_output='LAVORI_SERVER'):
+        self.cartella_output = _sanitize_output_path(cartella_output, 'LAVORI_SERVER')
+        # Con un solo core i lavori girano in un thread del processo del servizio
+        if num_cores > 1:
+            self.pool = multiprocessing.Pool(processes=num_cores, initializer=init_worker_senza_gestori)
+        else:
+            self.pool = ThreadPool(processes=1)
+        self.lavori = {}
+        self.terminati = []
+        self.lock = threading.Lock()
+
+    def invia(self, richiesta):
+        # Valida la richiesta e accoda il lavoro; restituisce l'identificativo per il polling.
+        # Richieste non valide sollevano ValueError con il motivo.
+        if not isinstance(richiesta, dict):
+            raise ValueError("La richiesta deve essere un oggetto JSON")
+        sorgenti_csv = richiesta.get('csv')
+        if not isinstance(sorgenti_csv, dict) or sorted(sorgenti_csv) != sorted(self.FILE_CSV) \
+                or not all(isinstance(v, str) for v in sorgenti_csv.values()):
+            raise ValueError(f"'csv' deve contenere il testo dei file {', '.join(self.FILE_CSV)}")
+        parametri = richiesta.get('config', {})
+        if not isinstance(parametri, dict):
+            raise ValueError("'config' deve essere un oggetto JSON")
+        campi = {campo.name for campo in fields(CalendarioConfig)} - set(self.PARAMETRI_RISERVATI)
+        non_validi = sorted(set(parametri) - campi)
+        if non_validi:
+            raise ValueError(f"Parametri non validi: {', '.join(non_validi)}")
+        timeout = richiesta.get('timeout', self.ATTESA_MASSIMA)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError("'timeout' deve essere un numero di secondi positivo")
+
+        id_lavoro = uuid.uuid4().hex
+        config = replace(CalendarioConfig(**parametri),
+                         cartella_output=os.path.join(self.cartella_output, id_lavoro),
+                         num_cores=1)
+        with self.lock:
+            self.lavori[id_lavoro] = {'id': id_lavoro, 'stato': 'in_corso', 'risultato': None}
+        self.pool.apply_async(esegui_lavoro_helper, ((config, sorgenti_csv),),
+                              callback=lambda r: self._termina(id_lavoro, 'completato', r),
+                              error_callback=lambda e: self._termina(id_lavoro, 'errore', {'errore': str(e)}))
+        logging.info(f"Lavoro {id_lavoro} accodato")
+        return id_lavoro
+
+    def _termina(self, id_lavoro, stato, risultato):
+        with self.lock:
+            self.lavori[id_lavoro].update(stato=stato, risultato=risultato)
+            self.terminati.append(id_lavoro)
+            while len(self.terminati) > self.LAVORI_CONSERVATI:
+                del self.lavori[self.terminati.pop(0)]
+        logging.info(f"Lavoro {id_lavoro}: {stato}")
+
+    def stato(self, id_lavoro):
+        # Copia dello stato del lavoro, o None se l'identificativo non esiste
+        with self.lock:
+            lavoro = self.lavori.get(id_lavoro)
+            return dict(lavoro) if lavoro is not None else None
+
+    def attendi(self, id_lavoro, timeout=None):
+        # Attende la fine del lavoro (o lo scadere del timeout) e ne restituisce lo stato
+        inizio = time.perf_counter()
+        while True:
+            lavoro = self.stato(id_lavoro)
+            if lavoro is None or lavoro['stato'] != 'in_corso':
+                return lavoro
+            if timeout is not None and time.perf_counter() - inizio >= timeout:
+                return lavoro
+            time.sleep(0.05)
+
+    def chiudi(self):
+        # Termina il pool ed elimina le cartelle dei lavori interrotti
+        self.pool.terminate()
+        self.pool.join()
+        with self.lock:
+            in_corso = [id_lavoro for id_lavoro, lavoro in self.lavori.items() if lavoro['stato'] == 'in_corso']
+        for id_lavoro in in_corso:
+            shutil.rmtree(os.path.join(self.cartella_output, id_lavoro), ignore_errors=True)
+
+
+class GestoreRichieste(BaseHTTPRequestHandler):
+    # API HTTP del servizio:
+    #   POST /lavori        corpo {"csv": {...}, "config": {...}, "attendi": false} -> {"id": ...}
+    #                       con "attendi": true risponde a lavoro terminato con il risultato,
+    #                       oppure (202) con lo stato se passano "timeout" secondi (al massimo
+    #                       ServizioCalendari.ATTESA_MASSIMA)
+    #   GET  /lavori/<id>   stato del lavoro e, se completato, risultato
+    DIMENSIONE_MASSIMA = 50 * 1024 * 1024
+
+    def _rispondi(self, codice, dati):
+        corpo = json.dumps(dati).encode('utf-8')
+        self.send_response(codice)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/lavori':
+            return self._rispondi(404, {'errore': 'Percorso non trovato'})
+        try:
+            lunghezza = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            lunghezza = -1
+        if lunghezza <= 0 or lunghezza > self.DIMENSIONE_MASSIMA:
+            return self._rispondi(400, {'errore': 'Content-Length mancante o non valido'})
+        try:
+            richiesta = json.loads(self.rfile.read(lunghezza).decode('utf-8'))
+            id_lavoro = self.server.servizio.invia(richiesta)
+        except (ValueError, TypeError) as e:
+            return self._rispondi(400, {'errore': str(e)})
+        if richiesta.get('attendi'):
+            servizio = self.server.servizio
+            lavoro = servizio.attendi(id_lavoro, min(richiesta.get('timeout', servizio.ATTESA_MASSIMA), servizio.ATTESA_MASSIMA))
+            return self._rispondi(202 if lavoro['stato'] == 'in_corso' else 200, lavoro)
+        self._rispondi(202, {'id': id_lavoro})
+
+    def do_GET(self):
+        parti = self.path.strip('/').split('/')
+        if len(parti) != 2 or parti[0] != 'lavori':
+            return self._rispondi(404, {'errore': 'Percorso non trovato'})
+        lavoro = self.server.servizio.stato(parti[1])
+        if lavoro is None:
+            return self._rispondi(404, {'errore': 'Lavoro non trovato'})
+        self._rispondi(200, lavoro)
+
+    def log_message(self, format, *args):
+        logging.info(_sanitize_for_logging(format % args))
+
+
+def crea_server(servizio, host='127.0.0.1', porta=8765):
+    # Server HTTP locale che inoltra le richieste al servizio (porta=0 sceglie una porta libera)
+    server = ThreadingHTTPServer((host, porta), GestoreRichieste)
+    server.servizio = servizio
+    return server
+
+def avvia_server(host='127.0.0.1', porta=8765, num_cores=4, cartella_output='LAVORI_SERVER'):
+    # Avvia il servizio e resta in ascolto fino a Ctrl+C o SIGTERM
+    servizio = ServizioCalendari(num_cores=num_cores, cartella_output=cartella_output)
+    server = crea_server(servizio, host, porta)
+
+    def arresta(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, arresta)
+    logging.info(f"Servizio calendari in ascolto su http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Arresto del servizio...")
+    finally:
+        server.server_close()
+        servizio.chiudi()
+
 
 if __name__ == "__main__":
     config = CalendarioConfig(
@@ -65,3 +65,56 @@ generator_mod = importlib.util.module_from_spec(spec)
 # We need to add the module to sys.modules so it can be imported normally in tests
 sys.modules['generator_mod'] = generator_mod
 spec.loader.exec_module(generator_mod)
+
+import random
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+GIORNI_SETTIMANA = ['LUN', 'MAR', 'MER', 'GIO', 'VEN', 'SAB']
+
+
+class GeneratoreDiProva(generator_mod.CalendarioGenerator):
+    # Base dei generatori usati nei test: salta __init__ (caricamento dei file e inizializzazione)
+    # e parte dai valori predefiniti di CalendarioConfig, così i nuovi parametri sono già presenti.
+    # Esegue tutto in serie e con un generatore casuale con seme fisso.
+    def __init__(self):
+        for campo in fields(generator_mod.CalendarioConfig):
+            setattr(self, campo.name, campo.default)
+        self.num_cores = 1
+        self.base_probabilita_mutazione = self.probabilita_mutazione
+        self.base_probabilita_crossover = self.probabilita_crossover
+        self.base_elitismo_rate = self.elitismo_rate
+        self.rng = random.Random(0)
+        self._campionatore_diversita = random.Random(0)
+        self.hyperparams = {}
+        self.tasso_figli_validi = 1.0
+        self.selettori_operatori = None
+        self._interruzione_richiesta = False
+
+    def imposta_slot(self, slot_disponibili):
+        # Usa gli slot indicati e ne calcola le strutture di lookup
+        self.slot_disponibili = slot_disponibili
+        self._precalcola_lookups()
+        self._precalcola_indici_slot()
+
+
+def slot_settimanali(classi=('1A',), num_settimane=6, ore=((1, 'DocA'), (2, 'DocB')), giorni=('LUN',)):
+    # Slot di prova a partire da lunedì 14/10/2024: per ogni classe, settimana e giorno un'ora
+    # per ogni coppia (ora, docente sostituito)
+    lunedi = datetime(2024, 10, 14)
+    slot_disponibili = []
+    for classe in classi:
+        for settimana in range(num_settimane):
+            for giorno in giorni:
+                data = lunedi + timedelta(days=7 * settimana + GIORNI_SETTIMANA.index(giorno))
+                for ora, docente in ore:
+                    slot_disponibili.append({
+                        'CLASSE': classe,
+                        'DATA': data,
+                        'GIORNO': giorno,
+                        'ORA': ora,
+                        'DOCENTE_SOSTITUITO': docente,
+                        'KEY': f"{classe}_{data.strftime('%Y%m%d')}_{ora}",
+                        'SETTIMANA': data.isocalendar()[1]
+                    })
+    return slot_disponibili
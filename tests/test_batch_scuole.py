@@ -0,0 +1,160 @@
+import json
+import os
+import signal
+import threading
+import time
+import pytest
+from unittest.mock import patch
+import generator_mod
+from generator_mod import CalendarioConfig, _config_scuola, _dimensione_scuola, _nomi_scuole, genera_calendari_scuole
+
+def _crea_scuola(cartella, num_classi, config=None):
+    os.makedirs(cartella)
+    with open(os.path.join(cartella, 'classes.csv'), 'w', encoding='utf-8') as f:
+        f.write('CLASSE\n' + ''.join(f"{i}A\n" for i in range(num_classi)))
+    if config is not None:
+        with open(os.path.join(cartella, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+    return str(cartella)
+
+def test_config_scuola_applies_overrides_and_folders(tmp_path):
+    cartella = _crea_scuola(tmp_path / 'liceo', 2, {'ore_tot_civics': 20})
+    config = _config_scuola(CalendarioConfig(cartella_output='OUT', num_cores=8), cartella)
+    assert config.ore_tot_civics == 20
+    assert config.cartella_input == cartella
+    assert config.cartella_output == os.path.join('OUT', 'liceo')
+    assert config.num_cores == 1
+
+def test_config_scuola_rejects_unknown_parameters(tmp_path):
+    cartella = _crea_scuola(tmp_path / 'liceo', 2, {'parametro_inesistente': 1})
+    with pytest.raises(SystemExit) as e:
+        _config_scuola(CalendarioConfig(), cartella)
+    assert e.value.code == 1
+
+def test_dimensione_scuola_counts_rows(tmp_path):
+    assert _dimensione_scuola(_crea_scuola(tmp_path / 'liceo', 3)) == 4
+    assert _dimensione_scuola(str(tmp_path / 'mancante')) == 0
+
+def test_genera_calendari_scuole_runs_largest_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    piccola = _crea_scuola(tmp_path / 'piccola', 1)
+    grande = _crea_scuola(tmp_path / 'grande', 5)
+    eseguite = []
+
+    def genera_finto(config):
+        eseguite.append(config.cartella_input)
+        return {'SCUOLA': os.path.basename(config.cartella_input), 'CARTELLA_INPUT': config.cartella_input,
+                'FITNESS': 1.0, 'ESITO': 'OK'}
+
+    with patch.object(generator_mod, 'genera_scuola_helper', genera_finto), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        riepilogo = genera_calendari_scuole([piccola, grande], CalendarioConfig(cartella_output='OUT', num_cores=1))
+
+    assert eseguite == [grande, piccola]
+    assert [r['SCUOLA'] for r in riepilogo] == ['grande', 'piccola']
+
+def test_nomi_scuole_use_relative_path_for_duplicate_names(tmp_path):
+    assert _nomi_scuole(['scuole/liceo', 'scuole/tecnico/']) == ['liceo', 'tecnico']
+    nomi = _nomi_scuole([str(tmp_path / 'nord' / 'liceo'), str(tmp_path / 'sud' / 'liceo')])
+    assert nomi == [os.path.join('nord', 'liceo'), os.path.join('sud', 'liceo')]
+
+def test_genera_calendari_scuole_keeps_duplicate_names_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    nord = _crea_scuola(tmp_path / 'nord' / 'liceo', 1)
+    sud = _crea_scuola(tmp_path / 'sud' / 'liceo', 2)
+    uscite = []
+
+    def genera_finto(config):
+        uscite.append(config.cartella_output)
+        return {'SCUOLA': 'liceo', 'CARTELLA_INPUT': config.cartella_input, 'FITNESS': 1.0, 'ESITO': 'OK'}
+
+    with patch.object(generator_mod, 'genera_scuola_helper', genera_finto), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        riepilogo = genera_calendari_scuole([nord, sud, nord], CalendarioConfig(cartella_output='OUT', num_cores=1))
+
+    assert sorted(uscite) == [os.path.join('OUT', 'nord', 'liceo'), os.path.join('OUT', 'sud', 'liceo')]
+    assert [r['SCUOLA'] for r in riepilogo] == [os.path.join('nord', 'liceo'), os.path.join('sud', 'liceo')]
+
+def test_genera_calendari_scuole_reports_invalid_config_and_continues(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    valida = _crea_scuola(tmp_path / 'valida', 1)
+    errata = _crea_scuola(tmp_path / 'errata', 1)
+    with open(os.path.join(errata, 'config.json'), 'w', encoding='utf-8') as f:
+        f.write('{non json')
+    eseguite = []
+
+    def genera_finto(config):
+        eseguite.append(config.cartella_input)
+        return {'SCUOLA': 'valida', 'CARTELLA_INPUT': config.cartella_input, 'FITNESS': 1.0, 'ESITO': 'OK'}
+
+    with patch.object(generator_mod, 'genera_scuola_helper', genera_finto), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        riepilogo = genera_calendari_scuole([errata, valida], CalendarioConfig(cartella_output='OUT', num_cores=1))
+
+    assert eseguite == [valida]
+    assert [(r['SCUOLA'], r['ESITO'], r['FITNESS']) for r in riepilogo] == [('errata', 'ERRORE', None), ('valida', 'OK', 1.0)]
+
+def test_genera_scuola_helper_reports_fatal_errors():
+    with patch.object(generator_mod.CalendarioGenerator, '__init__', side_effect=SystemExit(1)):
+        riga = generator_mod.genera_scuola_helper(CalendarioConfig(cartella_input='scuole/liceo'))
+    assert riga['SCUOLA'] == 'liceo'
+    assert riga['ESITO'] == 'ERRORE'
+    assert riga['FITNESS'] is None
+
+def test_genera_scuola_helper_reports_interruption():
+    def genera_interrotto(self):
+        self._interruzione_richiesta = True
+        return 5.0
+
+    with patch.object(generator_mod.CalendarioGenerator, '__init__', return_value=None), \
+            patch.object(generator_mod.CalendarioGenerator, 'genera_calendario', genera_interrotto):
+        riga = generator_mod.genera_scuola_helper(CalendarioConfig(cartella_input='scuole/liceo'))
+    assert riga['ESITO'] == 'INTERROTTO'
+    assert riga['FITNESS'] == 5.0
+
+def test_genera_calendari_scuole_stops_serial_batch_on_signal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prima = _crea_scuola(tmp_path / 'prima', 2)
+    seconda = _crea_scuola(tmp_path / 'seconda', 1)
+    eseguite = []
+
+    def genera_finto(config):
+        # Ctrl+C mentre la prima scuola è in corso, fuori dal ciclo evolutivo
+        eseguite.append(config.cartella_input)
+        signal.raise_signal(signal.SIGINT)
+        return {'SCUOLA': 'prima', 'CARTELLA_INPUT': config.cartella_input, 'FITNESS': 1.0, 'ESITO': 'OK'}
+
+    precedente = signal.getsignal(signal.SIGINT)
+    with patch.object(generator_mod, 'genera_scuola_helper', genera_finto), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        riepilogo = genera_calendari_scuole([prima, seconda], CalendarioConfig(cartella_output='OUT', num_cores=1))
+
+    assert eseguite == [prima]
+    assert [(r['SCUOLA'], r['ESITO'], r['FITNESS']) for r in riepilogo] == [('prima', 'OK', 1.0), ('seconda', 'INTERROTTO', None)]
+    assert signal.getsignal(signal.SIGINT) is precedente
+
+def _scuola_bloccata(config):
+    # Scuola eseguita in un worker del pool: quella "lenta" non termina da sola e, come
+    # genera_calendario, avvolge il lavoro nella gestione delle interruzioni
+    if os.path.basename(config.cartella_input) == 'lenta':
+        generatore = generator_mod.CalendarioGenerator.__new__(generator_mod.CalendarioGenerator)
+        with generatore._gestione_interruzioni():
+            time.sleep(60)
+    return {'SCUOLA': None, 'CARTELLA_INPUT': config.cartella_input, 'FITNESS': 1.0, 'ESITO': 'OK'}
+
+def test_genera_calendari_scuole_terminates_pool_on_signal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    lenta = _crea_scuola(tmp_path / 'lenta', 3)
+    veloce = _crea_scuola(tmp_path / 'veloce', 1)
+    timer = threading.Timer(1.0, os.kill, (os.getpid(), signal.SIGINT))
+
+    inizio = time.perf_counter()
+    with patch.object(generator_mod, 'genera_scuola_helper', _scuola_bloccata), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        timer.start()
+        riepilogo = genera_calendari_scuole([lenta, veloce], CalendarioConfig(cartella_output='OUT', num_cores=2))
+    timer.join()
+
+    # Il pool viene terminato senza attendere la scuola in corso
+    assert time.perf_counter() - inizio < 30
+    assert [(r['SCUOLA'], r['ESITO']) for r in riepilogo] == [('lenta', 'INTERROTTO'), ('veloce', 'OK')]
@@ -1,9 +1,9 @@
 import pytest
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, classi_list):
-        # Bypass the original __init__ to avoid file loading and initialization logic
+        super().__init__()
         self.classi_list = classi_list
 
 def test_calcola_deviazione_totale_empty():
@@ -1,8 +1,9 @@
 import pytest
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, base_prob, base_elite):
+        super().__init__()
         self.base_probabilita_mutazione = base_prob
         self.base_elitismo_rate = base_elite
 
@@ -1,11 +1,11 @@
 
 import pytest
 from collections import defaultdict
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, classi_df, slot_disponibili):
-        # Bypass the original __init__ to avoid file loading and initialization logic
+        super().__init__()
         self.classi_df = classi_df
         self.slot_disponibili = slot_disponibili
         self.slots_by_class = defaultdict(list)
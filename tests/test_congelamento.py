@@ -0,0 +1,130 @@
+import random
+import pytest
+from collections import defaultdict
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=6):
+        super().__init__()
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 4
+        self.seed_calendar = 'calendar.csv'
+        self.data_congelamento_str = '28/10/2024'
+        self.mappa_giorni = {0: 'LUN', 1: 'MAR', 2: 'MER', 3: 'GIO', 4: 'VEN', 5: 'SAB', 6: 'DOM'}
+        self.docenti_civics_classi = {'Civ1': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}}
+        self.slot_disponibili = slot_settimanali(num_settimane=num_settimane)
+        self._precalcola_lookups()
+
+# Due ore già svolte entrambe con DocA, una futura nel calendario precedente
+RIGHE_SVOLTE = [
+    {'CLASSE': '1A', 'DATA': datetime(2024, 10, 14), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1', 'DOCENTE_SOSTITUITO': 'DocA'},
+    {'CLASSE': '1A', 'DATA': datetime(2024, 10, 21), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1', 'DOCENTE_SOSTITUITO': 'DocA'},
+    {'CLASSE': '1A', 'DATA': datetime(2024, 11, 4), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1', 'DOCENTE_SOSTITUITO': 'DocA'},
+]
+
+def _congela(gen):
+    with patch.object(MockGenerator, '_leggi_calendario', return_value=RIGHE_SVOLTE):
+        gen._applica_congelamento()
+    gen._precalcola_indici_slot()
+
+def test_applica_congelamento_without_date_is_noop():
+    gen = MockGenerator()
+    gen.data_congelamento_str = ''
+    num_slot = len(gen.slot_disponibili)
+    gen._applica_congelamento()
+    assert len(gen.slot_disponibili) == num_slot
+    assert gen.ore_target_per_classe == {'1A': 4}
+    assert gen.calendario_congelato == []
+
+def test_applica_congelamento_fixes_past_assignments():
+    gen = MockGenerator()
+    _congela(gen)
+
+    assert gen.ore_target_per_classe == {'1A': 2}
+    assert gen.ore_perse_base['1A'] == {'DocA': 2}
+    assert [e['DATA'] for e in gen.calendario_congelato] == ['14/10/2024', '21/10/2024']
+    assert gen.calendario_congelato[0]['GIORNO'] == 'LUN'
+    # Restano solo gli slot dal 28/10 in poi
+    assert all(slot['DATA'] >= datetime(2024, 10, 28) for slot in gen.slot_disponibili)
+    assert len(gen.slot_disponibili) == 8
+
+def test_applica_congelamento_requires_seed_calendar():
+    gen = MockGenerator()
+    gen.seed_calendar = ''
+    with pytest.raises(SystemExit) as e:
+        gen._applica_congelamento()
+    assert e.value.code == 1
+
+def test_applica_congelamento_invalid_date():
+    gen = MockGenerator()
+    gen.data_congelamento_str = '2024-10-28'
+    with pytest.raises(SystemExit) as e:
+        gen._applica_congelamento()
+    assert e.value.code == 1
+
+def test_fitness_and_constraints_use_frozen_baseline():
+    gen = MockGenerator()
+    _congela(gen)
+    future_a = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 1]
+    future_b = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 2]
+
+    # Con due ore di DocA già svolte, le due ore future su DocB bilanciano il calendario
+    bilanciato = {k: 'Civ1' for k in future_b[:2]}
+    sbilanciato = {k: 'Civ1' for k in future_a[:2]}
+    assert gen.verifica_vincoli(bilanciato)
+    assert not gen.verifica_vincoli({future_b[0]: 'Civ1'})
+    assert gen.calcola_fitness(bilanciato) < gen.calcola_fitness(sbilanciato)
+
+def test_ricerca_locale_respects_frozen_baseline():
+    gen = MockGenerator()
+    _congela(gen)
+    individuo = {k: 'Civ1' for k in [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 1][:2]}
+
+    migliorato, fitness = gen.ricerca_locale(individuo, tempo_max=5.0)
+
+    assert gen.verifica_vincoli(migliorato)
+    assert all(gen.slots_by_key[k]['DOCENTE_SOSTITUITO'] == 'DocB' for k in migliorato)
+    assert fitness == gen.calcola_fitness(migliorato)
+
+def test_individuo_da_calendario_skips_frozen_rows():
+    gen = MockGenerator()
+    _congela(gen)
+    assert gen.individuo_da_calendario(RIGHE_SVOLTE) == {'1A_20241104_1': 'Civ1'}
+
+class GeneratoreOrganico(MockGenerator):
+    # Civ1, in organico, copre anche le ore degli altri docenti; in prima ora è il sostituito
+    def __init__(self):
+        super().__init__()
+        self.ore_tot_civics = 4
+        self.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+        self.docenti_civics_organico = defaultdict(set, {'1A': {'Civ1'}})
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}, 'Civ2': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(num_settimane=8, ore=((1, 'Civ1'), (2, 'Doc2'))))
+
+def test_freeze_keeps_future_assignments_of_generated_calendar(caplog):
+    # Ripianificando da una data di congelamento un calendar.csv prodotto dallo strumento,
+    # le ore passate vengono congelate e quelle future tornano tutte nel calendario di partenza
+    for seme in range(10):
+        originale = GeneratoreOrganico()
+        originale.rng = random.Random(seme)
+        individuo = originale.genera_individuo_base(strategy='random')
+        righe_csv = [{nome: str(valore) for nome, valore in riga.items()} for riga in originale.create_calendario(individuo)]
+
+        gen = GeneratoreOrganico()
+        gen.data_congelamento_str = '04/11/2024'
+        with patch('generator_mod.pd.read_csv', return_value=pd.DataFrame(righe_csv)), caplog.at_level('INFO'):
+            gen._applica_congelamento()
+            gen._precalcola_indici_slot()
+            seed = gen.individuo_da_calendario(gen._leggi_calendario(gen.seed_calendar))
+
+        futuro = {k: d for k, d in individuo.items() if originale.slots_by_key[k]['DATA'] >= datetime(2024, 11, 4)}
+        assert seed == futuro
+        assert gen.verifica_vincoli(seed)
+        assert len(gen.calendario_congelato) + len(seed) == len(individuo)
+        assert gen.calcola_fitness(seed) == pytest.approx(originale.calcola_fitness(individuo))
+    assert 'Scartate' not in caplog.text
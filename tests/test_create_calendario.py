@@ -1,10 +1,11 @@
 import pytest
 from datetime import datetime
 from collections import defaultdict
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, slots_by_key):
+        super().__init__()
         self.slots_by_key = slots_by_key
 
 def test_create_calendario_basic():
@@ -0,0 +1,43 @@
+import random
+import pytest
+from conftest import GeneratoreDiProva
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, crossover_maschera='blocchi'):
+        super().__init__()
+        self.rng = random.Random(1)
+        self.crossover_maschera = crossover_maschera
+
+@pytest.mark.parametrize('tipo', ['blocchi', 'uniforme'])
+def test_crossover_takes_each_gene_from_one_parent(tipo):
+    gen = MockGenerator(tipo)
+    genitore1 = {f"k{i}": 'A' for i in range(50)}
+    genitore2 = {f"k{i}": 'B' for i in range(50)}
+    figlio = gen.crossover(genitore1, genitore2)
+    assert list(figlio) == list(genitore1)
+    assert set(figlio.values()) == {'A', 'B'}
+
+def test_crossover_keeps_parent1_when_parent2_lacks_key():
+    gen = MockGenerator('uniforme')
+    genitore1 = {f"k{i}": 'A' for i in range(50)}
+    genitore2 = {f"k{i}": 'B' for i in range(0, 50, 2)}
+    for _ in range(20):
+        figlio = gen.crossover(genitore1, genitore2)
+        assert all(figlio[f"k{i}"] == 'A' for i in range(1, 50, 2))
+
+def test_maschera_blocchi_assigns_whole_blocks():
+    gen = MockGenerator('blocchi')
+    conteggi = []
+    for _ in range(200):
+        maschera = gen._maschera_crossover(100)
+        assert len(maschera) == 100
+        conteggi.append(sum(maschera))
+    # 10 blocchi da 10 geni: il numero di geni presi da genitore2 è sempre multiplo di 10
+    assert all(c % 10 == 0 for c in conteggi)
+    assert 40 < sum(conteggi) / len(conteggi) < 60
+
+def test_maschera_uniforme_rate():
+    gen = MockGenerator('uniforme')
+    totale = sum(sum(gen._maschera_crossover(100)) for _ in range(200))
+    assert 45 < totale / 200 < 55
+    assert gen._maschera_crossover(0) == []
@@ -0,0 +1,69 @@
+import random
+from collections import defaultdict
+from unittest.mock import patch
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self):
+        super().__init__()
+        # Una classe con 2 ore su 10 settimane e due docenti civics sempre disponibili
+        self.rng = random.Random(3)
+        self.probabilita_mutazione = 0.1
+        self.probabilita_mutazione_slot = 0.5
+        self.probabilita_mutazione_cloni = 1.0
+        self.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}, 'Civ2': {'LUN': [True, True]}}
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 2
+        self.imposta_slot(slot_settimanali(num_settimane=10, ore=((1, 'Doc'), (2, 'Doc'))))
+
+def _individuo():
+    return {'1A_20241014_1': 'Civ1', '1A_20241021_2': 'Civ1'}
+
+def test_diversita_popolazione_counts_unique_genomes():
+    gen = MockGenerator()
+    diverso = {'1A_20241014_1': 'Civ2', '1A_20241028_1': 'Civ1'}
+    gen.population = [gen._membro(_individuo()), gen._membro(_individuo()), gen._membro(diverso)]
+    genomi_unici, distanza_media = gen.diversita_popolazione()
+    assert genomi_unici == 2
+    # Tra i cloni la distanza è 0, tra un clone e diverso 3 slot differiscono
+    assert 0 < distanza_media < 3
+
+def test_diversita_popolazione_keeps_its_own_sampler():
+    gen = MockGenerator()
+    gen.population = [gen._membro(_individuo()), gen._membro({'1A_20241014_1': 'Civ2', '1A_20241028_1': 'Civ1'})]
+    stato_rng = gen.rng.getstate()
+    campionatore = gen._campionatore_diversita
+    stato_campionatore = campionatore.getstate()
+    gen.diversita_popolazione()
+    # Il campionatore resta lo stesso tra le chiamate e avanza, il flusso di rng non cambia
+    assert gen._campionatore_diversita is campionatore
+    assert campionatore.getstate() != stato_campionatore
+    assert gen.rng.getstate() == stato_rng
+
+def test_elimina_cloni_replaces_duplicates_with_valid_variants():
+    gen = MockGenerator()
+    gen.population = [gen._membro(_individuo()) for _ in range(5)]
+    gen.population[0]['fitness'] = 1.0
+
+    sostituiti = gen.elimina_cloni()
+
+    assert sostituiti > 0
+    assert gen.population[0] == {'individuo': _individuo(), 'occupazione': gen.population[0]['occupazione'], 'fitness': 1.0}
+    assert gen.diversita_popolazione()[0] == 1 + sostituiti
+    assert all(gen.verifica_vincoli(m['individuo'], m['occupazione']) for m in gen.population)
+    assert all('fitness' not in m for m in gen.population[1:] if m['individuo'] != _individuo())
+    assert gen.probabilita_mutazione == 0.1
+
+def test_elimina_cloni_falls_back_to_random_individual():
+    gen = MockGenerator()
+    gen.population = [gen._membro(_individuo()) for _ in range(3)]
+    # La mutazione lascia il clone invariato: si usa un nuovo individuo casuale
+    with patch.object(MockGenerator, 'mutazione', side_effect=lambda ind, occ: ind), \
+            patch.object(MockGenerator, 'mutazione_slot', side_effect=lambda ind, occ: ind):
+        sostituiti = gen.elimina_cloni()
+
+    assert sostituiti == 2
+    assert gen.diversita_popolazione()[0] == 3
+    assert all(gen.verifica_vincoli(m['individuo'], m['occupazione']) for m in gen.population)
@@ -5,7 +5,9 @@ from generator_mod import (
     calcola_fitness_helper,
     genera_individuo_greedy_helper,
     genera_individuo_batch_helper,
-    genera_individuo_random_helper
+    genera_individuo_random_helper,
+    ricerca_locale_helper,
+    simulated_annealing_helper
 )
 
 def test_calcola_fitness_helper():
@@ -44,3 +46,32 @@ def test_genera_individuo_random_helper():
 
     mock_self.genera_individuo_random.assert_called_once_with(None)
     assert result == mock_self.genera_individuo_random.return_value
+
+def test_ricerca_locale_helper():
+    mock_self = MagicMock()
+    generator_mod._worker_instance = mock_self
+    individuo = {'slot1': 'Docente1'}
+
+    result = ricerca_locale_helper((individuo, 7))
+
+    mock_self.ricerca_locale.assert_called_once_with(individuo)
+    assert result == mock_self.ricerca_locale.return_value
+
+def test_genera_individuo_helper_uses_task_stream():
+    mock_self = MagicMock()
+    rng_principale = mock_self.rng
+    generator_mod._worker_instance = mock_self
+    mock_self.genera_individuo_random.side_effect = lambda _: mock_self.rng.random()
+
+    # Lo stesso seme produce lo stesso risultato e il generatore dell'istanza viene ripristinato
+    assert genera_individuo_random_helper(123) == genera_individuo_random_helper(123)
+    assert mock_self.rng is rng_principale
+
+def test_simulated_annealing_helper():
+    mock_self = MagicMock()
+    generator_mod._worker_instance = mock_self
+
+    result = simulated_annealing_helper(42)
+
+    mock_self.simulated_annealing.assert_called_once_with()
+    assert result == mock_self.simulated_annealing.return_value
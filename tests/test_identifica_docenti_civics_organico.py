@@ -1,10 +1,11 @@
 import pytest
 from collections import defaultdict
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 import pandas as pd
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, classi_df, docenti_civics_classi, giorni_settimana):
+        super().__init__()
         self.classi_df = classi_df
         self.docenti_civics_classi = docenti_civics_classi
         self.giorni_settimana = giorni_settimana
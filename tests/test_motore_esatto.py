@@ -0,0 +1,121 @@
+import random
+import importlib
+import sys
+import pytest
+from collections import defaultdict
+from unittest.mock import patch
+import generator_mod
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=6):
+        super().__init__()
+        self.esatto_tempo_max = 10.0
+        self.esatto_max_soluzioni = 3
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 4
+        self.docenti_civics_classi = {'Civ1': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(num_settimane=num_settimane))
+
+def test_risolvi_esatto_requires_ortools(monkeypatch):
+    monkeypatch.setattr(generator_mod, 'cp_model', None)
+    gen = MockGenerator()
+    with pytest.raises(SystemExit) as e:
+        gen.risolvi_esatto()
+    assert e.value.code == 1
+
+def test_genera_calendario_esatto_saves_best_valid_solution():
+    gen = MockGenerator()
+    chiavi_a = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 1]
+    chiavi_b = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 2]
+    sbilanciata = {k: 'Civ1' for k in chiavi_a[:4]}
+    bilanciata = {k: 'Civ1' for k in chiavi_a[:2] + chiavi_b[2:4]}
+    non_valida = {k: 'Civ1' for k in chiavi_a[:3]}
+
+    with patch.object(MockGenerator, 'risolvi_esatto', return_value=[non_valida, sbilanciata, bilanciata]), \
+            patch.object(MockGenerator, '_salva_finale') as mock_salva:
+        gen.genera_calendario_esatto()
+
+    mock_salva.assert_called_once_with(bilanciata, gen.calcola_fitness(bilanciata))
+
+def test_genera_calendario_esatto_without_solutions():
+    gen = MockGenerator()
+    with patch.object(MockGenerator, 'risolvi_esatto', return_value=[]), \
+            patch.object(MockGenerator, '_salva_finale') as mock_salva:
+        gen.genera_calendario_esatto()
+    mock_salva.assert_not_called()
+
+@pytest.fixture(scope='module')
+def librerie_reali():
+    # conftest sostituisce numpy e pandas con dei mock, ma il solver di OR-Tools usa numpy:
+    # si importa una copia di cp_model con le librerie vere, ripristinando poi i mock
+    pytest.importorskip('ortools')
+    mock_moduli = {nome: sys.modules.pop(nome) for nome in ('numpy', 'pandas', 'ortools.sat.python.cp_model')
+                   if nome in sys.modules}
+    try:
+        return importlib.import_module('numpy'), importlib.import_module('ortools.sat.python.cp_model')
+    finally:
+        sys.modules.update(mock_moduli)
+
+@pytest.fixture
+def cp_model_reale(monkeypatch, librerie_reali):
+    numpy, cp_model = librerie_reali
+    monkeypatch.setitem(sys.modules, 'numpy', numpy)
+    monkeypatch.setattr(generator_mod, 'cp_model', cp_model)
+    return cp_model
+
+def _valore_obiettivo(gen, individuo, cp_model):
+    # Valore dell'obiettivo CP-SAT con le variabili fissate sull'individuo
+    modello, variabili = gen.costruisci_modello_esatto()
+    for (key, docente), var in variabili.items():
+        modello.Add(var == int(individuo.get(key) == docente))
+    solver = cp_model.CpSolver()
+    assert solver.Solve(modello) == cp_model.OPTIMAL
+    return solver.ObjectiveValue() / gen.SCALA_ESATTO
+
+@pytest.mark.parametrize('organico', [set(), {'DocA'}])
+def test_objective_matches_fitness(cp_model_reale, organico):
+    gen = MockGenerator(num_settimane=10)
+    gen.docenti_civics_organico['1A'] = organico
+    chiavi_a = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 1]
+    chiavi_b = [s['KEY'] for s in gen.slot_disponibili if s['ORA'] == 2]
+    for individuo in ({k: 'Civ1' for k in chiavi_a[:4]},
+                      {k: 'Civ1' for k in chiavi_a[:3] + chiavi_b[3:4]},
+                      {k: 'Civ1' for k in chiavi_a[:2] + chiavi_b[2:4]}):
+        assert _valore_obiettivo(gen, individuo, cp_model_reale) == pytest.approx(gen.calcola_fitness(individuo), abs=1e-5)
+
+def test_risolvi_esatto_finds_optimal_calendar(cp_model_reale):
+    gen = MockGenerator()
+    soluzioni = gen.risolvi_esatto()
+    assert soluzioni and gen.verifica_vincoli(soluzioni[0])
+    ore_perse = defaultdict(int)
+    for key in soluzioni[0]:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+    assert ore_perse == {'DocA': 2, 'DocB': 2}
+
+class GeneratoreOrganico(GeneratoreDiProva):
+    # Civ1 è in organico in 1A, insegna anche in 1B ed è il docente sostituito in prima ora
+    def __init__(self):
+        super().__init__()
+        self.allow_teacher_replace_self = False
+        self.classi_list = ['1A', '1B']
+        self.ore_tot_civics = 3
+        self.docenti_civics_classi = {'Civ1': ['1A', '1B'], 'Civ2': ['1B']}
+        self.docenti_civics_organico = defaultdict(set, {'1A': {'Civ1'}})
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}, 'Civ2': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(classi=('1A', '1B'), num_settimane=6, ore=((1, 'Civ1'), (2, 'DocB'))))
+
+def test_generated_calendar_is_feasible_in_exact_model(cp_model_reale):
+    # Ogni calendario prodotto dagli operatori genetici è una soluzione ammissibile del modello
+    gen = GeneratoreOrganico()
+    gen.probabilita_mutazione = 0.5
+    modello, variabili = gen.costruisci_modello_esatto()
+    for seme in range(10):
+        gen.rng = random.Random(seme)
+        individuo = gen.genera_individuo_base()
+        assert individuo is not None
+        individuo = gen.mutazione(individuo, gen.costruisci_occupazione(individuo))
+        assert all((key, docente) in variabili for key, docente in individuo.items())
+        assert _valore_obiettivo(gen, individuo, cp_model_reale) == pytest.approx(gen.calcola_fitness(individuo), abs=1e-5)
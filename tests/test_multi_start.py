@@ -0,0 +1,92 @@
+import multiprocessing
+import random
+from collections import defaultdict
+from unittest.mock import patch
+import generator_mod
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, multi_start=4):
+        super().__init__()
+        self.multi_start = multi_start
+        self.multi_start_margine = 0.1
+        self.cartella_output = 'OUT'
+
+def test_in_svantaggio_shares_best_fitness_and_applies_margin():
+    gen = MockGenerator()
+    gen._incumbente = multiprocessing.Value('d', float('inf'))
+    assert not gen._in_svantaggio(100.0, 3)
+    assert gen._incumbente.value == 100.0
+    # Entro il margine del 10% o ancora in miglioramento si continua
+    assert not gen._in_svantaggio(109.0, 1)
+    assert not gen._in_svantaggio(150.0, 0)
+    assert gen._in_svantaggio(111.0, 1)
+    assert gen._incumbente.value == 100.0
+
+def test_multi_start_saves_best_run(tmp_path):
+    gen = MockGenerator()
+    gen.cartella_output = str(tmp_path)
+    fitness_per_avvio = {(0.3, 0.3): 5.0, (0.6, 0.2): 2.0, (0.1, 0.3): None, (0.2, 0.6): 7.0}
+    avvii = []
+
+    def esegui_avvio_finto(self):
+        avvii.append((self.quote_iniziali, self.num_cores, self._incumbente is not None))
+        fitness = fitness_per_avvio[self.quote_iniziali]
+        if fitness is None:
+            return None, None, [], False
+        return fitness, {'k': fitness}, [{'GENERAZIONE': 1}], fitness > 5
+
+    with patch.object(MockGenerator, 'esegui_avvio', esegui_avvio_finto), \
+            patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: fit) as mock_salva, \
+            patch.object(generator_mod.pd, 'DataFrame') as mock_df:
+        assert gen.genera_calendario_multi_start() == 2.0
+
+    assert [a[0] for a in avvii] == [(0.3, 0.3), (0.6, 0.2), (0.1, 0.3), (0.2, 0.6)]
+    assert all(num_cores == 1 and condivisa for _, num_cores, condivisa in avvii)
+    mock_salva.assert_called_once_with({'k': 2.0}, 2.0)
+    riepilogo = mock_df.call_args[0][0]
+    assert [r['FERMATO_IN_ANTICIPO'] for r in riepilogo] == [False, False, False, True]
+    # L'istanza originale non viene modificata e non resta legata alla fitness condivisa
+    assert gen.quote_iniziali == (0.3, 0.3) and gen._incumbente is None
+
+def test_multi_start_real_runs_start_from_configuration(tmp_path):
+    # Due avvii veri: ognuno parte dalla configurazione, non dallo stato adattato da
+    # un'esecuzione precedente (qui simulato sull'istanza principale)
+    gen = MockGenerator(multi_start=2)
+    gen.cartella_output = str(tmp_path)
+    gen.num_generazioni = 6
+    gen.early_stopping_n = 100
+    gen.popolazione_size = 6
+    gen.classi_list = ['1A']
+    gen.ore_tot_civics = 4
+    gen.docenti_civics_classi = {'Civ1': ['1A']}
+    gen.docenti_civics_organico = defaultdict(set)
+    gen.disponibilita_civics = {'Civ1': {'LUN': [True, True, True]}}
+    gen.imposta_slot(slot_settimanali(ore=((1, 'DocA'), (2, 'DocB'), (3, 'DocC'))))
+    gen.probabilita_mutazione = 0.22
+    gen.hyperparams = {'probabilita_mutazione': 0.22}
+    gen.tasso_figli_validi = 0.5
+    gen.andamento_fitness = [{'GENERAZIONE': 1}]
+    initialize_population = MockGenerator.initialize_population
+    stati_iniziali = []
+
+    def initialize_population_registrata(self):
+        stati_iniziali.append((self.probabilita_mutazione, dict(self.hyperparams), self.tasso_figli_validi,
+                               list(self.andamento_fitness), self.selettori_operatori))
+        initialize_population(self)
+
+    with patch.object(MockGenerator, 'initialize_population', initialize_population_registrata), \
+            patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: fit), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        assert gen.genera_calendario_multi_start() is not None
+
+    iniziale = (gen.base_probabilita_mutazione,
+                {'probabilita_mutazione': gen.base_probabilita_mutazione,
+                 'probabilita_crossover': gen.base_probabilita_crossover,
+                 'elitismo_rate': gen.base_elitismo_rate},
+                1.0, [], None)
+    assert stati_iniziali == [iniziale, iniziale]
+    # Gli avvii non modificano l'istanza principale
+    assert gen.hyperparams == {'probabilita_mutazione': 0.22}
@@ -0,0 +1,48 @@
+import random
+from collections import defaultdict
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, probabilita_mutazione=0.5):
+        super().__init__()
+        self.rng = random.Random(1)
+        self.allow_teacher_replace_self = False
+        self.probabilita_mutazione = probabilita_mutazione
+        self.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A'], 'Civ3': ['1A']}
+        self.docenti_civics_organico = defaultdict(set, {'1A': {'Civ3'}})
+        self.disponibilita_civics = {
+            'Civ1': {'LUN': [True, True]},
+            'Civ2': {'LUN': [False, True]},
+            'Civ3': {'LUN': [True, True]},
+        }
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 20
+        self.imposta_slot(slot_settimanali(num_settimane=20, ore=((1, 'Doc'), (2, 'Doc'))))
+
+def test_posizioni_mutate_edge_probabilities():
+    gen = MockGenerator()
+    assert list(gen._posizioni_mutate(10, 0.0)) == []
+    assert list(gen._posizioni_mutate(10, 1.0)) == list(range(10))
+    assert list(gen._posizioni_mutate(0, 0.5)) == []
+
+def test_posizioni_mutate_matches_bernoulli_rate():
+    gen = MockGenerator()
+    n, probabilita, ripetizioni = 200, 0.1, 500
+    totale = 0
+    for _ in range(ripetizioni):
+        posizioni = list(gen._posizioni_mutate(n, probabilita))
+        assert posizioni == sorted(set(posizioni))
+        assert all(0 <= i < n for i in posizioni)
+        totale += len(posizioni)
+    assert abs(totale / ripetizioni - n * probabilita) < 1.0
+
+def test_mutazione_uses_only_eligible_teachers():
+    gen = MockGenerator(probabilita_mutazione=1.0)
+    individuo = {slot['KEY']: 'Civ1' for slot in gen.slot_disponibili if slot['ORA'] == 1}
+    individuo = gen.mutazione(individuo)
+    # In prima ora Civ2 non è disponibile; Civ3, in organico, sostituisce altri docenti se disponibile
+    assert set(individuo.values()) == {'Civ1', 'Civ3'}
+
+    individuo = {slot['KEY']: 'Civ1' for slot in gen.slot_disponibili if slot['ORA'] == 2}
+    individuo = gen.mutazione(individuo)
+    assert set(individuo.values()) == {'Civ1', 'Civ2', 'Civ3'}
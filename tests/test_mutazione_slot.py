@@ -0,0 +1,97 @@
+import pytest
+from collections import defaultdict
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=4, ore_per_giorno=3):
+        super().__init__()
+        self.probabilita_mutazione_slot = 1.0
+        self.docenti_per_classe = {'1A': ['Civ1', 'Civ2']}
+        self.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {
+            'Civ1': {'LUN': [True] * ore_per_giorno, 'MAR': [True] * ore_per_giorno},
+            'Civ2': {'LUN': [False] * ore_per_giorno, 'MAR': [True] * ore_per_giorno},
+        }
+        self.slot_disponibili = slot_settimanali(num_settimane=num_settimane, giorni=('LUN', 'MAR'),
+                                                 ore=[(ora, f'Doc{ora}') for ora in range(1, ore_per_giorno + 1)])
+        self.slots_by_key = {slot['KEY']: slot for slot in self.slot_disponibili}
+
+def test_precalcola_indici_slot():
+    gen = MockGenerator(num_settimane=2)
+    gen._precalcola_indici_slot()
+
+    settimane = {slot['SETTIMANA'] for slot in gen.slot_disponibili}
+    assert set(gen.slot_per_classe_settimana.keys()) == {('1A', s) for s in settimane}
+    for (classe, settimana), chiavi in gen.slot_per_classe_settimana.items():
+        assert len(chiavi) == 6
+        assert all(gen.slots_by_key[k]['SETTIMANA'] == settimana for k in chiavi)
+
+    # Il lunedì è disponibile solo Civ1, il martedì entrambi
+    for slot in gen.slot_disponibili:
+        attesi = ['Civ1'] if slot['GIORNO'] == 'LUN' else ['Civ1', 'Civ2']
+        assert gen.docenti_possibili_per_slot[slot['KEY']] == attesi
+
+def test_precalcola_indici_slot_excludes_slots_without_teachers():
+    gen = MockGenerator(num_settimane=1)
+    gen.disponibilita_civics['Civ1']['LUN'] = [False, False, False]
+    gen._precalcola_indici_slot()
+
+    chiavi = next(iter(gen.slot_per_classe_settimana.values()))
+    assert all(gen.slots_by_key[k]['GIORNO'] == 'MAR' for k in chiavi)
+
+def test_mutazione_slot_preserves_one_per_week():
+    gen = MockGenerator(num_settimane=6)
+    gen._precalcola_indici_slot()
+
+    # Una assegnazione nel primo slot di ogni settimana
+    individuo = {chiavi[0]: 'Civ1' for chiavi in gen.slot_per_classe_settimana.values()}
+    settimane_iniziali = sorted(gen.slots_by_key[k]['SETTIMANA'] for k in individuo)
+
+    for _ in range(20):
+        individuo = gen.mutazione_slot(individuo)
+        settimane = sorted(gen.slots_by_key[k]['SETTIMANA'] for k in individuo)
+        assert settimane == settimane_iniziali
+        for key, docente in individuo.items():
+            assert docente in gen.docenti_possibili_per_slot[key]
+
+def test_mutazione_slot_moves_within_week():
+    gen = MockGenerator(num_settimane=1)
+    gen._precalcola_indici_slot()
+    chiavi = gen.slot_per_classe_settimana[next(iter(gen.slot_per_classe_settimana))]
+
+    visitati = set()
+    individuo = {chiavi[0]: 'Civ1'}
+    for _ in range(200):
+        individuo = gen.mutazione_slot(individuo)
+        assert len(individuo) == 1
+        visitati.update(individuo)
+    assert len(visitati) > 1
+
+def test_mutazione_slot_zero_probability_is_noop():
+    gen = MockGenerator(num_settimane=3)
+    gen._precalcola_indici_slot()
+    gen.probabilita_mutazione_slot = 0.0
+    individuo = {chiavi[0]: 'Civ1' for chiavi in gen.slot_per_classe_settimana.values()}
+    assert gen.mutazione_slot(dict(individuo)) == individuo
+
+def test_sposta_in_settimana_keeps_eligible_teacher():
+    gen = MockGenerator(num_settimane=1)
+    gen._precalcola_indici_slot()
+    key = next(s['KEY'] for s in gen.slot_disponibili if s['GIORNO'] == 'MAR')
+    individuo = {key: 'Civ1'}
+
+    nuova_key = gen._sposta_in_settimana(individuo, key)
+
+    # Civ1 è disponibile in tutti gli slot, quindi resta assegnato
+    assert individuo == {nuova_key: 'Civ1'}
+
+def test_scambia_settimane_without_eligible_slots_is_noop():
+    gen = MockGenerator(num_settimane=2)
+    gen._precalcola_indici_slot()
+    chiavi = [c[0] for c in gen.slot_per_classe_settimana.values()]
+    individuo = {chiavi[0]: 'Civ1', chiavi[1]: 'Civ1'}
+    gen.slot_per_classe_settimana = {}
+
+    assert gen._scambia_settimane(individuo, chiavi[0], chiavi[1]) == (chiavi[0], chiavi[1])
+    assert individuo == {chiavi[0]: 'Civ1', chiavi[1]: 'Civ1'}
@@ -0,0 +1,87 @@
+import math
+import random
+from collections import defaultdict
+from unittest.mock import patch
+import pytest
+import generator_mod
+from generator_mod import fronti_non_dominati, distanza_affollamento
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=6):
+        super().__init__()
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 4
+        self.docenti_civics_classi = {'Civ1': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True, True]}}
+        self.popolazione_size = 6
+        self.num_generazioni = 5
+        self.probabilita_mutazione_slot = 0.2
+        self.cartella_output = 'OUT'
+        self.imposta_slot(slot_settimanali(num_settimane=num_settimane, ore=((1, 'DocA'), (2, 'DocB'), (3, 'DocC'))))
+
+    def initialize_population(self):
+        self.population = [self._membro(self.genera_individuo_base(strategy='random'))
+                           for _ in range(self.popolazione_size)]
+
+def test_fronti_non_dominati_orders_fronts():
+    obiettivi = [(1, 5), (2, 2), (5, 1), (3, 3), (4, 4), (2, 2), (6, 6)]
+    fronti = fronti_non_dominati(obiettivi)
+    assert [sorted(f) for f in fronti] == [[0, 1, 2, 5], [3], [4], [6]]
+
+def test_fronti_non_dominati_handles_empty_input():
+    assert fronti_non_dominati([]) == []
+
+def test_distanza_affollamento_boundaries_and_interior():
+    obiettivi = [(0, 4, 7), (1, 2, 7), (4, 0, 7)]
+    distanza = distanza_affollamento(obiettivi, [0, 1, 2])
+    # Il terzo obiettivo è costante e non contribuisce
+    assert distanza[0] == math.inf and distanza[2] == math.inf
+    assert distanza[1] == pytest.approx(4 / 4 + 4 / 4)
+
+def test_componenti_fitness_match_weighted_fitness():
+    gen = MockGenerator()
+    individuo = gen.genera_individuo_base(strategy='random')
+    componenti = gen.componenti_fitness(individuo)
+    assert len(componenti) == 4
+    assert gen.calcola_fitness(individuo) == sum(p * c for p, c in zip(gen.PESI_FITNESS, componenti))
+
+def test_sopravvivenza_keeps_best_fronts_and_least_crowded():
+    gen = MockGenerator()
+    gen.popolazione_size = 3
+    membri = [{'obiettivi': o} for o in [(0, 4), (1, 3), (2, 2), (4, 0), (5, 5)]]
+    sopravvissuti = gen._sopravvivenza_nsga2(membri)
+    # Il primo fronte ha 4 membri: restano i due estremi e uno dei due interni
+    assert len(sopravvissuti) == 3
+    assert membri[0] in sopravvissuti and membri[3] in sopravvissuti
+    assert all(m['rango'] == 0 for m in sopravvissuti)
+    assert membri[4] not in sopravvissuti
+
+def test_torneo_prefers_lower_rank():
+    gen = MockGenerator()
+    gen.population = [{'rango': 0, 'affollamento': 1.0}, {'rango': 1, 'affollamento': math.inf}]
+    genitori = gen._torneo_nsga2()
+    assert len(genitori) == 2
+    # Il membro di rango 1 vince solo quando è estratto due volte
+    assert set(genitori) <= {0, 1}
+    vittorie_rango_1 = sum(sum(gen._torneo_nsga2()) for _ in range(200))
+    assert 0 < vittorie_rango_1 < 200
+
+def test_genera_calendario_nsga2_saves_front(tmp_path):
+    gen = MockGenerator()
+    gen.cartella_output = str(tmp_path)
+    with patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, 'salva_risultati') as mock_salva, \
+            patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: (ind, fit)), \
+            patch.object(generator_mod.pd, 'DataFrame') as mock_df:
+        individuo, fitness = gen.genera_calendario_nsga2()
+
+    assert gen.verifica_vincoli(individuo)
+    assert fitness == gen.calcola_fitness(individuo)
+    assert [r['GENERAZIONE'] for r in gen.andamento_fitness] == [1, 2, 3, 4, 5]
+    riepilogo = mock_df.call_args[0][0]
+    assert riepilogo and [r['SOLUZIONE'] for r in riepilogo] == list(range(1, len(riepilogo) + 1))
+    assert riepilogo[0]['FITNESS'] == fitness
+    assert mock_salva.call_count == len(riepilogo)
+    assert all(not c.kwargs['excel'] for c in mock_salva.call_args_list)
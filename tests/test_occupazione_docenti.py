@@ -0,0 +1,152 @@
+import pytest
+from collections import defaultdict
+from unittest.mock import patch
+from generator_mod import OccupazioneDocenti
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self):
+        super().__init__()
+        # Due classi con le stesse ore, un solo docente civics in comune e uno dedicato a 1A
+        self.probabilita_mutazione = 1.0
+        self.probabilita_mutazione_slot = 0.0
+        self.docenti_civics_classi = {'Civ1': ['1A', '1B'], 'Civ2': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {
+            'Civ1': {'LUN': [True, True]},
+            'Civ2': {'LUN': [True, True]},
+        }
+        self.classi_list = ['1A', '1B']
+        self.ore_tot_civics = 1
+        self.imposta_slot(slot_settimanali(classi=self.classi_list, num_settimane=1, ore=((1, 'Doc'), (2, 'Doc'))))
+
+def test_occupazione_docenti_counts_conflicts():
+    occupazione = OccupazioneDocenti(4)
+    assert occupazione.libero(2)
+
+    occupazione.aggiungi(2)
+    assert not occupazione.libero(2)
+    assert occupazione.conflitti == 0
+
+    occupazione.aggiungi(2)
+    assert occupazione.conflitti == 1
+
+    copia = occupazione.copia()
+    occupazione.rimuovi(2)
+    assert occupazione.conflitti == 0
+    assert not occupazione.libero(2)
+    assert copia.conflitti == 1
+
+    occupazione.rimuovi(2)
+    assert occupazione.libero(2)
+
+def test_celle_distinct_per_teacher_and_time():
+    gen = MockGenerator()
+    celle = {gen._cella(slot['KEY'], docente)
+             for slot in gen.slot_disponibili for docente in ('Civ1', 'Civ2')}
+    # 2 docenti x 2 ore distinte (le due classi condividono data e ora)
+    assert len(celle) == 4
+    assert gen._cella('1A_20241014_1', 'Civ1') == gen._cella('1B_20241014_1', 'Civ1')
+
+def test_conta_conflitti_popolazione():
+    gen = MockGenerator()
+    individui = [
+        {'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'},
+        {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'},
+        {'1A_20241014_1': 'Civ1', '1B_20241014_2': 'Civ1'},
+        {},
+    ]
+    assert gen.conta_conflitti_popolazione(individui) == [1, 0, 0, 0]
+
+def test_costruisci_occupazione():
+    gen = MockGenerator()
+    occupazione = gen.costruisci_occupazione({'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'})
+    assert occupazione.conflitti == 1
+    assert not occupazione.libero(gen._cella('1A_20241014_1', 'Civ1'))
+    assert occupazione.libero(gen._cella('1A_20241014_1', 'Civ2'))
+
+def test_verifica_vincoli_rejects_double_booking():
+    gen = MockGenerator()
+    assert not gen.verifica_vincoli({'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'})
+    assert gen.verifica_vincoli({'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'})
+
+def test_verifica_vincoli_uses_occupancy_index():
+    gen = MockGenerator()
+    individuo = {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'}
+    occupazione = gen.costruisci_occupazione(individuo)
+    occupazione.aggiungi(gen._cella('1B_20241014_1', 'Civ1'))
+    assert not gen.verifica_vincoli(individuo, occupazione)
+
+def test_verifica_vincoli_popolazione_reports_violations():
+    gen = MockGenerator()
+    individui = [
+        {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'},
+        {'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'},
+        {'1A_20241014_1': 'Civ2', '1A_20241014_2': 'Civ1', '1B_20241014_2': 'Civ1'},
+    ]
+    validi, dettagli = gen.verifica_vincoli_popolazione(individui)
+    assert validi == [True, False, False]
+    assert dettagli[0] == {'conflitti_docenti': 0, 'ore_settimanali_eccedenti': 0, 'classi_ore_errate': []}
+    assert dettagli[1]['conflitti_docenti'] == 1
+    # Due ore di 1A nella stessa settimana: un'ora in eccesso e totale di classe errato
+    assert dettagli[2] == {'conflitti_docenti': 1, 'ore_settimanali_eccedenti': 1, 'classi_ore_errate': ['1A']}
+    assert validi == [gen.verifica_vincoli(individuo) for individuo in individui]
+
+def test_select_and_generate_keeps_valid_children_from_surplus_batches():
+    gen = MockGenerator()
+    gen._telemetria = None
+    gen.selettori_operatori = None
+    gen.popolazione_size = 5
+    gen.tasso_figli_validi = 1.0
+    valido = {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'}
+    non_valido = {'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'}
+    gen.population = [gen._membro(valido, gen.costruisci_occupazione(valido))]
+    gen.population[0]['fitness'] = 1.0
+    # Figli alternativamente validi e non validi: metà dei candidati viene scartata
+    figli = [valido, non_valido] * 20
+    generati = []
+
+    def genera_figlio(self, selected):
+        figlio = figli[len(generati)]
+        generati.append(figlio)
+        return dict(figlio), self.costruisci_occupazione(figlio), None
+
+    with patch.object(MockGenerator, '_genera_figlio', genera_figlio):
+        gen.select_and_generate_new_population(gen.population[:1])
+        assert len(gen.population) == 5
+        assert gen.tasso_figli_validi == 0.5
+        # Con metà dei figli validi il lotto successivo genera il doppio dei mancanti
+        assert gen._dimensione_lotto(4) == 8
+        assert all(gen.verifica_vincoli(m['individuo'], m['occupazione']) for m in gen.population)
+
+def test_mutazione_with_occupancy_never_double_books():
+    gen = MockGenerator()
+    individuo = {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'}
+    occupazione = gen.costruisci_occupazione(individuo)
+
+    for _ in range(50):
+        individuo = gen.mutazione(individuo, occupazione)
+        # Civ1 è occupato in 1B, quindi 1A può avere solo Civ2
+        assert individuo == {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'}
+        assert occupazione.conflitti == 0
+
+def test_crossover_with_occupancy_keeps_parent1_gene_on_conflict():
+    gen = MockGenerator()
+    genitore1 = {'1A_20241014_1': 'Civ2', '1B_20241014_1': 'Civ1'}
+    genitore2 = {'1A_20241014_1': 'Civ1', '1B_20241014_1': 'Civ1'}
+    occupazione = gen.costruisci_occupazione(genitore1)
+
+    for _ in range(20):
+        figlio = gen.crossover(genitore1, genitore2, occupazione.copia())
+        assert gen.conta_conflitti_popolazione([figlio]) == [0]
+
+    occupazione_figlio = occupazione.copia()
+    figlio = gen.crossover(genitore1, genitore2, occupazione_figlio)
+    assert occupazione_figlio.celle == gen.costruisci_occupazione(figlio).celle
+
+def test_genera_individuo_base_avoids_double_booking():
+    gen = MockGenerator()
+    for strategy in ('greedy', 'batch', 'random'):
+        individuo = gen.genera_individuo_base(strategy=strategy)
+        assert individuo is not None
+        assert gen.conta_conflitti_popolazione([individuo]) == [0]
@@ -0,0 +1,54 @@
+import random
+import pytest
+from generator_mod import SelettoreOperatori
+from conftest import GeneratoreDiProva
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self):
+        super().__init__()
+        self._telemetria = None
+        self.selettori_operatori = {
+            'crossover': SelettoreOperatori(['blocchi', 'nessuno']),
+            'mutazione': SelettoreOperatori(['docente', 'slot']),
+        }
+
+def test_selettore_starts_uniform_and_favours_improvements_per_second():
+    selettore = SelettoreOperatori(['a', 'b'], quota_minima=0.2)
+    assert selettore.probabilita == [0.5, 0.5]
+    # a: 2 miglioramenti in 1 secondo, b: 2 miglioramenti in 4 secondi
+    selettore.registra('a', 0.5, True)
+    selettore.registra('a', 0.5, True)
+    selettore.registra('b', 2.0, True)
+    selettore.registra('b', 2.0, True)
+    selettore.aggiorna()
+    assert selettore.probabilita == pytest.approx([0.1 + 0.8 * 0.8, 0.1 + 0.8 * 0.2])
+    assert selettore.statistiche()['a']['usi'] == 2
+    # Il decadimento riduce il peso della storia senza cambiare la resa
+    assert selettore.successi['a'] == 2 * selettore.decadimento
+
+def test_selettore_without_improvements_stays_uniform():
+    selettore = SelettoreOperatori(['a', 'b', 'c'])
+    selettore.registra('a', 1.0, False)
+    selettore.aggiorna()
+    assert selettore.probabilita == [1 / 3] * 3
+    rng = random.Random(0)
+    assert {selettore.scegli(rng) for _ in range(50)} == {'a', 'b', 'c'}
+
+def test_accredita_operatori_rewards_children_better_than_parents():
+    gen = MockGenerator()
+    gen.population = [
+        {'individuo': {}, 'fitness': 1.0},
+        {'individuo': {}, 'fitness': 3.0, 'operatori': ('blocchi', 'docente', 0.1, 0.1, 2.0)},
+        {'individuo': {}, 'fitness': 5.0, 'operatori': ('nessuno', 'slot', 0.1, 0.1, 2.0)},
+    ]
+    gen.population[0]['operatori'] = ('blocchi', 'slot', 0.1, 0.1, 2.0)
+
+    gen._accredita_operatori()
+
+    assert all('operatori' not in membro for membro in gen.population)
+    crossover = gen.selettori_operatori['crossover']
+    mutazione = gen.selettori_operatori['mutazione']
+    assert crossover.usi == {'blocchi': 2, 'nessuno': 1}
+    # Solo il primo figlio migliora i genitori: il credito va a blocchi e slot
+    assert crossover.probabilita[0] > crossover.probabilita[1]
+    assert mutazione.probabilita[1] > mutazione.probabilita[0]
@@ -1,9 +1,10 @@
 import pytest
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 import pandas as pd
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, docenti_civics_df):
+        super().__init__()
         self.docenti_civics_df = docenti_civics_df
 
 def test_parse_assegnazioni_docenti_basic():
@@ -1,10 +1,10 @@
 import pytest
 import pandas as pd
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self):
-        pass
+        super().__init__()
 
 def test_parse_orari_classi_success():
     gen = MockGenerator()
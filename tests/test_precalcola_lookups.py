@@ -1,10 +1,10 @@
 import pytest
 from collections import defaultdict
-from generator_mod import CalendarioGenerator
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
+class MockGenerator(GeneratoreDiProva):
     def __init__(self, slot_disponibili, docenti_civics_classi, classi_list, ore_tot_civics):
-        # Bypass original __init__ to avoid file loading and initialization logic
+        super().__init__()
         self.slot_disponibili = slot_disponibili
         self.docenti_civics_classi = docenti_civics_classi
         self.classi_list = classi_list
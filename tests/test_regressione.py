@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from regressione import confronta
+
+BASELINE = {
+    'tolleranze': {'tempo': 0.3, 'memoria': 0.2, 'tempo_minimo': 0.02},
+    'scenari': {'piccola': {'tempi': {'fitness': 1.0, 'riproduzione': 0.01}, 'memoria_picco_mb': 10.0, 'fitness': 5.0}},
+}
+
+def _attuali(fitness=1.0, riproduzione=0.01, memoria=10.0, valore_fitness=5.0):
+    return {'piccola': {'tempi': {'fitness': fitness, 'riproduzione': riproduzione},
+                        'memoria_picco_mb': memoria, 'fitness': valore_fitness}}
+
+def _esiti(righe):
+    return {riga['misura']: riga['esito'] for riga in righe}
+
+def test_confronta_passes_within_tolerance():
+    esito, righe = confronta(BASELINE, _attuali(fitness=1.25, memoria=11.0))
+    assert esito
+    assert set(_esiti(righe).values()) == {'OK'}
+
+def test_confronta_fails_on_slower_stage():
+    esito, righe = confronta(BASELINE, _attuali(fitness=1.5))
+    assert not esito
+    assert _esiti(righe)['tempo fitness'] == 'FALLITO'
+
+def test_confronta_ignores_noise_on_short_stages():
+    # +100% ma solo 10 ms in più: sotto la soglia assoluta
+    esito, _ = confronta(BASELINE, _attuali(riproduzione=0.02))
+    assert esito
+
+def test_confronta_fails_on_memory_and_reports_fitness_change():
+    esito, righe = confronta(BASELINE, _attuali(memoria=13.0, valore_fitness=4.0))
+    assert not esito
+    assert _esiti(righe)['memoria picco MB'] == 'FALLITO'
+    assert _esiti(righe)['fitness'] == 'CAMBIATA'
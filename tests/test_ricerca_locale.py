@@ -0,0 +1,62 @@
+import pytest
+from collections import defaultdict
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=4):
+        super().__init__()
+        # Una classe, due ore al lunedì con due docenti diversi da sostituire
+        self.ricerca_locale_tempo_max = 5.0
+        self.classi_list = ['1A']
+        self.ore_tot_civics = num_settimane
+        self.docenti_civics_classi = {'Civ1': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(num_settimane=num_settimane))
+
+def _tutte_prima_ora(gen):
+    return {slot['KEY']: 'Civ1' for slot in gen.slot_disponibili if slot['ORA'] == 1}
+
+def test_ricerca_locale_improves_fitness():
+    gen = MockGenerator()
+    individuo = _tutte_prima_ora(gen)
+    fitness_iniziale = gen.calcola_fitness(individuo)
+
+    migliorato, fitness = gen.ricerca_locale(individuo)
+
+    assert fitness < fitness_iniziale
+    assert fitness == gen.calcola_fitness(migliorato)
+    # Le ore perse si distribuiscono equamente tra i due docenti
+    ore_perse = defaultdict(int)
+    for key in migliorato:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+    assert ore_perse == {'DocA': 2, 'DocB': 2}
+
+def test_ricerca_locale_preserves_constraints_and_input():
+    gen = MockGenerator()
+    individuo = _tutte_prima_ora(gen)
+    originale = dict(individuo)
+
+    migliorato, _ = gen.ricerca_locale(individuo)
+
+    assert individuo == originale
+    assert gen.verifica_vincoli(migliorato)
+
+def test_ricerca_locale_zero_budget_returns_copy():
+    gen = MockGenerator()
+    individuo = _tutte_prima_ora(gen)
+
+    risultato, fitness = gen.ricerca_locale(individuo, tempo_max=0)
+
+    assert risultato == individuo
+    assert fitness == gen.calcola_fitness(individuo)
+
+def test_calcola_costo_classe_matches_fitness_terms():
+    gen = MockGenerator()
+    individuo = _tutte_prima_ora(gen)
+    ore_perse = defaultdict(int)
+    for key in individuo:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+
+    # Senza deviazioni settimanali la fitness coincide con il costo dell'unica classe
+    assert gen._calcola_costo_classe('1A', ore_perse) == pytest.approx(gen.calcola_fitness(individuo))
@@ -0,0 +1,41 @@
+import random
+import pytest
+import generator_mod
+from generator_mod import genera_individuo_random_helper, _flusso_task
+from conftest import GeneratoreDiProva
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, seme):
+        super().__init__()
+        self.rng = random.Random(seme)
+
+    def genera_individuo_random(self, _):
+        return [self.rng.random() for _ in range(3)]
+
+def test_task_result_depends_only_on_task_seed():
+    # Due istanze con generatori principali diversi producono lo stesso individuo per lo stesso seme
+    risultati = []
+    for seme_principale in (1, 2):
+        gen = MockGenerator(seme_principale)
+        gen.rng.random()
+        generator_mod._worker_instance = gen
+        risultati.append(genera_individuo_random_helper(42))
+    assert risultati[0] == risultati[1]
+
+def test_task_stream_does_not_consume_master_stream():
+    gen = MockGenerator(7)
+    generator_mod._worker_instance = gen
+    genera_individuo_random_helper(42)
+    assert gen.rng.random() == random.Random(7).random()
+
+def test_flusso_task_restores_master_rng_on_error():
+    gen = MockGenerator(7)
+    principale = gen.rng
+    generator_mod._worker_instance = gen
+    with pytest.raises(RuntimeError):
+        with _flusso_task(3):
+            raise RuntimeError()
+    assert gen.rng is principale
+
+def test_semi_are_reproducible():
+    assert MockGenerator(5)._semi(4) == MockGenerator(5)._semi(4)
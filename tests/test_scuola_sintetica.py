@@ -0,0 +1,37 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from scuola_sintetica import genera_scuola_sintetica
+
+def _leggi(cartella, nome):
+    with open(os.path.join(cartella, nome), encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def test_genera_scuola_sintetica_writes_consistent_csv(tmp_path):
+    cartella = str(tmp_path / 'scuola')
+    parametri = genera_scuola_sintetica(cartella, num_classi=7, num_docenti_civics=3,
+                                        sovrapposizione_civics=1.0, num_settimane=10, ore_giornaliere=5)
+
+    classi = _leggi(cartella, 'classes.csv')
+    civics = _leggi(cartella, 'civics_teachers.csv')
+    disponibilita = _leggi(cartella, 'availability.csv')
+    assert len(classi) == 7
+    assert all(len(riga['DOC LUN'].split(';')) == 5 for riga in classi)
+    # Ogni classe ha almeno un docente civics
+    coperte = {classe for riga in civics for classe in riga['CLASSI'].split(';')}
+    assert coperte == {riga['CLASSE'] for riga in classi}
+    assert [riga['DOCENTE'] for riga in disponibilita] == [riga['DOCENTE'] for riga in civics]
+    # Con sovrapposizione completa i docenti civics compaiono anche negli orari
+    nomi_orario = {d for riga in classi for g in ('LUN', 'MAR', 'MER', 'GIO', 'VEN', 'SAB') for d in riga[f'DOC {g}'].split(';')}
+    assert nomi_orario & {riga['DOCENTE'] for riga in civics}
+    assert len(_leggi(cartella, 'closures.csv')) == 2
+    assert parametri['cartella_input'] == cartella
+    assert parametri['ore_tot_civics'] == 6
+
+def test_genera_scuola_sintetica_is_reproducible(tmp_path):
+    genera_scuola_sintetica(str(tmp_path / 'a'), num_classi=5, seme=3)
+    genera_scuola_sintetica(str(tmp_path / 'b'), num_classi=5, seme=3)
+    for nome in ('classes.csv', 'civics_teachers.csv', 'availability.csv', 'closures.csv'):
+        assert _leggi(str(tmp_path / 'a'), nome) == _leggi(str(tmp_path / 'b'), nome)
@@ -0,0 +1,138 @@
+import random
+import pytest
+from collections import defaultdict
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=6):
+        super().__init__()
+        self.probabilita_mutazione = 0.5
+        self.probabilita_mutazione_slot = 0.5
+        self.seed_num_varianti = 3
+        self.classi_list = ['1A', '1B']
+        self.ore_tot_civics = 3
+        self.docenti_civics_classi = {'Civ1': ['1A', '1B'], 'Civ2': ['1B']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {
+            'Civ1': {'LUN': [True, True]},
+            'Civ2': {'LUN': [True, False]},
+        }
+        self.imposta_slot(slot_settimanali(classi=self.classi_list, num_settimane=num_settimane,
+                                           ore=((1, 'Doc1'), (2, 'Doc2'))))
+
+def _riga(classe, data, ora, docente):
+    return {'CLASSE': classe, 'DATA': data.strftime('%d/%m/%Y'), 'ORA': str(ora),
+            'DOCENTE_CIVICS': docente, 'DOCENTE_SOSTITUITO': f'Doc{ora}'}
+
+def test_leggi_calendario_parses_rows():
+    gen = MockGenerator()
+    righe_csv = [
+        _riga('1A', datetime(2024, 10, 14), 1, 'Civ1'),
+        {'CLASSE': '1A', 'DATA': 'non una data', 'ORA': '1', 'DOCENTE_CIVICS': 'Civ1', 'DOCENTE_SOSTITUITO': 'Doc1'},
+    ]
+    with patch('generator_mod.pd.read_csv', return_value=pd.DataFrame(righe_csv)):
+        righe = gen._leggi_calendario('calendar.csv')
+
+    assert righe == [{'CLASSE': '1A', 'DATA': datetime(2024, 10, 14), 'ORA': 1,
+                      'DOCENTE_CIVICS': 'Civ1', 'DOCENTE_SOSTITUITO': 'Doc1'}]
+
+def test_leggi_calendario_missing_file():
+    gen = MockGenerator()
+    with patch('generator_mod.pd.read_csv', side_effect=FileNotFoundError(2, 'No such file', 'calendar.csv')):
+        with pytest.raises(SystemExit) as e:
+            gen._leggi_calendario('calendar.csv')
+    assert e.value.code == 1
+
+def test_individuo_da_calendario_drops_invalid_rows():
+    gen = MockGenerator()
+    righe = [
+        {'CLASSE': '1A', 'DATA': datetime(2024, 10, 14), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1'},
+        # Slot inesistente (data fuori dal calendario)
+        {'CLASSE': '1A', 'DATA': datetime(2025, 1, 6), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1'},
+        # Civ2 non è assegnato alla classe 1A
+        {'CLASSE': '1A', 'DATA': datetime(2024, 10, 21), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ2'},
+        # Civ2 non è disponibile alla seconda ora
+        {'CLASSE': '1B', 'DATA': datetime(2024, 10, 21), 'ORA': 2, 'DOCENTE_CIVICS': 'Civ2'},
+    ]
+    assert gen.individuo_da_calendario(righe) == {'1A_20241014_1': 'Civ1'}
+
+def test_ripara_individuo_completes_and_trims_classes():
+    gen = MockGenerator()
+    individuo = {
+        # 1A: due ore nella stessa settimana, ne resta una
+        '1A_20241014_1': 'Civ1',
+        '1A_20241014_2': 'Civ1',
+        # 1B: sovrapposizione con Civ1 in 1A e quattro settimane (una in eccesso)
+        '1B_20241014_1': 'Civ1',
+        '1B_20241021_1': 'Civ2',
+        '1B_20241028_1': 'Civ2',
+        '1B_20241104_1': 'Civ2',
+        '1B_20241111_1': 'Civ2',
+    }
+
+    riparato, occupazione = gen.ripara_individuo(individuo)
+
+    assert gen.verifica_vincoli(riparato, occupazione)
+    assert '1A_20241014_1' in riparato
+    assert '1A_20241014_2' not in riparato
+    assert '1B_20241014_1' not in riparato
+    assert occupazione.celle == gen.costruisci_occupazione(riparato).celle
+
+def test_ripara_individuo_returns_none_when_impossible():
+    gen = MockGenerator(num_settimane=2)
+    assert gen.ripara_individuo({}) is None
+
+def test_individui_da_seed_returns_valid_variants():
+    gen = MockGenerator()
+    righe = [{'CLASSE': '1A', 'DATA': datetime(2024, 10, 14), 'ORA': 1, 'DOCENTE_CIVICS': 'Civ1'}]
+    with patch.object(MockGenerator, '_leggi_calendario', return_value=righe):
+        individui = gen.individui_da_seed('calendar.csv')
+
+    assert 1 <= len(individui) <= 1 + gen.seed_num_varianti
+    assert '1A_20241014_1' in individui[0][0]
+    for individuo, occupazione in individui:
+        assert gen.verifica_vincoli(individuo, occupazione)
+
+class GeneratoreOrganico(GeneratoreDiProva):
+    # Civ1 insegna anche in 1A (organico) ed è il docente sostituito in prima ora
+    def __init__(self):
+        super().__init__()
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 3
+        self.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+        self.docenti_civics_organico = defaultdict(set, {'1A': {'Civ1'}})
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}, 'Civ2': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(num_settimane=6, ore=((1, 'Civ1'), (2, 'Doc2'))))
+
+@pytest.mark.parametrize('allow_teacher_replace_self', [False, True])
+def test_docenti_possibili_single_eligibility_rule(allow_teacher_replace_self):
+    gen = GeneratoreOrganico()
+    gen.allow_teacher_replace_self = allow_teacher_replace_self
+    gen._precalcola_indici_slot()
+    ora_1, ora_2 = gen.slot_disponibili[0]['KEY'], gen.slot_disponibili[1]['KEY']
+    # Il docente in organico copre le ore degli altri docenti, la propria solo se consentito
+    assert gen.docenti_possibili_per_slot[ora_2] == ['Civ1', 'Civ2']
+    assert gen.docenti_possibili_per_slot[ora_1] == (['Civ1', 'Civ2'] if allow_teacher_replace_self else ['Civ2'])
+
+def test_generated_calendar_round_trips_as_seed(caplog):
+    # Un calendar.csv prodotto dallo strumento, riletto come seed_calendar con gli stessi dati,
+    # non perde assegnazioni e non richiede riparazioni
+    gen = GeneratoreOrganico()
+    assegnazioni = set()
+    for seme in range(10):
+        gen.rng = random.Random(seme)
+        individuo = gen.genera_individuo_base(strategy='random')
+        righe_csv = [{nome: str(valore) for nome, valore in riga.items()} for riga in gen.create_calendario(individuo)]
+        with patch('generator_mod.pd.read_csv', return_value=pd.DataFrame(righe_csv)):
+            righe = gen._leggi_calendario('calendar.csv')
+        with caplog.at_level('INFO'):
+            seed = gen.individuo_da_calendario(righe)
+        assert seed == individuo
+        assert gen.ripara_individuo(seed)[0] == individuo
+        assegnazioni |= {(gen.slots_by_key[k]['ORA'], docente) for k, docente in individuo.items()}
+    assert 'Scartate' not in caplog.text
+    # Il caso che prima veniva scartato: Civ1, in organico, che copre le ore di Doc2
+    assert (2, 'Civ1') in assegnazioni
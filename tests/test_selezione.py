@@ -1,13 +1,13 @@
+import random
 import pytest
 from unittest.mock import patch
-from generator_mod import CalendarioGenerator
+from generator_mod import _pesi_cumulativi_ranking
+from conftest import GeneratoreDiProva
 
-class MockGenerator(CalendarioGenerator):
-    def __init__(self):
-        # Bypass the original __init__ to avoid file loading and initialization logic
-        pass
+class MockGenerator(GeneratoreDiProva):
+    pass
 
-@patch('random.choices')
+@patch.object(random.Random, 'choices')
 def test_selezione_basic(mock_choices):
     gen = MockGenerator()
     popolazione = ['ind1', 'ind2', 'ind3']
@@ -35,7 +35,7 @@ def test_selezione_basic(mock_choices):
     )
     assert result == ['ind2', 'ind2', 'ind1']
 
-@patch('random.choices')
+@patch.object(random.Random, 'choices')
 def test_selezione_single_element(mock_choices):
     gen = MockGenerator()
     popolazione = ['ind1']
@@ -55,7 +55,7 @@ def test_selezione_single_element(mock_choices):
     )
     assert result == ['ind1']
 
-@patch('random.choices')
+@patch.object(random.Random, 'choices')
 def test_selezione_identical_fitness(mock_choices):
     gen = MockGenerator()
     popolazione = ['ind1', 'ind2', 'ind3']
@@ -78,3 +78,45 @@ def test_selezione_identical_fitness(mock_choices):
         k=3
     )
     assert result == ['ind1', 'ind2', 'ind3']
+
+def _generatore(operatore, dimensione_torneo=3):
+    gen = MockGenerator()
+    gen.rng = random.Random(1)
+    gen.selezione_operatore = operatore
+    gen.dimensione_torneo = dimensione_torneo
+    return gen
+
+@pytest.mark.parametrize('operatore', ['ranking', 'torneo', 'sus'])
+def test_selezione_indici_favours_better_fitness(operatore):
+    gen = _generatore(operatore)
+    fitness = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+    conteggi = [0] * len(fitness)
+    for _ in range(500):
+        indici = gen.selezione_indici(fitness)
+        assert len(indici) == len(fitness)
+        for i in indici:
+            conteggi[i] += 1
+    assert conteggi[0] > conteggi[3] > conteggi[7]
+
+def test_selezione_indici_unsorted_population_uses_fitness_order():
+    gen = _generatore('sus')
+    # Con SUS e pesi di ranking [3, 2, 1]/6 il migliore ha sempre una o due copie
+    for _ in range(50):
+        indici = gen.selezione_indici([20.0, 5.0, 10.0])
+        assert 1 <= indici.count(1) <= 2
+        assert indici.count(0) <= 1
+
+def test_selezione_indici_sorted_population_is_not_sorted_again():
+    gen = _generatore('ranking')
+    fitness = [1.0, 1.0, 2.0, 5.0]
+    with patch('builtins.sorted', side_effect=AssertionError('ordinamento non necessario')):
+        indici = gen.selezione_indici(fitness)
+    assert len(indici) == len(fitness)
+
+def test_selezione_indici_large_tournament_picks_best():
+    gen = _generatore('torneo', dimensione_torneo=60)
+    assert gen.selezione_indici([3.0, 1.0, 2.0, 0.5]) == [3, 3, 3, 3]
+
+def test_pesi_cumulativi_ranking():
+    assert _pesi_cumulativi_ranking(3) == (3, 5, 6)
+    assert _pesi_cumulativi_ranking(1) == (1,)
@@ -0,0 +1,188 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from unittest.mock import patch
+import generator_mod
+from generator_mod import ServizioCalendari, crea_server
+
+CSV = {nome: 'CLASSE\n1A\n' for nome in ServizioCalendari.FILE_CSV}
+
+def esegui_lavoro_finto(args):
+    config, sorgenti_csv = args
+    return {'esito': 'OK', 'fitness': 1.5, 'ore_tot_civics': config.ore_tot_civics,
+            'num_cores': config.num_cores, 'file': sorted(sorgenti_csv)}
+
+@pytest.fixture
+def indirizzo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    servizio = ServizioCalendari(num_cores=1)
+    server = crea_server(servizio, porta=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with patch.object(generator_mod, 'esegui_lavoro_helper', esegui_lavoro_finto):
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    servizio.chiudi()
+
+def _post(url, dati):
+    richiesta = urllib.request.Request(url, data=json.dumps(dati).encode('utf-8'),
+                                       headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(richiesta) as risposta:
+        return risposta.status, json.loads(risposta.read())
+
+def test_job_waits_for_result(indirizzo):
+    stato, lavoro = _post(indirizzo + '/lavori', {'csv': CSV, 'config': {'ore_tot_civics': 20}, 'attendi': True})
+    assert stato == 200
+    assert lavoro['stato'] == 'completato'
+    assert lavoro['risultato']['ore_tot_civics'] == 20
+    assert lavoro['risultato']['num_cores'] == 1
+    assert lavoro['risultato']['file'] == sorted(ServizioCalendari.FILE_CSV)
+
+def test_job_can_be_polled(indirizzo):
+    stato, risposta = _post(indirizzo + '/lavori', {'csv': CSV})
+    assert stato == 202
+    for _ in range(100):
+        with urllib.request.urlopen(f"{indirizzo}/lavori/{risposta['id']}") as r:
+            lavoro = json.loads(r.read())
+        if lavoro['stato'] != 'in_corso':
+            break
+        time.sleep(0.05)
+    assert lavoro['stato'] == 'completato'
+    assert lavoro['risultato']['fitness'] == 1.5
+
+@pytest.mark.parametrize('richiesta', [
+    {'csv': {'classes.csv': 'CLASSE\n'}},
+    {'csv': CSV, 'config': {'cartella_output': '/tmp'}},
+    {'csv': CSV, 'config': {'parametro_inesistente': 1}},
+    {'csv': CSV, 'config': {'num_varianti': 3}},
+    {'csv': CSV, 'config': {'data_congelamento_str': '01/03/2025'}},
+])
+def test_invalid_job_is_rejected(indirizzo, richiesta):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _post(indirizzo + '/lavori', richiesta)
+    assert e.value.code == 400
+
+def test_unknown_job_returns_404(indirizzo):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(indirizzo + '/lavori/inesistente')
+    assert e.value.code == 404
+
+def test_wait_stops_at_timeout(indirizzo):
+    rilascio = threading.Event()
+
+    def esegui_lavoro_lento(args):
+        rilascio.wait(5)
+        return esegui_lavoro_finto(args)
+
+    with patch.object(generator_mod, 'esegui_lavoro_helper', esegui_lavoro_lento):
+        stato, lavoro = _post(indirizzo + '/lavori', {'csv': CSV, 'attendi': True, 'timeout': 0.2})
+        rilascio.set()
+    # Allo scadere si risponde con lo stato del lavoro, che resta consultabile con il polling
+    assert stato == 202
+    assert lavoro['stato'] == 'in_corso' and lavoro['id']
+
+@pytest.mark.parametrize('timeout', [0, -1, 'dieci', True])
+def test_invalid_timeout_is_rejected(indirizzo, timeout):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _post(indirizzo + '/lavori', {'csv': CSV, 'attendi': True, 'timeout': timeout})
+    assert e.value.code == 400
+
+def test_finished_jobs_are_evicted_beyond_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    servizio = ServizioCalendari(num_cores=1)
+    servizio.LAVORI_CONSERVATI = 2
+    try:
+        with patch.object(generator_mod, 'esegui_lavoro_helper', esegui_lavoro_finto):
+            lavori = []
+            for _ in range(4):
+                lavori.append(servizio.invia({'csv': CSV}))
+                assert servizio.attendi(lavori[-1], timeout=5)['stato'] == 'completato'
+    finally:
+        servizio.chiudi()
+    # Restano solo gli ultimi due lavori terminati
+    assert [servizio.stato(id_lavoro) is not None for id_lavoro in lavori] == [False, False, True, True]
+
+def test_service_workers_do_not_install_signal_handlers(monkeypatch):
+    gen = generator_mod.CalendarioGenerator.__new__(generator_mod.CalendarioGenerator)
+    monkeypatch.setattr(generator_mod, '_gestori_segnale', True)
+    with patch.object(generator_mod.signal, 'signal') as mock_signal:
+        generator_mod.init_worker_senza_gestori()
+        mock_signal.reset_mock()
+        with gen._gestione_interruzioni():
+            assert not gen._interruzione_richiesta
+    mock_signal.assert_not_called()
+    assert generator_mod._gestori_segnale is False
+
+def test_job_output_folder_is_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cartella_output = os.path.join('LAVORI_SERVER', 'lavoro')
+
+    def genera_finto(config):
+        os.makedirs(config.cartella_output)
+        with open(os.path.join(config.cartella_output, 'calendar.csv'), 'w', encoding='utf-8') as f:
+            f.write('CLASSE\n1A\n')
+        return {'ESITO': 'OK', 'FITNESS': 1.0, 'SECONDI': 0.1}
+
+    with patch.object(generator_mod, 'genera_scuola_helper', genera_finto):
+        risultato = generator_mod.esegui_lavoro_helper(
+            (generator_mod.CalendarioConfig(cartella_output=cartella_output), CSV))
+    assert risultato['calendar_csv'] == 'CLASSE\n1A\n'
+    assert not os.path.exists(cartella_output)
+
+# Lavoro completo attraverso l'API HTTP, con le librerie vere: gira in un processo separato
+# perché conftest sostituisce pandas, numpy e openpyxl con dei mock
+LAVORO_REALE = textwrap.dedent("""
+    import json, os, sys, threading, urllib.request
+    sys.path.insert(0, sys.argv[1])
+    from scuola_sintetica import genera_scuola_sintetica
+    from suite import carica_generatore
+
+    gen_mod = carica_generatore()
+    parametri = genera_scuola_sintetica('scuola', num_classi=4, num_settimane=8)
+    csv = {}
+    for nome in gen_mod.ServizioCalendari.FILE_CSV:
+        with open(os.path.join('scuola', nome), encoding='utf-8') as f:
+            csv[nome] = f.read()
+    config = {'data_inizio_str': parametri['data_inizio_str'], 'data_fine_str': parametri['data_fine_str'],
+              'ore_tot_civics': parametri['ore_tot_civics'], 'popolazione_size': 20,
+              'num_generazioni': 3, 'early_stopping_n': 3, 'save_interval': 0}
+
+    servizio = gen_mod.ServizioCalendari(num_cores=1)
+    server = gen_mod.crea_server(servizio, porta=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    richiesta = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/lavori",
+                                       data=json.dumps({'csv': csv, 'config': config, 'attendi': True}).encode('utf-8'))
+    with urllib.request.urlopen(richiesta) as risposta:
+        lavoro = json.loads(risposta.read())
+    server.shutdown()
+    servizio.chiudi()
+    with open('esito.json', 'w', encoding='utf-8') as f:
+        json.dump({'lavoro': lavoro, 'cartelle': os.listdir('LAVORI_SERVER') if os.path.exists('LAVORI_SERVER') else []}, f)
+""")
+
+def test_real_job_end_to_end(tmp_path):
+    for libreria in ('pandas', 'numpy', 'openpyxl'):
+        pytest.importorskip(libreria)
+    benchmarks = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+    subprocess.run([sys.executable, '-c', LAVORO_REALE, benchmarks], cwd=tmp_path, check=True,
+                   stdout=subprocess.DEVNULL, timeout=300)
+    with open(tmp_path / 'esito.json', encoding='utf-8') as f:
+        esito = json.load(f)
+
+    lavoro = esito['lavoro']
+    assert lavoro['stato'] == 'completato'
+    assert lavoro['risultato']['esito'] == 'OK'
+    righe = lavoro['risultato']['calendar_csv'].splitlines()
+    assert righe[0] == 'CLASSE,DATA,GIORNO,ORA,DOCENTE_CIVICS,DOCENTE_SOSTITUITO'
+    assert len(righe) > 1
+    assert lavoro['risultato']['teachers_lost_csv']
+    # Della cartella del lavoro non resta nulla
+    assert esito['cartelle'] == []
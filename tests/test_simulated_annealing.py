@@ -0,0 +1,211 @@
+import random
+import signal
+import pytest
+from collections import defaultdict
+from unittest.mock import patch
+import generator_mod
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_settimane=6):
+        super().__init__()
+        self.sa_iterazioni = 2000
+        self.sa_temperatura_iniziale = 10.0
+        self.sa_temperatura_finale = 0.01
+        self.sa_raffreddamento = 'geometrico'
+        self.classi_list = ['1A']
+        self.ore_tot_civics = 4
+        self.docenti_civics_classi = {'Civ1': ['1A']}
+        self.docenti_civics_organico = defaultdict(set)
+        self.disponibilita_civics = {'Civ1': {'LUN': [True, True]}}
+        self.imposta_slot(slot_settimanali(num_settimane=num_settimane))
+
+def test_temperatura_sa_geometric():
+    gen = MockGenerator()
+    assert gen._temperatura_sa(0, 100) == pytest.approx(10.0)
+    assert gen._temperatura_sa(99, 100) == pytest.approx(0.01)
+    assert gen._temperatura_sa(50, 101) == pytest.approx((10.0 * 0.01) ** 0.5)
+
+def test_temperatura_sa_linear():
+    gen = MockGenerator()
+    gen.sa_raffreddamento = 'lineare'
+    assert gen._temperatura_sa(0, 11) == pytest.approx(10.0)
+    assert gen._temperatura_sa(5, 11) == pytest.approx((10.0 + 0.01) / 2)
+    assert gen._temperatura_sa(10, 11) == pytest.approx(0.01)
+
+def test_simulated_annealing_finds_balanced_calendar():
+    gen = MockGenerator()
+    individuo, fitness = gen.simulated_annealing()
+
+    assert gen.verifica_vincoli(individuo)
+    assert fitness == gen.calcola_fitness(individuo)
+    ore_perse = defaultdict(int)
+    for key in individuo:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+    assert ore_perse == {'DocA': 2, 'DocB': 2}
+
+def test_simulated_annealing_zero_iterations_returns_initial_solution():
+    gen = MockGenerator()
+    individuo, fitness = gen.simulated_annealing(iterazioni=0)
+    assert gen.verifica_vincoli(individuo)
+    assert fitness == gen.calcola_fitness(individuo)
+
+def test_simulated_annealing_without_valid_start():
+    gen = MockGenerator()
+    with patch.object(MockGenerator, 'genera_individuo_base', return_value=None):
+        assert gen.simulated_annealing() is None
+
+def test_genera_calendario_rejects_unknown_engine():
+    gen = MockGenerator()
+    gen.motore = 'sconosciuto'
+    with pytest.raises(SystemExit) as e:
+        gen.genera_calendario()
+    assert e.value.code == 1
+
+@pytest.mark.parametrize('motore', ['sa', 'pt'])
+@pytest.mark.parametrize('temperature', [(0.0, 0.01), (10.0, 0.0), (10.0, -1.0)])
+def test_genera_calendario_rejects_non_positive_temperatures(motore, temperature):
+    gen = MockGenerator()
+    gen.motore = motore
+    gen.sa_temperatura_iniziale, gen.sa_temperatura_finale = temperature
+    with pytest.raises(SystemExit) as e:
+        gen.genera_calendario()
+    assert e.value.code == 1
+
+def test_stato_sa_cost_matches_fitness_after_moves():
+    gen = MockGenerator()
+    individuo = gen.genera_individuo_base(strategy='random')
+    stato = gen._stato_sa(individuo)
+    migliore, costo_migliore = gen._mosse_sa(stato, 500, lambda _: 1.0)
+    assert gen.verifica_vincoli(stato['individuo'])
+    assert stato['costo'] == pytest.approx(gen.calcola_fitness(stato['individuo']))
+    assert costo_migliore == pytest.approx(gen.calcola_fitness(migliore))
+
+def test_parallel_tempering_finds_balanced_calendar(tmp_path):
+    gen = MockGenerator()
+    gen.num_cores = 1
+    gen.pt_repliche = 3
+    gen.pt_passi_scambio = 200
+    gen.time_budget_seconds = 0
+    gen.cartella_output = str(tmp_path)
+    with patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: (ind, fit)):
+        individuo, fitness = gen.genera_calendario_pt()
+
+    assert gen.verifica_vincoli(individuo)
+    assert fitness == gen.calcola_fitness(individuo)
+    ore_perse = defaultdict(int)
+    for key in individuo:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+    assert ore_perse == {'DocA': 2, 'DocB': 2}
+    # Un turno di scambi ogni pt_passi_scambio mosse
+    assert [r['GENERAZIONE'] for r in gen.andamento_fitness] == list(range(1, 11))
+
+def test_ricerca_tabu_finds_balanced_calendar():
+    gen = MockGenerator()
+    gen.tabu_durata = 3
+    gen.tabu_candidati = 4
+    individuo = gen.genera_individuo_base(strategy='random')
+    migliore, fitness = gen.ricerca_tabu(individuo, iterazioni=200)
+
+    assert gen.verifica_vincoli(migliore)
+    assert fitness == gen.calcola_fitness(migliore)
+    assert fitness <= gen.calcola_fitness(individuo)
+    ore_perse = defaultdict(int)
+    for key in migliore:
+        ore_perse[gen.slots_by_key[key]['DOCENTE_SOSTITUITO']] += 1
+    assert ore_perse == {'DocA': 2, 'DocB': 2}
+
+def test_ricerca_tabu_stops_at_deadline():
+    gen = MockGenerator()
+    gen.tabu_durata = 3
+    gen.tabu_candidati = 4
+    individuo = gen.genera_individuo_base(strategy='random')
+    # Scadenza già passata: nessuna iterazione, si restituisce l'individuo di partenza
+    migliore, fitness = gen.ricerca_tabu(individuo, iterazioni=200, scadenza=0)
+    assert migliore == individuo
+    assert fitness == gen.calcola_fitness(individuo)
+
+def test_genera_calendario_tabu_saves_best_result(tmp_path):
+    gen = MockGenerator()
+    gen.num_cores = 1
+    gen.tabu_iterazioni = 200
+    gen.tabu_durata = 3
+    gen.tabu_candidati = 4
+    gen.time_budget_seconds = 0
+    gen.cartella_output = str(tmp_path)
+    with patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: (ind, fit)):
+        individuo, fitness = gen.genera_calendario_tabu()
+
+    assert gen.verifica_vincoli(individuo)
+    assert fitness == gen.calcola_fitness(individuo)
+
+def _stato_tabu_finale(gen, individuo, iterazioni):
+    # Esegue la ricerca tabu e restituisce anche lo stato corrente al termine
+    stati = []
+    stato_sa = MockGenerator._stato_sa
+
+    def stato_registrato(self, individuo):
+        stati.append(stato_sa(self, individuo))
+        return stati[-1]
+
+    with patch.object(MockGenerator, '_stato_sa', stato_registrato):
+        migliore, fitness = gen.ricerca_tabu(individuo, iterazioni=iterazioni)
+    return migliore, fitness, stati[0]
+
+def test_ricerca_tabu_reassignments_respect_tabu_list():
+    # Un solo slot per settimana: le uniche mosse sono le riassegnazioni tra Civ1 e Civ2
+    gen = MockGenerator()
+    gen.ore_tot_civics = 2
+    gen.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+    gen.disponibilita_civics = {'Civ1': {'LUN': [True]}, 'Civ2': {'LUN': [True]}}
+    gen.imposta_slot(slot_settimanali(num_settimane=2, ore=((1, 'DocA'),)))
+    gen.tabu_durata = 10
+    gen.tabu_candidati = 2
+    individuo = {slot['KEY']: 'Civ1' for slot in gen.slot_disponibili}
+    _, _, stato = _stato_tabu_finale(gen, individuo, iterazioni=5)
+    # Ogni slot passa a Civ2 e non può tornare a Civ1 finché la coppia è tabu
+    assert stato['individuo'] == {slot['KEY']: 'Civ2' for slot in gen.slot_disponibili}
+
+def test_ricerca_tabu_takes_worsening_moves():
+    gen = MockGenerator()
+    gen.docenti_civics_classi = {'Civ1': ['1A'], 'Civ2': ['1A']}
+    gen.disponibilita_civics = {'Civ1': {'LUN': [True, True]}, 'Civ2': {'LUN': [True, True]}}
+    gen.tabu_durata = 100
+    gen.tabu_candidati = 4
+    ottimo, costo_ottimo = gen.ricerca_tabu(gen.genera_individuo_base(strategy='random'), iterazioni=200)
+    # Dall'ottimo, esaurite le riassegnazioni ammesse, la ricerca accetta mosse peggioranti:
+    # si osserva lo stato corrente dopo un numero crescente di iterazioni dallo stesso seme
+    costi = []
+    for iterazioni in range(1, 21):
+        gen.rng = random.Random(0)
+        _, fitness, stato = _stato_tabu_finale(gen, ottimo, iterazioni)
+        assert fitness == pytest.approx(costo_ottimo)
+        costi.append(gen.calcola_fitness(stato['individuo']))
+    assert max(costi) > costo_ottimo + 1e-9
+
+def test_ricerca_tabu_helper_honours_pending_interruption(monkeypatch):
+    gen = MockGenerator()
+    monkeypatch.setattr(generator_mod, '_worker_instance', gen)
+    gen._interruzione_richiesta = True
+    with patch.object(MockGenerator, 'ricerca_tabu', wraps=gen.ricerca_tabu) as mock_tabu:
+        migliore, fitness = generator_mod.ricerca_tabu_helper(1)
+    # Una richiesta già ricevuta resta valida nei task eseguiti in serie
+    assert gen._interruzione_richiesta
+    assert fitness == gen.calcola_fitness(mock_tabu.call_args[0][0])
+
+def test_ricerca_tabu_helper_stops_on_signal(monkeypatch):
+    gen = MockGenerator()
+    gen.tabu_iterazioni = 10 ** 6
+    monkeypatch.setattr(generator_mod, '_worker_instance', gen)
+    stato_sa = MockGenerator._stato_sa
+    precedente = signal.getsignal(signal.SIGINT)
+
+    def stato_con_segnale(self, individuo):
+        signal.raise_signal(signal.SIGINT)
+        return stato_sa(self, individuo)
+
+    with patch.object(MockGenerator, '_stato_sa', stato_con_segnale):
+        assert generator_mod.ricerca_tabu_helper(1) is not None
+    assert gen._interruzione_richiesta
+    assert signal.getsignal(signal.SIGINT) is precedente
@@ -0,0 +1,57 @@
+import json
+from unittest.mock import patch
+from generator_mod import Telemetria
+from conftest import GeneratoreDiProva
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, cartella_output):
+        super().__init__()
+        self.num_generazioni = 3
+        self.early_stopping_n = 100
+        self.popolazione_size = 4
+        self.base_probabilita_mutazione = 0.1
+        self.base_elitismo_rate = 0.05
+        self.save_interval = 0
+        self.telemetria = True
+        self.cartella_output = cartella_output
+        self.population = [{'individuo': {'k': i}, 'occupazione': None} for i in range(4)]
+
+    def calcola_fitness(self, individuo):
+        return float(individuo['k'])
+
+def test_telemetria_writes_one_line_per_generation(tmp_path):
+    gen = MockGenerator(str(tmp_path))
+    with patch.object(MockGenerator, 'select_and_generate_new_population'):
+        gen._evolvi_popolazione(0)
+
+    righe = [json.loads(r) for r in (tmp_path / 'telemetria.jsonl').read_text().splitlines()]
+    assert [r['generazione'] for r in righe] == [1, 2, 3]
+    assert righe[0]['fitness_migliore'] == 0.0
+    assert righe[0]['fitness_media'] == 1.5
+    assert righe[0]['probabilita_mutazione'] == 0.1
+    assert {'valutazione', 'ordinamento'} <= set(righe[0]['tempi'])
+    # Dalla seconda generazione le fitness già calcolate vengono riutilizzate
+    assert righe[0]['contatori']['cache_hit'] == 0
+    assert righe[1]['contatori']['cache_hit'] == 4
+    assert righe[0]['genomi_unici'] == 4
+    assert righe[0]['distanza_hamming_media'] == 1.0
+    assert gen._telemetria is None
+
+def test_evaluate_population_skips_known_fitness():
+    gen = MockGenerator('OUT')
+    gen.population[0]['fitness'] = 99.0
+    with patch.object(MockGenerator, 'calcola_fitness', side_effect=lambda ind: float(ind['k'])) as mock_fitness:
+        gen.evaluate_population()
+    assert [ind['fitness'] for ind in gen.population] == [99.0, 1.0, 2.0, 3.0]
+    assert mock_fitness.call_count == 3
+
+def test_telemetria_accumulates_and_resets(tmp_path):
+    telemetria = Telemetria(str(tmp_path / 't.jsonl'))
+    telemetria.tempo('crossover', 0.5)
+    telemetria.tempo('crossover', 0.25)
+    telemetria.conta('figli_scartati', 2)
+    telemetria.scrivi(generazione=1)
+    telemetria.scrivi(generazione=2)
+    righe = [json.loads(r) for r in (tmp_path / 't.jsonl').read_text().splitlines()]
+    assert righe[0] == {'generazione': 1, 'contatori': {'figli_scartati': 2}, 'tempi': {'crossover': 0.75}}
+    assert righe[1] == {'generazione': 2, 'contatori': {}, 'tempi': {}}
@@ -0,0 +1,106 @@
+import signal
+from unittest.mock import patch
+import generator_mod
+from conftest import GeneratoreDiProva
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, time_budget_seconds=0):
+        super().__init__()
+        self.num_generazioni = 50
+        self.early_stopping_n = 100
+        self.popolazione_size = 4
+        self.base_probabilita_mutazione = 0.1
+        self.base_elitismo_rate = 0.05
+        self.save_interval = 0
+        self.time_budget_seconds = time_budget_seconds
+        self.population = [{'individuo': {'k': i}, 'occupazione': None, 'fitness': 10.0 - i} for i in range(4)]
+
+def test_evolvi_stops_when_time_budget_is_exhausted():
+    gen = MockGenerator(time_budget_seconds=5)
+    # Ogni valutazione fa avanzare l'orologio di 2 secondi: il budget scade alla terza generazione
+    orologio = [0]
+
+    def valuta(self):
+        orologio[0] += 2
+
+    with patch.object(MockGenerator, 'evaluate_population', valuta), \
+            patch.object(MockGenerator, 'select_and_generate_new_population'), \
+            patch('generator_mod.time.perf_counter', side_effect=lambda: orologio[0]):
+        migliore_individuo, migliore_fitness = gen._evolvi_popolazione(0)
+
+    assert migliore_individuo == {'k': 3}
+    assert migliore_fitness == 7.0
+    assert [r['GENERAZIONE'] for r in gen.andamento_fitness] == [1, 2, 3]
+    assert [r['SECONDI'] for r in gen.andamento_fitness] == [2, 4, 6]
+
+def test_evolvi_stops_after_interruption_request():
+    gen = MockGenerator()
+
+    def interrompi(self):
+        self._interruzione_richiesta = True
+
+    with patch.object(MockGenerator, 'evaluate_population', interrompi), \
+            patch.object(MockGenerator, 'select_and_generate_new_population') as mock_nuova:
+        migliore_individuo, migliore_fitness = gen._evolvi_popolazione(0)
+
+    # La generazione corrente viene comunque valutata e il suo migliore restituito
+    assert migliore_individuo == {'k': 3}
+    assert len(gen.andamento_fitness) == 1
+    mock_nuova.assert_not_called()
+
+def test_gestione_interruzioni_sets_flag_and_restores_handlers():
+    gen = MockGenerator()
+    precedente = signal.getsignal(signal.SIGTERM)
+    with gen._gestione_interruzioni():
+        gestore = signal.getsignal(signal.SIGTERM)
+        assert gestore is not precedente
+        gestore(signal.SIGTERM, None)
+        assert gen._interruzione_richiesta
+    assert signal.getsignal(signal.SIGTERM) is precedente
+
+def test_initialize_population_stops_after_interruption_request():
+    gen = MockGenerator()
+    gen.popolazione_size = 10
+    gen.num_cores = 1
+    gen.esatto_warm_start = False
+    gen.seed_calendar = ''
+    chiamate = []
+
+    def greedy(seme):
+        chiamate.append(seme)
+        if len(chiamate) == 2:
+            gen._interruzione_richiesta = True
+        return {'k': len(chiamate)}
+
+    with patch.object(generator_mod, 'genera_individuo_greedy_helper', greedy), \
+            patch.object(generator_mod, 'genera_individuo_batch_helper') as mock_batch, \
+            patch.object(generator_mod, 'genera_individuo_random_helper') as mock_random, \
+            patch.object(MockGenerator, '_membro', lambda self, individuo, occupazione=None: {'individuo': individuo}):
+        gen.initialize_population()
+
+    assert [m['individuo'] for m in gen.population] == [{'k': 1}, {'k': 2}]
+    mock_batch.assert_not_called()
+    mock_random.assert_not_called()
+
+def test_genera_calendario_handles_signal_during_initialization():
+    gen = MockGenerator()
+    gen.motore = 'ga'
+    gen.crossover_maschera = 'blocchi'
+    gen.selezione_operatore = 'ranking'
+    gen.num_varianti = 1
+    gen.multi_start = 1
+    gen.tabu_dopo_ga = False
+
+    def inizializza(self):
+        # Ctrl+C durante la generazione della popolazione iniziale
+        signal.raise_signal(signal.SIGINT)
+        self.population = [{'individuo': {'k': 0}, 'occupazione': None}]
+
+    with patch.object(MockGenerator, 'initialize_population', inizializza), \
+            patch.object(MockGenerator, '_evolvi_popolazione', return_value=({'k': 0}, 1.0)) as mock_evolvi, \
+            patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, '_salva_finale', side_effect=lambda ind, fit: fit):
+        assert gen.genera_calendario() == 1.0
+
+    mock_evolvi.assert_called_once()
+    assert gen._interruzione_richiesta
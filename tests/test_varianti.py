@@ -0,0 +1,85 @@
+import os
+from collections import defaultdict
+from unittest.mock import patch
+import generator_mod
+from conftest import GeneratoreDiProva, slot_settimanali
+
+class MockGenerator(GeneratoreDiProva):
+    def __init__(self, num_varianti=3):
+        super().__init__()
+        self.num_varianti = num_varianti
+        self.cartella_output = 'OUT'
+
+def test_genera_varianti_ranks_variants_by_fitness(tmp_path):
+    gen = MockGenerator()
+    gen.cartella_output = str(tmp_path)
+    fitness_per_cartella = {'variante_1': 5.0, 'variante_2': None, 'variante_3': 2.0}
+    eseguite = []
+
+    def genera_calendario_finto(self):
+        eseguite.append((self.cartella_output, self.num_cores, self.num_varianti))
+        return fitness_per_cartella[os.path.basename(self.cartella_output)]
+
+    with patch.object(MockGenerator, 'genera_calendario', genera_calendario_finto), \
+            patch.object(generator_mod.pd, 'DataFrame') as mock_df:
+        migliore = gen.genera_varianti()
+
+    assert migliore == 2.0
+    assert eseguite == [(os.path.join(str(tmp_path), f"variante_{i}"), 1, 1) for i in (1, 2, 3)]
+    # La variante senza calendario valido resta fuori dal riepilogo
+    riepilogo = mock_df.call_args[0][0]
+    assert [(r['POSIZIONE'], r['VARIANTE']) for r in riepilogo] == [(1, 3), (2, 1)]
+    # L'istanza originale non viene modificata
+    assert gen.num_varianti == 3 and gen.cartella_output == str(tmp_path)
+
+def test_genera_varianti_runs_real_variants_serially(tmp_path):
+    # Varianti vere in serie: ogni variante deve partire dall'istanza originale, non
+    # dall'ultima variante eseguita (cartelle annidate variante_1/variante_2/...)
+    gen = MockGenerator()
+    gen.cartella_output = str(tmp_path)
+    gen.motore = 'sa'
+    gen.sa_iterazioni = 200
+    gen.classi_list = ['1A']
+    gen.ore_tot_civics = 4
+    gen.docenti_civics_classi = {'Civ1': ['1A']}
+    gen.docenti_civics_organico = defaultdict(set)
+    gen.disponibilita_civics = {'Civ1': {'LUN': [True, True]}}
+    gen.imposta_slot(slot_settimanali())
+    salvate = []
+    istanza_worker = generator_mod._worker_instance
+
+    def salva_finale_finto(self, individuo, fitness):
+        salvate.append((self.cartella_output, self.num_varianti))
+        return fitness
+
+    with patch.object(MockGenerator, '_salva_andamento_fitness'), \
+            patch.object(MockGenerator, '_salva_finale', salva_finale_finto), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        assert gen.genera_varianti() is not None
+
+    assert salvate == [(os.path.join(str(tmp_path), f"variante_{i}"), 1) for i in (1, 2, 3)]
+    assert generator_mod._worker_instance is istanza_worker
+
+def test_genera_varianti_without_valid_variants(tmp_path):
+    gen = MockGenerator(num_varianti=2)
+    gen.cartella_output = str(tmp_path)
+    with patch.object(MockGenerator, 'genera_calendario', lambda self: None), \
+            patch.object(generator_mod.pd, 'DataFrame'):
+        assert gen.genera_varianti() is None
+
+def test_genera_calendario_dispatches_to_variants():
+    gen = MockGenerator()
+    with patch.object(MockGenerator, 'genera_varianti', return_value=1.5) as mock_varianti:
+        assert gen.genera_calendario() == 1.5
+    mock_varianti.assert_called_once()
+
+def test_esecutore_runs_serially_with_one_core():
+    gen = MockGenerator()
+    istanza_worker = generator_mod._worker_instance
+    with patch.object(generator_mod.multiprocessing, 'Pool') as mock_pool:
+        with gen._esecutore() as mappa:
+            risultati = mappa(lambda x: x * 2, [1, 2, 3])
+    assert risultati == [2, 4, 6]
+    mock_pool.assert_not_called()
+    # L'istanza del worker torna quella precedente all'uscita
+    assert generator_mod._worker_instance is istanza_worker